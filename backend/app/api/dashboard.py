@@ -2,49 +2,42 @@
 API routes for dashboard and statistics.
 """
 
-from fastapi import APIRouter
-from app.services.simple_organizer import SimpleOrganizerService
+from fastapi import APIRouter, Depends
+from app.api.deps import get_blocking_executor
+from app.core.threadpool import BlockingExecutor
+from app.services.dashboard_cache import dashboard_snapshot
 
 router = APIRouter()
 
 @router.get("/stats")
-async def get_dashboard_stats():
+async def get_dashboard_stats(blocking: BlockingExecutor = Depends(get_blocking_executor)):
     """Get dashboard statistics"""
-    organizer = SimpleOrganizerService()
-    files = organizer.scan_files()
-    stats = organizer.get_stats()
+    snapshot = await blocking.run("dashboard", dashboard_snapshot.get)
     
     # Calculate totals
-    total_files = len(files)
-    total_size = sum(f["size"] for f in files)
-    
-    # Files by category
-    category_stats = {}
-    for file in files:
-        category = file["category"]
-        if category not in category_stats:
-            category_stats[category] = 0
-        category_stats[category] += 1
+    total_files = snapshot["total_files"]
+    total_size = snapshot["total_size_bytes"]
     
     return {
         "total_files": total_files,
-        "category_stats": [{"category": cat, "count": count} for cat, count in category_stats.items()],
+        "category_stats": [
+            {"category": cat, "count": info["count"], "size_bytes": info["size"]}
+            for cat, info in snapshot["categories"].items()
+        ],
         "recent_files": total_files,  # All files are "recent" since we're scanning live
         "total_size_bytes": total_size,
         "total_size_mb": round(total_size / (1024 * 1024), 2),
         "duplicate_count": 0,  # Not implemented in simple version
-        "organized_stats": stats["categories"]
+        "organized_stats": snapshot["organized_stats"]
     }
 
 @router.get("/activity")
-async def get_recent_activity(limit: int = 20):
+async def get_recent_activity(limit: int = 20, blocking: BlockingExecutor = Depends(get_blocking_executor)):
     """Get recent file organization activity"""
-    organizer = SimpleOrganizerService()
-    files = organizer.scan_files()
+    snapshot = await blocking.run("dashboard", dashboard_snapshot.get)
     
-    # Sort by creation time and limit
-    files.sort(key=lambda x: x["created"], reverse=True)
-    recent_files = files[:limit]
+    # Already sorted newest first
+    recent_files = snapshot["recent_files"][:limit]
     
     return {
         "recent_activity": [
@@ -61,31 +54,30 @@ async def get_recent_activity(limit: int = 20):
     }
 
 @router.get("/folders")
-async def get_folder_structure():
+async def get_folder_structure(blocking: BlockingExecutor = Depends(get_blocking_executor)):
     """Get current folder structure of downloads"""
-    organizer = SimpleOrganizerService()
-    stats = organizer.get_stats()
+    snapshot = await blocking.run("dashboard", dashboard_snapshot.get)
+    organized_stats = snapshot["organized_stats"]
     
     return {
         "folders": [
             {
                 "name": category,
-                "path": f"{organizer.organized_path}/{category}",
+                "path": f"{snapshot['organized_path']}/{category}",
                 "file_count": count
             }
-            for category, count in stats["categories"].items()
+            for category, count in organized_stats.items()
         ],
-        "total_files": sum(stats["categories"].values())
+        "total_files": sum(organized_stats.values())
     }
 
 @router.get("/storage")
-async def get_storage_info():
+async def get_storage_info(blocking: BlockingExecutor = Depends(get_blocking_executor)):
     """Get storage usage information"""
-    organizer = SimpleOrganizerService()
-    files = organizer.scan_files()
+    snapshot = await blocking.run("dashboard", dashboard_snapshot.get)
     
-    total_size = sum(f["size"] for f in files)
-    file_count = len(files)
+    total_size = snapshot["total_size_bytes"]
+    file_count = snapshot["total_files"]
     
     return {
         "total_size_bytes": total_size,
@@ -0,0 +1,16 @@
+"""
+Shared API dependencies.
+"""
+
+from fastapi import Request
+
+from app.core.threadpool import BlockingExecutor
+from app.services.simple_organizer import SimpleOrganizerService
+
+def get_organizer(request: Request) -> SimpleOrganizerService:
+    """The application-scoped organizer built at startup"""
+    return request.app.state.organizer
+
+def get_blocking_executor(request: Request) -> BlockingExecutor:
+    """Thread pool for blocking filesystem work, so routes don't stall the event loop"""
+    return request.app.state.blocking
@@ -2,44 +2,100 @@
 API routes for file management and organization.
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import List, Optional
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
 from pydantic import BaseModel
 
+from app.api.deps import get_blocking_executor, get_organizer
+from app.core.config import settings
+from app.core.threadpool import BlockingExecutor
+from app.services.dashboard_cache import dashboard_snapshot
 from app.services.simple_organizer import SimpleOrganizerService
 
 router = APIRouter()
 
 class OrganizeRequest(BaseModel):
     dry_run: bool = True
+    workers: Optional[int] = None  # Defaults to settings.organize_workers
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _wants_stream(stream: bool, accept: Optional[str]) -> bool:
+    """Stream when asked via ?stream=true or an NDJSON Accept header"""
+    return stream or (accept is not None and NDJSON_MEDIA_TYPE in accept)
+
+def _ndjson_response(records: AsyncIterator[Dict]) -> StreamingResponse:
+    """Send one JSON document per line as the records are produced"""
+    async def lines():
+        async for record in records:
+            yield json.dumps(record, default=str) + "\n"
+    
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
 
 @router.get("/")
 async def get_files(
     category: Optional[str] = None,
-    limit: int = 100
+    extension: Optional[str] = None,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    modified_after: Optional[datetime] = None,
+    modified_before: Optional[datetime] = None,
+    sort: str = Query("name", pattern="^(name|size|modified)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    organizer: SimpleOrganizerService = Depends(get_organizer),
+    blocking: BlockingExecutor = Depends(get_blocking_executor)
 ):
-    """Get list of files with optional filtering"""
-    organizer = SimpleOrganizerService()
-    files = organizer.scan_files()
-    
-    # Filter by category if specified
-    if category:
-        files = [f for f in files if f["category"].lower() == category.lower()]
+    """Get a page of files with optional filtering; pass next_cursor back to continue"""
     
-    # Limit results
-    files = files[:limit]
+    try:
+        files, next_cursor = await blocking.run(
+            "files",
+            organizer.query_files,
+            category=category,
+            extension=extension,
+            min_size=min_size,
+            max_size=max_size,
+            modified_after=modified_after,
+            modified_before=modified_before,
+            sort=sort,
+            order=order,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "files": files,
         "total": len(files),
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 @router.post("/scan")
-async def scan_files():
+async def scan_files(
+    stream: bool = False,
+    accept: Optional[str] = Header(None),
+    organizer: SimpleOrganizerService = Depends(get_organizer),
+    blocking: BlockingExecutor = Depends(get_blocking_executor)
+):
     """Scan downloads folder for files"""
-    organizer = SimpleOrganizerService()
-    files = organizer.scan_files()
+    if _wants_stream(stream, accept):
+        def records():
+            files_found = 0
+            for file in organizer.iter_scan_files():
+                files_found += 1
+                yield {"type": "file", **file}
+            yield {"type": "summary", "message": "Scan completed", "files_found": files_found}
+        
+        return _ndjson_response(blocking.iterate("scan", records()))
+    
+    files = await blocking.run("scan", organizer.scan_files)
     
     return {
         "message": "Scan completed",
@@ -48,10 +104,48 @@ async def scan_files():
     }
 
 @router.post("/organize")
-async def organize_files(request: OrganizeRequest):
+async def organize_files(
+    request: OrganizeRequest,
+    stream: bool = False,
+    accept: Optional[str] = Header(None),
+    organizer: SimpleOrganizerService = Depends(get_organizer),
+    blocking: BlockingExecutor = Depends(get_blocking_executor)
+):
     """Organize files into categories"""
-    organizer = SimpleOrganizerService()
-    organized_count, errors, results = organizer.organize_files(dry_run=request.dry_run)
+    workers = max(1, min(request.workers or settings.organize_workers, settings.organize_max_workers))
+    
+    if _wants_stream(stream, accept):
+        def records():
+            organized_count = 0
+            error_count = 0
+            try:
+                for result in organizer.iter_organize(dry_run=request.dry_run, workers=workers):
+                    if result["success"]:
+                        organized_count += 1
+                    else:
+                        error_count += 1
+                    yield {"type": "result", **result}
+            finally:
+                if not request.dry_run:
+                    dashboard_snapshot.mark_stale()
+            yield {
+                "type": "summary",
+                "message": "Organization completed" if not request.dry_run else "Dry run completed",
+                "organized_count": organized_count,
+                "error_count": error_count,
+                "dry_run": request.dry_run
+            }
+        
+        return _ndjson_response(blocking.iterate("organize", records()))
+    
+    organized_count, errors, results = await blocking.run(
+        "organize",
+        organizer.organize_files,
+        dry_run=request.dry_run,
+        workers=workers
+    )
+    if not request.dry_run:
+        dashboard_snapshot.mark_stale()
     
     return {
         "message": "Organization completed" if not request.dry_run else "Dry run completed",
@@ -62,9 +156,12 @@ async def organize_files(request: OrganizeRequest):
     }
 
 @router.get("/stats")
-async def get_stats():
-    """Get organization statistics"""
-    organizer = SimpleOrganizerService()
-    stats = organizer.get_stats()
+async def get_stats(blocking: BlockingExecutor = Depends(get_blocking_executor)):
+    """Get organization statistics (served from the shared dashboard snapshot)"""
+    snapshot = await blocking.run("dashboard", dashboard_snapshot.get)
     
-    return stats
+    return {
+        "downloads_path": snapshot["downloads_path"],
+        "organized_path": snapshot["organized_path"],
+        "categories": snapshot["organized_stats"]
+    }
@@ -0,0 +1,97 @@
+"""
+API routes for background task output.
+"""
+
+import os
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import BaseModel
+
+from app.api.deps import get_blocking_executor
+from app.core.celery import celery_app
+from app.core.config import settings
+from app.core.threadpool import BlockingExecutor
+from app.services.dashboard_cache import dashboard_snapshot
+from app.services.result_store import get_result_store
+from app.tasks.file_tasks import organize_downloads, organize_paths
+
+router = APIRouter()
+
+class OrganizeTaskRequest(BaseModel):
+    paths: Optional[List[str]] = None  # Defaults to the whole downloads folder
+
+@router.post("/organize")
+async def queue_organize(
+    request: OrganizeTaskRequest = OrganizeTaskRequest(),
+    blocking: BlockingExecutor = Depends(get_blocking_executor)
+):
+    """Organize files in the background, batched into organize_batch_task runs"""
+    if request.paths is None:
+        group = await blocking.run("organize", organize_downloads)
+    else:
+        root = os.path.normcase(os.path.abspath(settings.downloads_path)) + os.sep
+        outside = [path for path in request.paths if not os.path.normcase(os.path.abspath(path)).startswith(root)]
+        if outside:
+            raise HTTPException(status_code=400, detail=f"Not in the downloads folder: {outside[0]}")
+        group = await blocking.run("organize", organize_paths, request.paths)
+    
+    # Batches mark the dashboard stale as they move files; this covers anything already moved
+    dashboard_snapshot.mark_stale()
+    
+    return {
+        "group_id": group.id,
+        "task_ids": [result.id for result in group.results]
+    }
+
+@router.get("/executor")
+async def get_task_executor_info(request: Request):
+    """Which executor runs background tasks, as settled at startup"""
+    return {
+        "executor": request.app.state.task_executor,
+        "configured": settings.task_executor,
+        "workers": settings.task_executor_workers
+    }
+
+@router.get("/status/{task_id}")
+async def get_task_status(
+    task_id: str,
+    blocking: BlockingExecutor = Depends(get_blocking_executor)
+):
+    """State of a background task, with its progress meta or result"""
+    def read():
+        result = celery_app.AsyncResult(task_id)
+        info = result.info
+        if isinstance(info, BaseException):
+            info = {"error": str(info)}
+        return result.state, info
+    
+    state, info = await blocking.run("files", read)
+    return {"task_id": task_id, "state": state, "info": info}
+
+@router.get("/results/{handle}")
+async def get_task_results(
+    handle: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    blocking: BlockingExecutor = Depends(get_blocking_executor)
+):
+    """Page through the per-file details of a scan/cleanup task (the "details" handle in its result)"""
+    try:
+        records, next_offset = await blocking.run(
+            "files",
+            get_result_store().read_page,
+            handle,
+            offset=offset,
+            limit=limit
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Task results not found")
+    
+    return {
+        "handle": handle,
+        "records": records,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": next_offset
+    }
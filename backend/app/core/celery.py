@@ -2,14 +2,45 @@
 Celery configuration for background tasks.
 """
 
+import os
+import socket
+from threading import Lock
+from typing import Optional
+from urllib.parse import urlparse
+
 from celery import Celery
 from app.core.config import settings
 
+LOCAL_EXECUTORS = ("thread", "process")
+
+def redis_reachable(url: str, timeout: float = 0.5) -> bool:
+    """Cheap TCP probe of the broker; no Redis command is sent"""
+    parsed = urlparse(url)
+    try:
+        with socket.create_connection((parsed.hostname or "localhost", parsed.port or 6379), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+def resolve_task_executor() -> str:
+    """settings.task_executor, with "auto" picking celery only when Redis answers"""
+    if settings.task_executor != "auto":
+        return settings.task_executor
+    return "celery" if redis_reachable(settings.redis_url) else "thread"
+
+def _result_backend(executor: str) -> str:
+    if executor in LOCAL_EXECUTORS:
+        # In-process executor: task state and results live in a shared directory,
+        # so threads and worker processes report through the same AsyncResult API
+        os.makedirs(settings.task_local_backend_path, exist_ok=True)
+        return "file://" + settings.task_local_backend_path
+    return settings.redis_url
+
 # Create Celery instance
 celery_app = Celery(
     "downloads_organizer",
     broker=settings.redis_url,
-    backend=settings.redis_url,
+    backend=_result_backend(settings.task_executor),  # Redis unless a local executor is set explicitly
     include=["app.tasks"]
 )
 
@@ -25,4 +56,29 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    task_store_eager_result=True,  # Local executor runs tasks with apply()
 )
+
+_task_executor: Optional[str] = None
+_task_executor_lock = Lock()
+
+def configure_task_executor(executor: Optional[str] = None) -> str:
+    """
+    Settle which executor runs background tasks in this process.
+    
+    The API calls this once at startup, so "auto" probes Redis once rather
+    than on import; other processes resolve on first use. The result
+    backend is switched to match, which has to happen before any result is
+    read (Celery keeps the backend it creates first). Later calls return
+    the settled choice.
+    """
+    global _task_executor
+    with _task_executor_lock:
+        if _task_executor is None:
+            _task_executor = executor or resolve_task_executor()
+            celery_app.conf.result_backend = _result_backend(_task_executor)
+            print(f"Background tasks run on the {_task_executor} executor (task_executor={settings.task_executor})")
+        return _task_executor
+
+def get_task_executor() -> str:
+    return configure_task_executor()
@@ -2,11 +2,26 @@
 Configuration settings for the Downloads Organizer application.
 """
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from typing import Optional
 import os
 from pathlib import Path
 
+# Local state shared by the API, the watcher and task workers
+DEFAULT_DATA_DIR = str(Path(__file__).resolve().parents[2] / "data")
+
+# Settings derived from data_dir when left unset: setting -> name inside data_dir
+DATA_PATHS = {
+    "task_local_backend_path": "task_state",
+    "watch_spill_path": "watch_spill.jsonl",
+    "scan_shard_stats_path": "scan_shard_stats.json",
+    "checksum_cache_path": "checksum_cache.sqlite3",
+    "expiry_index_path": "expiry_index.sqlite3",
+    "task_results_path": "task_results",
+    "dashboard_stamp_path": "dashboard.stamp",
+}
+
 def get_downloads_folder() -> str:
     """
     Cross-platform downloads folder detection.
@@ -45,18 +60,48 @@ def get_downloads_folder() -> str:
 class Settings(BaseSettings):
     """Application settings"""
     
+    # Local state (caches, indexes, task results); paths below default to files in here
+    data_dir: str = DEFAULT_DATA_DIR
+    
     # Database
     database_url: str = "sqlite:///./downloads_organizer.db"
     
     # Redis for Celery
     redis_url: str = "redis://localhost:6379/0"
     
+    # Background task executor: "celery", "thread" or "process" (in-process pools),
+    # or "auto" to use celery when redis_url is reachable and threads otherwise
+    task_executor: str = "auto"
+    task_executor_workers: int = 4
+    task_local_backend_path: Optional[str] = None  # Task state/results for the in-process executor
+    
     # File monitoring
     downloads_path: str = get_downloads_folder()
     watch_recursive: bool = True
+    watch_stable_seconds: float = 2.0  # Size/mtime must hold this long before a file counts as complete
+    watch_poll_interval: float = 0.5
+    watch_workers: int = 2
+    watch_queue_size: int = 1000
+    watch_queue_put_timeout: float = 0.5  # Backpressure wait before spilling to disk
+    watch_spill_path: Optional[str] = None
+    watch_batch_size: int = 50  # Files organized (and recorded) per transaction
+    watch_flush_interval: float = 0.25  # Max seconds a worker waits to fill a batch
+    
+    # Tree walking (globs match file/dir names or paths relative to downloads_path)
+    scan_include_patterns: list = []
+    scan_exclude_patterns: list = []
+    scan_max_depth: Optional[int] = None  # None walks the whole tree
+    scan_ingest_chunk_size: int = 1000  # Files per existence query / bulk insert / commit
+    scan_shard_target_files: int = 5000  # Files per shard for scan_downloads_folder_task
+    scan_shard_max: int = 64
+    scan_shard_stats_path: Optional[str] = None  # Directory sizes from the last scan
     
     # File organization
     max_file_size_mb: int = 100  # Skip files larger than 100MB
+    organize_workers: int = 1  # Worker threads for /api/files/organize (1 = serial)
+    organize_max_workers: int = 16
+    organize_task_batch_size: int = 500  # Paths per organize_batch_task
+    organize_commit_size: int = 100  # Files per DB commit inside a batch task
     supported_extensions: list = [
         ".pdf", ".doc", ".docx", ".txt", ".rtf",
         ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg",
@@ -67,6 +112,21 @@ class Settings(BaseSettings):
         ".xlsx", ".xls", ".csv", ".ppt", ".pptx"
     ]
     
+    # Hashing
+    hash_algorithm: str = "md5"  # md5 (compatible), blake2b or sha256
+    hash_buffer_size: int = 1024 * 1024
+    hash_mmap_threshold: int = 64 * 1024 * 1024  # Memory-map files at least this large, 0 disables
+    
+    # MIME detection (extension, then magic number, then libmagic; see mime_detector)
+    mime_sniff_bytes: int = 64 * 1024  # Head of the file passed to libmagic
+    mime_untrusted_extensions: list = [".exe", ".msi", ".dmg", ".pkg"]  # Always checked from content
+    mime_cache_size: int = 10000  # Fingerprints whose sniffed type is remembered
+    
+    # Duplicate detection
+    duplicate_block_size: int = 64 * 1024  # Head/tail sample size in bytes
+    duplicate_workers: int = 4
+    checksum_cache_path: Optional[str] = None
+    
     # Organization rules
     default_categories: dict = {
         "images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg"],
@@ -82,6 +142,29 @@ class Settings(BaseSettings):
     # Cleanup rules
     cleanup_temp_files_days: int = 7
     cleanup_old_files_days: int = 30
+    cleanup_temp_patterns: list = ["*.tmp", "*.temp", "*.crdownload", "*.part", "*.partial", "~$*"]
+    cleanup_category_days: dict = {}  # Per-category retention, e.g. {"software": 14}; 0 keeps forever
+    cleanup_batch_size: int = 200  # Files deleted per batch
+    cleanup_batch_interval: float = 1.0  # Seconds to pause between batches
+    expiry_index_path: Optional[str] = None
+    
+    # Dashboard
+    dashboard_cache_ttl_seconds: float = 30.0
+    dashboard_recent_files: int = 100
+    dashboard_stamp_path: Optional[str] = None  # Touched by any process that moves files; cached snapshots older than it are dropped
+    
+    # Per-file task details (scan/cleanup) are stored here, not in the result backend
+    task_results_path: Optional[str] = None
+    task_results_retention_hours: float = 72.0
+    
+    # Thread pool for blocking filesystem work in API routes
+    blocking_pool_size: int = 8
+    endpoint_concurrency_limits: dict = {
+        "organize": 1,
+        "scan": 2,
+        "files": 4,
+        "dashboard": 2
+    }
     
     # API settings
     api_v1_prefix: str = "/api/v1"
@@ -90,6 +173,21 @@ class Settings(BaseSettings):
     # Security
     secret_key: str = "your-secret-key-change-in-production"
     
+    @property
+    def mime_trusted_extensions(self) -> list:
+        """Supported extensions whose MIME type is taken from the extension alone"""
+        untrusted = {ext.lower() for ext in self.mime_untrusted_extensions}
+        return [ext for ext in self.supported_extensions if ext.lower() not in untrusted]
+    
+    @model_validator(mode="after")
+    def resolve_data_paths(self) -> "Settings":
+        """Fill unset paths from data_dir and make all of them absolute, so every process agrees"""
+        self.data_dir = os.path.abspath(os.path.expanduser(self.data_dir or DEFAULT_DATA_DIR))
+        for name, file_name in DATA_PATHS.items():
+            path = getattr(self, name) or os.path.join(self.data_dir, file_name)
+            setattr(self, name, os.path.abspath(os.path.expanduser(path)))
+        return self
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
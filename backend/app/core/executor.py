@@ -0,0 +1,93 @@
+"""
+Pluggable executor for background tasks.
+
+``submit_task`` sends a task to Celery when the configured executor is
+"celery", or runs it on an in-process thread/process pool otherwise (see
+app.core.celery.configure_task_executor). Either way the caller gets an
+``AsyncResult`` and the task reports progress through
+``self.update_state`` exactly as it does on a Celery worker: local runs
+go through ``Task.apply`` with the result backend pointed at a shared
+directory, so state is visible across threads and worker processes.
+
+Every task is dispatched through ``submit_task`` (organize_paths and
+organize_downloads in app.tasks.file_tasks). The one exception is the
+chord scan_downloads_folder_task builds for its shards: it only fans out
+on a Celery worker and scans inline when run locally.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Optional
+
+from celery import Task
+from celery.result import AsyncResult
+from celery.utils import uuid
+
+from app.core.celery import LOCAL_EXECUTORS, celery_app, configure_task_executor, get_task_executor
+from app.core.config import settings
+
+
+def _init_worker_process(executor: str):
+    # Spawned processes start without the task registry or the parent's executor choice
+    configure_task_executor(executor)
+    import app.tasks.file_tasks  # noqa: F401
+
+
+def _run_task(name: str, args: tuple, kwargs: dict, task_id: str):
+    celery_app.tasks[name].apply(args=args, kwargs=kwargs, task_id=task_id)
+
+
+class LocalAsyncResult(AsyncResult):
+    """AsyncResult whose get() waits on the local future instead of polling"""
+
+    def __init__(self, task_id: str, future: Future):
+        super().__init__(task_id, app=celery_app)
+        self.future = future
+
+    def get(self, timeout: Optional[float] = None, **kwargs):
+        done, _ = wait([self.future], timeout=timeout)
+        if self.future in done:
+            self.future.result()  # Surface executor-level errors (e.g. a dead worker process)
+        return super().get(timeout=timeout, **kwargs)
+
+
+class LocalTaskExecutor:
+    """Runs registered Celery tasks on a thread or process pool in this process"""
+
+    def __init__(self, kind: str = "thread", workers: int = 4):
+        self.kind = kind
+        if kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker_process,
+                initargs=(kind,)
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="task")
+
+    def submit(self, task: Task, args: tuple = (), kwargs: Optional[dict] = None) -> AsyncResult:
+        task_id = uuid()
+        future = self._pool.submit(_run_task, task.name, tuple(args), kwargs or {}, task_id)
+        return LocalAsyncResult(task_id, future)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+
+_local_executor: Optional[LocalTaskExecutor] = None
+_local_executor_lock = Lock()
+
+
+def get_local_executor() -> LocalTaskExecutor:
+    global _local_executor
+    with _local_executor_lock:
+        if _local_executor is None:
+            _local_executor = LocalTaskExecutor(get_task_executor(), settings.task_executor_workers)
+        return _local_executor
+
+
+def submit_task(task: Task, *args, **kwargs) -> AsyncResult:
+    """Run a task on the configured backend; use instead of task.delay()"""
+    if get_task_executor() in LOCAL_EXECUTORS:
+        return get_local_executor().submit(task, args, kwargs)
+    return task.apply_async(args, kwargs)
@@ -0,0 +1,110 @@
+"""
+Bounded thread pool for blocking filesystem work called from async routes.
+
+Route handlers are ``async def``, so calling ``os.scandir``/``shutil.move``
+directly would stall the event loop (and every other request, including
+health checks) for the duration. Handlers hand that work to a
+``BlockingExecutor`` instead; a per-endpoint semaphore caps how many calls
+of each kind run at once so one heavy endpoint can't take the whole pool.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BlockingExecutor:
+    """Thread pool plus per-endpoint concurrency limits"""
+
+    def __init__(
+        self,
+        pool_size: int,
+        limits: Optional[Dict[str, int]] = None,
+        default_limit: Optional[int] = None,
+        max_pending: int = 4
+    ):
+        self.pool_size = pool_size
+        self.max_pending = max_pending
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit or pool_size
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="blocking-io")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = self._semaphores[name] = asyncio.Semaphore(self.limits.get(name, self.default_limit))
+        return semaphore
+
+    async def run(self, name: str, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run func(*args, **kwargs) on the pool under the named concurrency limit"""
+        async with self._semaphore(name):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, partial(func, *args, **kwargs))
+
+    async def iterate(self, name: str, iterator: Iterator[T], batch_size: int = 64) -> AsyncIterator[T]:
+        """
+        Drain a blocking iterator on one pool thread, handing batches to the loop.
+
+        The whole iterator runs on a single thread, so generators holding
+        thread-bound resources (sqlite connections, open files) are safe.
+        At most ``max_pending`` batches are buffered ahead of the consumer;
+        if the consumer goes away the iterator is closed on its own thread.
+        The named limit is held until the iterator is exhausted.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        stop = threading.Event()
+
+        def put(message) -> bool:
+            future = asyncio.run_coroutine_threadsafe(queue.put(message), loop)
+            while True:
+                try:
+                    future.result(timeout=0.1)
+                    return True
+                except FutureTimeoutError:
+                    if stop.is_set():
+                        future.cancel()
+                        return False
+
+        def drain():
+            try:
+                batch = []
+                for item in iterator:
+                    batch.append(item)
+                    if len(batch) >= batch_size:
+                        if not put(("items", batch)):
+                            return
+                        batch = []
+                if batch and not put(("items", batch)):
+                    return
+                put(("done", None))
+            except BaseException as e:
+                put(("error", e))
+            finally:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+
+        async with self._semaphore(name):
+            drained = loop.run_in_executor(self._pool, drain)
+            try:
+                while True:
+                    kind, value = await queue.get()
+                    if kind == "done":
+                        break
+                    if kind == "error":
+                        raise value
+                    for item in value:
+                        yield item
+                await drained
+            finally:
+                stop.set()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
@@ -3,23 +3,49 @@ Downloads Organizer - FastAPI Application
 Main application entry point with API routes and middleware.
 """
 
+from contextlib import asynccontextmanager
+from functools import partial
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 
-from app.api import files, dashboard
+from app.api import files, dashboard, tasks
 from app.api.settings_simple import router as settings_router
+from app.core.celery import configure_task_executor
 from app.core.config import settings as app_settings
+from app.core.threadpool import BlockingExecutor
+from app.services.dashboard_cache import build_dashboard_snapshot, dashboard_snapshot
+from app.services.expiry_index import get_expiry_index
+from app.services.simple_organizer import SimpleOrganizerService
 # No database needed - using simple file operations
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared services once and reuse them (and their warmed state) across requests"""
+    organizer = SimpleOrganizerService(expiry_index=get_expiry_index())
+    app.state.organizer = organizer
+    dashboard_snapshot.compute = partial(build_dashboard_snapshot, organizer)
+    
+    # Blocking filesystem work runs here instead of on the event loop
+    app.state.blocking = BlockingExecutor(
+        pool_size=app_settings.blocking_pool_size,
+        limits=app_settings.endpoint_concurrency_limits
+    )
+    
+    # Background task executor ("auto" probes Redis here, once, not on import)
+    app.state.task_executor = configure_task_executor()
+    yield
+    app.state.blocking.shutdown()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Downloads Organizer API",
     description="Intelligent file organization system for managing downloads",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -35,6 +61,7 @@ app.add_middleware(
 app.include_router(files.router, prefix="/api/files", tags=["files"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
 app.include_router(settings_router, prefix="/api/settings", tags=["settings"])
+app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
 
 # Health check endpoint
 @app.get("/api/health")
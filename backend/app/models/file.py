@@ -2,7 +2,7 @@
 File model for tracking organized files and their metadata.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -10,6 +10,17 @@ class File(Base):
     """File model for tracking organized files"""
     
     __tablename__ = "files"
+    __table_args__ = (
+        # Lookups by path (ingestion, re-organizing) and by content (duplicates).
+        # Paths are not unique: every organize event keeps its own row.
+        Index("ix_files_original_path", "original_path"),
+        Index("ix_files_new_path", "new_path"),
+        Index("ix_files_checksum_size", "checksum", "file_size"),
+        # Dashboard: recent files overall, per category and by organized state
+        Index("ix_files_created_at", "created_at"),
+        Index("ix_files_category_created_at", "category", "created_at"),
+        Index("ix_files_is_organized_created_at", "is_organized", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     original_name = Column(String(255), nullable=False)
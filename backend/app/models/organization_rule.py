@@ -2,7 +2,7 @@
 Organization rule model for custom file organization rules.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, Index, text
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -35,5 +35,15 @@ class OrganizationRule(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        # Rule evaluation reads active rules by descending priority
+        Index(
+            "ix_organization_rules_active_priority",
+            priority.desc(),
+            postgresql_where=text("is_active = true"),
+            sqlite_where=text("is_active = 1")
+        ),
+    )
+    
     def __repr__(self):
         return f"<OrganizationRule(id={self.id}, name='{self.name}', pattern='{self.file_pattern}')>"
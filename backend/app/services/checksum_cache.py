@@ -0,0 +1,113 @@
+"""
+Persistent checksum cache keyed by file fingerprint.
+
+A checksum is stored against the file's (device, inode) together with the
+size and mtime_ns it had when hashed. A lookup whose size or mtime_ns no
+longer match is treated as stale: the file is re-hashed and the entry is
+replaced, so an unchanged file is never hashed twice.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checksums (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    PRIMARY KEY (device, inode, algorithm)
+);
+"""
+
+
+class ChecksumCache:
+    """SQLite-backed checksum cache with hit/miss counters"""
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        directory = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.cache_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _count(self, attribute: str):
+        with self._stats_lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def get_or_compute(
+        self,
+        file_path: str,
+        compute: Callable[[str], str],
+        algorithm: str = "md5",
+        stat: Optional[os.stat_result] = None
+    ) -> str:
+        """Return the cached checksum for a file, hashing it only if its fingerprint changed"""
+        stat = stat or os.stat(file_path)
+        checksum = self.lookup(stat, algorithm)
+        if checksum is None:
+            checksum = compute(file_path)
+            self.store(stat, algorithm, checksum)
+        return checksum
+
+    def lookup(self, stat: os.stat_result, algorithm: str = "md5") -> Optional[str]:
+        """Cached checksum for a fingerprint, or None (counted as a miss) if absent or stale"""
+        row = self._connection().execute(
+            "SELECT size, mtime_ns, checksum FROM checksums WHERE device = ? AND inode = ? AND algorithm = ?",
+            (stat.st_dev, stat.st_ino, algorithm)
+        ).fetchone()
+
+        if row is not None:
+            if row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+                self._count("hits")
+                return row[2]
+            self._count("invalidations")
+
+        self._count("misses")
+        return None
+
+    def store(self, stat: os.stat_result, algorithm: str, checksum: str):
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checksums (device, inode, algorithm, size, mtime_ns, checksum) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (stat.st_dev, stat.st_ino, algorithm, stat.st_size, stat.st_mtime_ns, checksum)
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations
+        }
+
+
+_caches: Dict[str, ChecksumCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_checksum_cache(cache_path: str) -> ChecksumCache:
+    """Return the process-wide cache for a given store path"""
+    with _caches_lock:
+        if cache_path not in _caches:
+            _caches[cache_path] = ChecksumCache(cache_path)
+        return _caches[cache_path]
@@ -0,0 +1,108 @@
+"""
+Extension-to-category classification shared by all organizers.
+
+The category tables ({category: [extensions]}) are compiled once into a
+single dict lookup. Compound suffixes such as ``.tar.gz`` are supported:
+the longest suffix present in the table wins, and earlier categories win
+when an extension is listed twice (the same result as the old linear scan).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ExtensionClassifier:
+    """Compiled extension lookup for one category table"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]], default: Optional[str] = None):
+        self.default = default
+        self._lookup: Dict[str, str] = {}
+        for category, extensions in categories.items():
+            for extension in extensions:
+                self._lookup.setdefault(extension.lower(), category)
+        self._max_parts = max((extension.count(".") for extension in self._lookup), default=1)
+
+    def match(self, file_path: str) -> Tuple[str, Optional[str]]:
+        """Return (matched extension, category), falling back to the plain suffix and default"""
+        name = os.path.basename(file_path).lower()
+        index = name.rfind(".")
+        if index <= 0:
+            return "", self.default
+
+        suffix = name[index:]
+        if self._max_parts == 1:
+            return suffix, self._lookup.get(suffix, self.default)
+
+        # Try the longest compound suffix first (".tar.gz" before ".gz")
+        candidates = [suffix]
+        for _ in range(self._max_parts - 1):
+            index = name.rfind(".", 0, index)
+            if index <= 0:
+                break
+            candidates.append(name[index:])
+
+        for candidate in reversed(candidates):
+            category = self._lookup.get(candidate)
+            if category is not None:
+                return candidate, category
+
+        return suffix, self.default
+
+    def classify(self, file_path: str) -> Optional[str]:
+        """Return the category for a file name or path"""
+        return self.match(file_path)[1]
+
+    def matches(self, file_path: str) -> bool:
+        """True if the file's extension appears in the table"""
+        return self.match(file_path)[1] is not None
+
+
+CACHE_SIZE = 32
+
+_cache: "OrderedDict[Tuple, ExtensionClassifier]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _snapshot(categories: Dict[str, Iterable[str]]) -> Tuple:
+    # Order matters: earlier categories win for extensions listed twice
+    return tuple((category, tuple(extensions)) for category, extensions in categories.items())
+
+
+def _cached(key: Tuple, build) -> ExtensionClassifier:
+    with _cache_lock:
+        classifier = _cache.get(key)
+        if classifier is not None:
+            _cache.move_to_end(key)
+            return classifier
+
+    classifier = build()
+    with _cache_lock:
+        _cache[key] = classifier
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return classifier
+
+
+def get_classifier(categories: Dict[str, List[str]], default: Optional[str] = None) -> ExtensionClassifier:
+    """
+    Return a compiled classifier for a category table.
+
+    Classifiers are cached by the table's content, so equal tables share
+    one classifier and a changed table (replaced or mutated in place) is
+    recompiled on next use. The cache keeps the CACHE_SIZE most recently
+    used tables.
+    """
+    return _cached(
+        (_snapshot(categories), default),
+        lambda: ExtensionClassifier(categories, default)
+    )
+
+
+def get_extension_filter(extensions: List[str]) -> ExtensionClassifier:
+    """Return a compiled membership test for a flat extension list"""
+    return _cached(
+        (_snapshot({"supported": extensions}), None),
+        lambda: ExtensionClassifier({"supported": extensions})
+    )
@@ -0,0 +1,147 @@
+"""
+Single-pass file content reader.
+
+A file is opened once and streamed through one reused buffer (or a memory
+map for large files). Each chunk is handed as a memoryview to every
+consumer that still wants data:
+
+- ``HashConsumer``: the content checksum (whole file)
+- ``HeadSniffer``: the first ``head_size`` bytes, for MIME detection
+  (see mime_detector)
+
+Consumers say how many bytes they need; when none of them needs the whole
+file, reading stops after the largest head, so a file whose checksum is
+already cached costs one small read instead of two full ones.
+"""
+
+import mmap
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional
+
+from app.services.hashing import DEFAULT_BUFFER_SIZE, DEFAULT_MMAP_THRESHOLD, new_hasher
+
+DEFAULT_HEAD_SIZE = 64 * 1024
+
+
+class ContentConsumer(ABC):
+    """Receives a file's content chunk by chunk"""
+
+    # Bytes wanted from the start of the file, None for the whole file
+    wants: Optional[int] = None
+
+    def __init__(self):
+        self.done = False
+
+    @abstractmethod
+    def update(self, chunk: memoryview):
+        """Consume the next chunk; set ``done`` once no more content is needed"""
+
+    @abstractmethod
+    def result(self):
+        """What the consumer found, once the read is over"""
+
+
+class HashConsumer(ContentConsumer):
+    def __init__(self, algorithm: str = "md5"):
+        super().__init__()
+        self._hasher = new_hasher(algorithm)
+
+    def update(self, chunk: memoryview):
+        self._hasher.update(chunk)
+
+    def result(self) -> str:
+        return self._hasher.hexdigest()
+
+
+class HeadSniffer(ContentConsumer):
+    """Collects the first bytes of a file"""
+
+    def __init__(self, head_size: int = DEFAULT_HEAD_SIZE):
+        super().__init__()
+        self.wants = head_size
+        self._head = bytearray()
+
+    def update(self, chunk: memoryview):
+        self._head += chunk[:self.wants - len(self._head)]
+        self.done = len(self._head) >= self.wants
+
+    @property
+    def head(self) -> bytes:
+        return bytes(self._head)
+
+    def result(self) -> bytes:
+        return self.head
+
+
+class ContentReader:
+    """Streams a file once through a set of consumers"""
+
+    def __init__(
+        self,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        mmap_threshold: int = DEFAULT_MMAP_THRESHOLD
+    ):
+        self.buffer_size = buffer_size
+        self.mmap_threshold = mmap_threshold
+        self._local = threading.local()
+
+    def read(self, file_path: str, consumers: Iterable[ContentConsumer]) -> int:
+        """
+        Feed the file to the consumers.
+
+        Returns:
+            Number of bytes read
+        """
+        consumers = [consumer for consumer in consumers if not consumer.done]
+        if not consumers:
+            return 0
+        limit = None
+        if all(consumer.wants is not None for consumer in consumers):
+            limit = max(consumer.wants for consumer in consumers)
+
+        with open(file_path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if limit is None and self.mmap_threshold and size >= self.mmap_threshold:
+                return self._read_mmap(f, size, consumers)
+            return self._read_buffered(f, consumers, limit)
+
+    def _read_buffered(self, f, consumers: List[ContentConsumer], limit: Optional[int]) -> int:
+        # One buffer per thread, reused across files
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+        total = 0
+        while consumers:
+            want = self.buffer_size if limit is None else min(self.buffer_size, limit - total)
+            if want <= 0:
+                break
+            count = f.readinto(view[:want])
+            if not count:
+                break
+            total += count
+            consumers = self._feed(view[:count], consumers)
+        return total
+
+    def _read_mmap(self, f, size: int, consumers: List[ContentConsumer]) -> int:
+        total = 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, self.buffer_size):
+                    with view[offset:offset + self.buffer_size] as chunk:
+                        total += len(chunk)
+                        consumers = self._feed(chunk, consumers)
+                    if not consumers:
+                        break
+            finally:
+                view.release()
+        return total
+
+    @staticmethod
+    def _feed(chunk: memoryview, consumers: List[ContentConsumer]) -> List[ContentConsumer]:
+        for consumer in consumers:
+            consumer.update(chunk)
+        return [consumer for consumer in consumers if not consumer.done]
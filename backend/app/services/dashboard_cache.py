@@ -0,0 +1,126 @@
+"""
+Shared dashboard snapshot with TTL, single-flight recomputation and
+explicit invalidation.
+
+All dashboard endpoints read the same in-process snapshot, so N browser
+tabs polling four endpoints cost one scan per TTL instead of 4N.
+
+Files are also moved outside the API process (the watcher, task
+workers), so invalidation crosses processes through a stamp file: any
+process that moves files calls ``mark_stale``, which touches it, and
+every cache drops its snapshot when the stamp's mtime changes.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+from app.services.simple_organizer import SimpleOrganizerService
+
+
+class SnapshotCache:
+    """Caches the result of an expensive computation for ttl_seconds"""
+
+    def __init__(self, compute: Callable[[], Dict], ttl_seconds: float, stamp_path: Optional[str] = None):
+        self.compute = compute
+        self.ttl_seconds = ttl_seconds
+        self.stamp_path = stamp_path
+        self._stamp = self._read_stamp()
+        self._cond = threading.Condition()
+        self._value: Optional[Dict] = None
+        self._expires_at = 0.0
+        self._computing = False
+        self._generation = 0
+
+    def get(self) -> Dict:
+        """Return the cached snapshot, recomputing it at most once at a time"""
+        stamp = self._read_stamp()
+        with self._cond:
+            if stamp != self._stamp:
+                # Another process moved files since the snapshot was taken
+                self._stamp = stamp
+                self._generation += 1
+                self._expires_at = 0.0
+            while True:
+                if self._value is not None and time.monotonic() < self._expires_at:
+                    return self._value
+                if not self._computing:
+                    # This caller computes; concurrent callers wait for its result
+                    self._computing = True
+                    generation = self._generation
+                    break
+                self._cond.wait()
+
+        value = None
+        try:
+            value = self.compute()
+            return value
+        finally:
+            with self._cond:
+                self._computing = False
+                if value is not None:
+                    self._value = value
+                    # An invalidation during the computation means the result may already be stale
+                    fresh = generation == self._generation
+                    self._expires_at = time.monotonic() + self.ttl_seconds if fresh else 0.0
+                self._cond.notify_all()
+
+    def invalidate(self):
+        """Force the next get() in this process to recompute"""
+        with self._cond:
+            self._generation += 1
+            self._expires_at = 0.0
+
+    def mark_stale(self):
+        """Invalidate here and, through the stamp file, in every other process"""
+        if self.stamp_path:
+            os.makedirs(os.path.dirname(self.stamp_path), exist_ok=True)
+            with open(self.stamp_path, "a"):
+                pass
+            now_ns = time.time_ns()
+            os.utime(self.stamp_path, ns=(now_ns, now_ns))
+        stamp = self._read_stamp()
+        with self._cond:
+            self._stamp = stamp
+            self._generation += 1
+            self._expires_at = 0.0
+
+    def _read_stamp(self) -> int:
+        if not self.stamp_path:
+            return 0
+        try:
+            return os.stat(self.stamp_path).st_mtime_ns
+        except OSError:
+            return 0
+
+
+def build_dashboard_snapshot(organizer: Optional[SimpleOrganizerService] = None) -> Dict:
+    """Totals, per-category counts/sizes, recent files and organized folder counts"""
+    organizer = organizer or SimpleOrganizerService()
+    stats = organizer.get_stats()  # Refreshes the scan index
+    categories = organizer.index.summarize(organizer.downloads_path)
+    recent_files, _ = organizer.query_files(
+        sort="modified",
+        order="desc",
+        limit=settings.dashboard_recent_files
+    )
+
+    return {
+        "downloads_path": organizer.downloads_path,
+        "organized_path": organizer.organized_path,
+        "total_files": sum(category["count"] for category in categories.values()),
+        "total_size_bytes": sum(category["size"] for category in categories.values()),
+        "categories": categories,
+        "recent_files": recent_files,
+        "organized_stats": stats["categories"],
+        "generated_at": time.time()
+    }
+
+
+dashboard_snapshot = SnapshotCache(
+    build_dashboard_snapshot,
+    settings.dashboard_cache_ttl_seconds,
+    stamp_path=settings.dashboard_stamp_path
+)
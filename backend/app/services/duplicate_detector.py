@@ -0,0 +1,164 @@
+"""
+Multi-stage duplicate detection engine.
+
+Files are narrowed down in three stages so that content is only read when
+it can still matter:
+
+1. group by size (stat only, no reads)
+2. hash the head and tail blocks of files whose sizes collide
+3. fully hash files that still collide after stage 2
+
+Each stage runs on a thread pool. Files small enough to be covered entirely
+by stage 2 are fully hashed there and skip stage 3.
+
+A custom full-file hasher returns ``(digest, bytes_read)`` so that the
+``bytes_read`` counter stays accurate when it serves some digests from a
+cache (0 bytes) and reads others.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.hashing import iter_file_chunks, new_hasher
+
+
+class DuplicateDetector:
+    """Find groups of files with identical content"""
+
+    def __init__(
+        self,
+        block_size: int = 64 * 1024,
+        workers: int = 4,
+        algorithm: str = "md5",
+        hash_file: Optional[Callable[[str], Tuple[str, int]]] = None
+    ):
+        self.block_size = block_size
+        self.workers = workers
+        self.algorithm = algorithm
+        self.hash_file = hash_file or self._hash_whole_file
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the counters collected by find_groups"""
+        self.stats = {
+            "files_seen": 0,
+            "size_candidates": 0,
+            "partial_hashes": 0,
+            "full_hashes": 0,
+            "bytes_read": 0
+        }
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def find_groups(self, file_paths: List[str]) -> List[Dict]:
+        """
+        Detect duplicate files.
+
+        Args:
+            file_paths: Paths of the files to compare
+
+        Returns:
+            List of groups, each with the shared checksum, the file size and
+            the duplicate paths in input order
+        """
+        paths = list(dict.fromkeys(file_paths))
+        self._count("files_seen", len(paths))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # Stage 1: group by size
+            by_size: Dict[int, List[str]] = {}
+            for path, size in zip(paths, pool.map(self._size_of, paths)):
+                if size is not None:
+                    by_size.setdefault(size, []).append(path)
+
+            candidates = [(path, size) for size, group in by_size.items() if len(group) > 1 for path in group]
+            self._count("size_candidates", len(candidates))
+
+            # Stage 2: head/tail hash (full hash for files that fit in the sampled blocks)
+            by_partial: Dict[Tuple, List[str]] = {}
+            partials = pool.map(lambda item: self._partial_hash(*item), candidates)
+            for (path, size), partial in zip(candidates, partials):
+                if partial is not None:
+                    by_partial.setdefault((size,) + partial, []).append(path)
+
+            # Stage 3: full hash only where the sampled blocks still collide
+            groups: List[Dict] = []
+            needs_full = []
+            for (size, is_complete, digest), group in by_partial.items():
+                if len(group) < 2:
+                    continue
+                if is_complete:
+                    groups.append({"checksum": digest, "size": size, "files": group})
+                else:
+                    needs_full.extend((path, size) for path in group)
+
+            by_full: Dict[Tuple[int, str], List[str]] = {}
+            digests = pool.map(lambda item: self._full_hash(item[0]), needs_full)
+            for (path, size), digest in zip(needs_full, digests):
+                if digest is not None:
+                    by_full.setdefault((size, digest), []).append(path)
+
+            groups.extend(
+                {"checksum": digest, "size": size, "files": group}
+                for (size, digest), group in by_full.items()
+                if len(group) > 1
+            )
+
+        order = {path: index for index, path in enumerate(paths)}
+        groups.sort(key=lambda group: order[group["files"][0]])
+        return groups
+
+    def _size_of(self, file_path: str) -> Optional[int]:
+        try:
+            if not os.path.isfile(file_path):
+                return None
+            return os.path.getsize(file_path)
+        except OSError:
+            return None
+
+    def _partial_hash(self, file_path: str, size: int) -> Optional[Tuple[bool, str]]:
+        """Hash the head and tail blocks; returns (covers_whole_file, digest)"""
+        hasher = new_hasher(self.algorithm)
+        try:
+            with open(file_path, "rb") as f:
+                if size <= 2 * self.block_size:
+                    data = f.read()
+                    self._count("bytes_read", len(data))
+                    hasher.update(data)
+                    self._count("partial_hashes")
+                    return True, hasher.hexdigest()
+
+                head = f.read(self.block_size)
+                f.seek(-self.block_size, os.SEEK_END)
+                tail = f.read(self.block_size)
+        except OSError:
+            return None
+
+        self._count("bytes_read", len(head) + len(tail))
+        self._count("partial_hashes")
+        hasher.update(head)
+        hasher.update(tail)
+        return False, hasher.hexdigest()
+
+    def _full_hash(self, file_path: str) -> Optional[str]:
+        try:
+            digest, bytes_read = self.hash_file(file_path)
+        except OSError:
+            return None
+        self._count("bytes_read", bytes_read)
+        self._count("full_hashes")
+        return digest
+
+    def _hash_whole_file(self, file_path: str) -> Tuple[str, int]:
+        hasher = new_hasher(self.algorithm)
+        bytes_read = 0
+        with open(file_path, "rb", buffering=0) as f:
+            for chunk in iter_file_chunks(f):
+                bytes_read += len(chunk)
+                hasher.update(chunk)
+        return hasher.hexdigest(), bytes_read
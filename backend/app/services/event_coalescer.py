@@ -0,0 +1,187 @@
+"""
+Per-path debouncing of watcher events with write-completion detection.
+
+A single download produces a burst of created/modified events (and often a
+rename from ``.crdownload``/``.part``). Rather than sleeping a fixed second
+after the first event, each path is tracked until it is known to be
+complete:
+
+* a close-after-write event (inotify ``IN_CLOSE_WRITE``) completes it
+  immediately, or
+* its size and mtime are unchanged for ``stable_seconds`` with no new
+  events in between.
+
+Pending paths sit in a heap ordered by when they are next due for a
+check. The poller wakes on a fixed ``poll_interval`` tick and stats only
+the paths that are due, so a burst of events costs a few stats per path
+rather than one per pending path per event. ``dispatch`` always runs on
+the poller thread, never on the watcher's.
+
+Only complete, non-empty files are handed to ``dispatch``. Zero-byte files
+are dropped once stable; browsers create them as placeholders and
+rename the real file over them later, which arrives as a fresh event.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class _PendingFile:
+    __slots__ = ("signature", "stable_since", "token")
+
+    def __init__(self):
+        self.signature: Optional[Tuple[int, int]] = None  # (size, mtime_ns) at last check
+        self.stable_since = 0.0
+        self.token = 0  # Heap entry that is current for this path; older ones are skipped
+
+
+class EventCoalescer:
+    """Collapses events per path and dispatches each file once it is fully written"""
+
+    def __init__(self, dispatch: Callable[[str], None], stable_seconds: float = 2.0, poll_interval: float = 0.5):
+        self.dispatch = dispatch
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._pending: Dict[str, _PendingFile] = {}
+        self._due: List[Tuple[float, int, str]] = []  # (check at, token, path)
+        self._closed: List[str] = []  # Complete paths waiting to be dispatched
+        self._tokens = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._metrics = {
+            "events_received": 0,
+            "events_coalesced": 0,
+            "dispatched": 0,
+            "dropped": 0
+        }
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="event-coalescer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def touch(self, file_path: str):
+        """Record a created/modified event; restarts the stability window for the path"""
+        with self._cond:
+            self._metrics["events_received"] += 1
+            pending = self._pending.get(file_path)
+            if pending is None:
+                wake = not self._pending and not self._closed
+                pending = self._pending[file_path] = _PendingFile()
+                self._schedule(file_path, pending, time.monotonic())  # First check takes the signature
+                if wake:
+                    self._cond.notify_all()
+            else:
+                # The next due check sees a changed signature and restarts the window
+                self._metrics["events_coalesced"] += 1
+                pending.signature = None
+
+    def close(self, file_path: str):
+        """Record a close-after-write event; the file is complete as of now"""
+        with self._cond:
+            self._metrics["events_received"] += 1
+            if self._pending.pop(file_path, None) is not None:
+                self._metrics["events_coalesced"] += 1
+            # Dispatch may block on a full queue, so it happens on the poller thread
+            self._closed.append(file_path)
+            self._cond.notify_all()
+
+    def discard(self, file_path: str):
+        """Forget a path that was deleted or renamed away"""
+        with self._cond:
+            self._metrics["events_received"] += 1
+            if self._pending.pop(file_path, None) is not None:
+                self._metrics["dropped"] += 1
+
+    def metrics(self) -> Dict[str, int]:
+        with self._cond:
+            return {**self._metrics, "pending": len(self._pending)}
+
+    def _schedule(self, file_path: str, pending: _PendingFile, check_at: float):
+        pending.token = next(self._tokens)
+        heapq.heappush(self._due, (check_at, pending.token, file_path))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    closed, self._closed = self._closed, []
+                    break
+                if not self._pending and not self._closed:
+                    self._cond.wait()
+                    continue
+                if not self._closed:
+                    self._cond.wait(self.poll_interval)
+                closed, self._closed = self._closed, []
+                now = time.monotonic()
+                due = []
+                while self._due and self._due[0][0] <= now:
+                    _, token, file_path = heapq.heappop(self._due)
+                    pending = self._pending.get(file_path)
+                    if pending is not None and pending.token == token:
+                        due.append(file_path)
+
+            for file_path in closed:
+                self._finish(file_path)
+            for file_path in due:
+                if self._check(file_path):
+                    self._finish(file_path)
+
+        # Files already known to be complete are still handed over on stop
+        for file_path in closed:
+            self._finish(file_path)
+
+    def _check(self, file_path: str) -> bool:
+        """Return True (and stop tracking the path) once it has been stable for the window"""
+        try:
+            stat = os.stat(file_path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            signature = None
+
+        now = time.monotonic()
+        with self._cond:
+            pending = self._pending.get(file_path)
+            if pending is None:
+                return False  # Completed or discarded meanwhile
+            if signature is None:
+                del self._pending[file_path]
+                self._metrics["dropped"] += 1
+                return False
+            if pending.signature != signature:
+                pending.signature = signature
+                pending.stable_since = now
+                self._schedule(file_path, pending, now + self.stable_seconds)
+                return False
+            if now - pending.stable_since < self.stable_seconds:
+                self._schedule(file_path, pending, pending.stable_since + self.stable_seconds)
+                return False
+            del self._pending[file_path]
+            return True
+
+    def _finish(self, file_path: str):
+        try:
+            complete = os.path.getsize(file_path) > 0
+        except OSError:
+            complete = False
+
+        with self._cond:
+            self._metrics["dispatched" if complete else "dropped"] += 1
+        if complete:
+            self.dispatch(file_path)
@@ -0,0 +1,266 @@
+"""
+Time-ordered expiry index for downloads cleanup.
+
+Every file below the downloads folder is recorded with its retention rule
+(``temp`` for temporary files, otherwise its category) and mtime_ns,
+indexed by (rule, mtime_ns). Cleanup then asks each rule for files older
+than its cutoff, oldest first, instead of stat-ing the whole tree.
+
+Scans, the watcher and both organizers (which record every move) keep
+the index up to date. An entry can still be
+stale (a file modified without an event we saw), so cleanup re-stats each
+candidate before deleting: a file that turns out to be newer is
+re-recorded and skipped, and a file that is gone is dropped.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from fnmatch import fnmatch
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.classifier import get_classifier
+
+TEMP_RULE = "temp"
+NS_PER_DAY = 86400 * 10**9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS expiry (
+    path TEXT PRIMARY KEY,
+    rule TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS expiry_rule_mtime ON expiry (rule, mtime_ns);
+"""
+
+
+class RetentionPolicy:
+    """Maps a file to its retention rule and a rule to its retention in days"""
+
+    def __init__(
+        self,
+        categories: Dict[str, List[str]],
+        default_days: Optional[float],
+        temp_days: Optional[float],
+        temp_patterns: Iterable[str],
+        category_days: Optional[Dict[str, float]] = None
+    ):
+        self.classifier = get_classifier(categories, default="other")
+        self.default_days = default_days
+        self.temp_days = temp_days
+        self.temp_patterns = [pattern.lower() for pattern in temp_patterns]
+        self.category_days = {category.lower(): days for category, days in (category_days or {}).items()}
+
+    def rule_for(self, file_path: str) -> str:
+        name = os.path.basename(file_path).lower()
+        if any(fnmatch(name, pattern) for pattern in self.temp_patterns):
+            return TEMP_RULE
+        return self.classifier.classify(file_path).lower()
+
+    def days_for(self, rule: str) -> Optional[float]:
+        """Retention for a rule; None or 0 keeps files forever"""
+        if rule == TEMP_RULE:
+            return self.temp_days
+        return self.category_days.get(rule, self.default_days)
+
+
+class ExpiryIndex:
+    """SQLite-backed (rule, mtime) index of files in the downloads folder"""
+
+    def __init__(self, index_path: str, policy: RetentionPolicy):
+        self.index_path = index_path
+        self.policy = policy
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(index_path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def record(self, file_path: str, stat: Optional[os.stat_result] = None):
+        """Add or refresh one file (stat is taken if not given)"""
+        try:
+            stat = stat or os.stat(file_path)
+        except OSError:
+            self.remove(file_path)
+            return
+        self.record_many([(file_path, stat)])
+
+    def record_many(self, files: Iterable[Tuple[str, os.stat_result]]):
+        rows = self._rows(files)
+        if not rows:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO expiry (path, rule, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def remove(self, file_path: str):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM expiry WHERE path = ?", (file_path,))
+
+    def move(self, src_path: str, dest_path: str):
+        """Follow a rename; the rule is recomputed from the new name"""
+        self.move_many([(src_path, dest_path)])
+
+    def move_many(self, moves: Iterable[Tuple[str, str]]):
+        """Follow several renames (src_path, dest_path) in one transaction"""
+        moves = list(moves)
+        if not moves:
+            return
+        files = []
+        for _, dest_path in moves:
+            try:
+                files.append((dest_path, os.stat(dest_path)))
+            except OSError:
+                continue  # Gone again already
+        rows = self._rows(files)
+        conn = self._connection()
+        with conn:
+            conn.executemany("DELETE FROM expiry WHERE path = ?", [(src_path,) for src_path, _ in moves])
+            conn.executemany(
+                "INSERT OR REPLACE INTO expiry (path, rule, mtime_ns, size) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def _rows(self, files: Iterable[Tuple[str, os.stat_result]]) -> List[Tuple[str, str, int, int]]:
+        return [
+            (file_path, self.policy.rule_for(file_path), stat.st_mtime_ns, stat.st_size)
+            for file_path, stat in files
+        ]
+
+    def is_empty(self) -> bool:
+        return self._connection().execute("SELECT 1 FROM expiry LIMIT 1").fetchone() is None
+
+    def due(
+        self,
+        now: Optional[float] = None,
+        limit: int = 100,
+        default_days: Optional[float] = None,
+        after: Optional[Tuple[int, str]] = None
+    ) -> List[Dict]:
+        """
+        Files past their rule's cutoff, oldest first.
+
+        Args:
+            now: Reference time (seconds since the epoch)
+            limit: Maximum number of files to return
+            default_days: Override the retention for category rules without
+                their own setting
+            after: Only return files after this (mtime_ns, path), for paging
+        """
+        now_ns = int((now if now is not None else time.time()) * 10**9)
+        conn = self._connection()
+        rules = [row[0] for row in conn.execute("SELECT DISTINCT rule FROM expiry")]
+
+        candidates = []
+        for rule in rules:
+            days = self.policy.days_for(rule)
+            if default_days is not None and rule != TEMP_RULE and rule not in self.policy.category_days:
+                days = default_days
+            if not days or days <= 0:
+                continue
+            cutoff_ns = now_ns - int(days * NS_PER_DAY)
+            sql = "SELECT path, mtime_ns, size FROM expiry WHERE rule = ? AND mtime_ns < ?"
+            params: list = [rule, cutoff_ns]
+            if after is not None:
+                sql += " AND (mtime_ns, path) > (?, ?)"
+                params.extend(after)
+            candidates.extend(
+                {"path": path, "rule": rule, "mtime_ns": mtime_ns, "size": size, "cutoff_ns": cutoff_ns}
+                for path, mtime_ns, size in conn.execute(sql + " ORDER BY mtime_ns, path LIMIT ?", params + [limit])
+            )
+
+        candidates.sort(key=lambda candidate: (candidate["mtime_ns"], candidate["path"]))
+        return candidates[:limit]
+
+    def expire(
+        self,
+        dry_run: bool = False,
+        default_days: Optional[float] = None,
+        batch_size: int = 200,
+        batch_interval: float = 0.0
+    ) -> Iterator[Dict]:
+        """
+        Delete expired files in batches, pausing batch_interval seconds between them.
+
+        Each candidate is re-stat'ed first. Yields one record per candidate
+        with an action: deleted, would_delete (dry run), rescheduled (the
+        file is newer than indexed), missing or error.
+        """
+        now = time.time()
+        after = None
+        while True:
+            batch = self.due(now, limit=batch_size, default_days=default_days, after=after)
+            if not batch:
+                return
+            after = (batch[-1]["mtime_ns"], batch[-1]["path"])
+
+            for candidate in batch:
+                file_path = candidate["path"]
+                record = {
+                    "path": file_path,
+                    "rule": candidate["rule"],
+                    "size": candidate["size"],
+                    "modified": datetime.fromtimestamp(candidate["mtime_ns"] / 10**9)
+                }
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    self.remove(file_path)
+                    yield {**record, "action": "missing"}
+                    continue
+                except OSError as e:
+                    yield {**record, "action": "error", "error": str(e)}
+                    continue
+
+                if stat.st_mtime_ns >= candidate["cutoff_ns"]:
+                    self.record(file_path, stat)
+                    yield {**record, "action": "rescheduled"}
+                elif dry_run:
+                    yield {**record, "action": "would_delete"}
+                else:
+                    try:
+                        os.remove(file_path)
+                    except OSError as e:
+                        yield {**record, "action": "error", "error": str(e)}
+                        continue
+                    self.remove(file_path)
+                    yield {**record, "action": "deleted"}
+
+            if len(batch) < batch_size:
+                return
+            if batch_interval:
+                time.sleep(batch_interval)
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM expiry").fetchone()[0]
+
+
+def get_expiry_index() -> ExpiryIndex:
+    return ExpiryIndex(
+        settings.expiry_index_path,
+        RetentionPolicy(
+            settings.default_categories,
+            default_days=settings.cleanup_old_files_days,
+            temp_days=settings.cleanup_temp_files_days,
+            temp_patterns=settings.cleanup_temp_patterns,
+            category_days=settings.cleanup_category_days
+        )
+    )
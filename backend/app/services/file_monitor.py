@@ -3,60 +3,155 @@ File monitoring service for watching the downloads folder.
 """
 
 import os
-import asyncio
-from pathlib import Path
+import time
+from datetime import datetime
+from itertools import islice
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from typing import List, Callable
+from typing import Iterable, List, Callable, Optional
 
 from app.core.config import settings
+from app.services.classifier import get_classifier, get_extension_filter
+from app.services.dashboard_cache import dashboard_snapshot
+from app.services.event_coalescer import EventCoalescer
+from app.services.expiry_index import ExpiryIndex, get_expiry_index
 from app.services.file_organizer import FileOrganizerService
+from app.services.walker import walk_files
+from app.services.work_queue import WorkQueue
 
 class DownloadsHandler(FileSystemEventHandler):
     """Handler for file system events in the downloads folder"""
     
-    def __init__(self, organizer: FileOrganizerService, callback: Callable = None):
+    def __init__(
+        self,
+        organizer: FileOrganizerService,
+        callback: Callable = None,
+        expiry_index: Optional[ExpiryIndex] = None
+    ):
         self.organizer = organizer
         self.callback = callback
+        self.expiry_index = expiry_index
         self.supported_extensions = settings.supported_extensions
+        self.extension_filter = get_extension_filter(self.supported_extensions)
+        # The organizer's own moves land inside the watched tree; never queue them again
+        self.organized_roots = tuple(
+            os.path.normcase(os.path.abspath(root)) + os.sep for root in organizer.target_roots()
+        )
+        # Watchdog's thread has no event loop and must not stall, so complete
+        # files are handed to a bounded queue drained by organizer workers
+        self.queue = WorkQueue(
+            self._process_batch,
+            workers=settings.watch_workers,
+            maxsize=settings.watch_queue_size,
+            put_timeout=settings.watch_queue_put_timeout,
+            spill_path=settings.watch_spill_path,
+            batch_size=settings.watch_batch_size,
+            flush_interval=settings.watch_flush_interval
+        )
+        # A download fires many events; only organize once it's fully written
+        self.coalescer = EventCoalescer(
+            self.queue.put,
+            stable_seconds=settings.watch_stable_seconds,
+            poll_interval=settings.watch_poll_interval
+        )
+    
+    def start(self):
+        self.queue.start()
+        self.coalescer.start()
+    
+    def stop(self):
+        self.coalescer.stop()
+        self.queue.stop()
+    
+    def metrics(self) -> dict:
+        return {
+            "events": self.coalescer.metrics(),
+            "queue": self.queue.metrics(),
+            "mime": self.organizer.mime_detector.metrics()
+        }
     
     def on_created(self, event):
         """Handle file creation events"""
+        if event.is_directory:
+            return
+        if self.expiry_index:
+            self.expiry_index.record(event.src_path)
+        if self._should_organize(event.src_path):
+            self.coalescer.touch(event.src_path)
+    
+    def on_modified(self, event):
+        """Handle file write events"""
+        if not event.is_directory and self._should_organize(event.src_path):
+            self.coalescer.touch(event.src_path)
+    
+    def on_closed(self, event):
+        """Handle close-after-write events (inotify only)"""
+        if event.is_directory:
+            return
+        if self.expiry_index:
+            self.expiry_index.record(event.src_path)
+        if self._should_organize(event.src_path):
+            self.coalescer.close(event.src_path)
+    
+    def on_moved(self, event):
+        """Handle renames, e.g. a finished .crdownload becoming the real file"""
+        if event.is_directory:
+            return
+        if self.expiry_index:
+            self.expiry_index.move(event.src_path, event.dest_path)
+        self.coalescer.discard(event.src_path)
+        if self._should_organize(event.dest_path):
+            self.coalescer.touch(event.dest_path)
+    
+    def on_deleted(self, event):
+        """Handle file deletion events"""
         if not event.is_directory:
-            file_path = event.src_path
-            if self._should_organize(file_path):
-                # Process file asynchronously
-                asyncio.create_task(self._process_file(file_path))
+            if self.expiry_index:
+                self.expiry_index.remove(event.src_path)
+            self.coalescer.discard(event.src_path)
     
     def _should_organize(self, file_path: str) -> bool:
-        """Check if file should be organized"""
-        file_ext = Path(file_path).suffix.lower()
-        return file_ext in self.supported_extensions
+        """Check if file should be organized (supported and not already in a category folder)"""
+        if os.path.normcase(os.path.abspath(file_path)).startswith(self.organized_roots):
+            return False
+        return self.extension_filter.matches(file_path)
     
-    async def _process_file(self, file_path: str):
-        """Process a new file"""
-        try:
-            # Wait a moment for file to be fully written
-            await asyncio.sleep(1)
-            
-            # Check if file still exists and is accessible
-            if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                # Organize the file
-                result = self.organizer.organize_file(file_path)
-                
-                # Call callback if provided
-                if self.callback:
-                    await self.callback(result)
-                    
-        except Exception as e:
-            print(f"Error processing file {file_path}: {e}")
+    def _process_batch(self, file_paths: List[str]):
+        """Organize a micro-batch of complete files (runs on a queue worker thread)"""
+        # Skip files that were moved or deleted while queued
+        file_paths = [file_path for file_path in file_paths if os.path.exists(file_path)]
+        if not file_paths:
+            return
+        
+        results = self.organizer.organize_batch(file_paths)
+        # Never raises for DB errors: the moves already happened, so the
+        # expiry index and callbacks below must see them either way
+        self.organizer.record_results(results)
+        if self.expiry_index:
+            # Organized files stay under downloads_path, just somewhere else
+            self.expiry_index.move_many(
+                (result["original_path"], result["new_path"]) for result in results if result["success"]
+            )
+        
+        # The watcher runs outside the API process; the stamp reaches its dashboard cache
+        if any(result["success"] for result in results):
+            dashboard_snapshot.mark_stale()
+        
+        # Call callback if provided
+        if self.callback:
+            for result in results:
+                self.callback(result)
 
 class FileMonitorService:
     """Service for monitoring the downloads folder"""
     
     def __init__(self):
         self.organizer = FileOrganizerService()
+        self.expiry_index = get_expiry_index()
+        self.classifier = get_classifier(settings.default_categories)
+        self.extension_filter = get_extension_filter(settings.supported_extensions)
         self.observer = None
+        self.handler = None
         self.is_monitoring = False
     
     async def start_monitoring(self):
@@ -71,13 +166,15 @@ class FileMonitorService:
         
         # Set up file system observer
         self.observer = Observer()
-        handler = DownloadsHandler(
+        self.handler = DownloadsHandler(
             self.organizer, 
-            callback=self._on_file_organized
+            callback=self._on_file_organized,
+            expiry_index=self.expiry_index
         )
+        self.handler.start()
         
         self.observer.schedule(
-            handler, 
+            self.handler, 
             downloads_path, 
             recursive=settings.watch_recursive
         )
@@ -93,10 +190,15 @@ class FileMonitorService:
         if self.observer and self.is_monitoring:
             self.observer.stop()
             self.observer.join()
+            self.handler.stop()
             self.is_monitoring = False
             print("Stopped monitoring downloads folder")
     
-    async def _on_file_organized(self, result: dict):
+    def get_metrics(self) -> dict:
+        """Watcher event counters, work queue depth and latency, and MIME tier counts"""
+        return self.handler.metrics() if self.handler else {}
+    
+    def _on_file_organized(self, result: dict):
         """Callback when a file is organized"""
         if result["success"]:
             print(f"Organized: {result['original_path']} -> {result['new_path']}")
@@ -105,84 +207,153 @@ class FileMonitorService:
     
     def scan_existing_files(self) -> List[dict]:
         """Scan existing files in downloads folder"""
-        downloads_path = settings.downloads_path
         results = []
+        self.ingest_existing_files(on_chunk=results.extend)
+        return results
+    
+    def ingest_existing_files(
+        self,
+        chunk_size: Optional[int] = None,
+        on_chunk: Optional[Callable[[List[dict]], None]] = None
+    ) -> dict:
+        """
+        Bulk-add existing files in the downloads folder to the database.
         
-        if not os.path.exists(downloads_path):
-            return results
+        Walker output is consumed chunk_size entries at a time: one
+        set-based query finds the paths already recorded, and the rest are
+        inserted with bulk_insert_mappings in one transaction per chunk.
+        Memory stays bounded by the chunk size; per-file results are only
+        kept if on_chunk collects them.
         
-        for root, dirs, files in os.walk(downloads_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if self._should_organize(file_path):
-                    # Just scan and add to database, don't organize yet
-                    result = self._scan_file(file_path)
-                    results.append(result)
+        Returns:
+            Summary with counts, elapsed time and rows_per_second
+        """
+        downloads_path = settings.downloads_path
+        if not os.path.exists(downloads_path):
+            return self.ingest_entries([], chunk_size, on_chunk)
         
-        return results
+        entries = walk_files(
+            downloads_path,
+            include=settings.scan_include_patterns,
+            exclude=settings.scan_exclude_patterns,
+            max_depth=settings.scan_max_depth
+        )
+        return self.ingest_entries(entries, chunk_size, on_chunk)
     
-    def _scan_file(self, file_path: str) -> dict:
-        """Scan a file and add to database without organizing"""
+    def ingest_entries(
+        self,
+        entries: Iterable[os.DirEntry],
+        chunk_size: Optional[int] = None,
+        on_chunk: Optional[Callable[[List[dict]], None]] = None
+    ) -> dict:
+        """Bulk-add walker entries to the database, chunk by chunk (see ingest_existing_files)"""
+        chunk_size = chunk_size or settings.scan_ingest_chunk_size
+        summary = {"files_seen": 0, "inserted": 0, "already_present": 0, "failed": 0, "chunks": 0}
+        started = time.perf_counter()
+        entries = iter(entries)
+        
+        from app.core.database import SessionLocal
+        
+        db = SessionLocal()
         try:
-            import os
-            from datetime import datetime
-            from pathlib import Path
-            
-            # Get file info
-            stat = os.stat(file_path)
-            file_size = stat.st_size
-            created_time = datetime.fromtimestamp(stat.st_ctime)
-            
-            # Determine category
-            file_ext = Path(file_path).suffix.lower()
-            category = None
-            for cat, extensions in settings.default_categories.items():
-                if file_ext in extensions:
-                    category = cat
+            while True:
+                chunk = list(islice(entries, chunk_size))
+                if not chunk:
                     break
-            
-            # Add to database
-            from app.core.database import SessionLocal
-            from app.models.file import File
-            
-            db = SessionLocal()
+                # Every file counts for cleanup, not only the ones we organize
+                self._record_expiry(chunk)
+                chunk = [entry for entry in chunk if self._should_organize(entry.path)]
+                if not chunk:
+                    continue
+                results = self._ingest_chunk(db, chunk)
+                summary["chunks"] += 1
+                summary["files_seen"] += len(results)
+                for result in results:
+                    if not result["success"]:
+                        summary["failed"] += 1
+                    elif result.get("inserted"):
+                        summary["inserted"] += 1
+                    else:
+                        summary["already_present"] += 1
+                if on_chunk:
+                    on_chunk(results)
+        finally:
+            db.close()
+        
+        elapsed = time.perf_counter() - started
+        summary["elapsed_seconds"] = round(elapsed, 3)
+        summary["rows_per_second"] = round(summary["inserted"] / elapsed, 1) if elapsed > 0 else 0.0
+        return summary
+    
+    def _record_expiry(self, entries: List[os.DirEntry]):
+        stats = []
+        for entry in entries:
             try:
-                # Check if file already exists
-                existing_file = db.query(File).filter(File.original_path == file_path).first()
-                if existing_file:
-                    return {"success": True, "message": "File already in database", "file_path": file_path}
-                
-                # Create new file record
-                file_record = File(
-                    original_name=os.path.basename(file_path),
-                    original_path=file_path,
-                    file_size=file_size,
-                    file_type=file_ext,
-                    category=category,
-                    created_at=created_time,
-                    is_organized=False
-                )
-                db.add(file_record)
-                db.commit()
-                
-                return {
+                stats.append((entry.path, entry.stat()))
+            except OSError:
+                continue
+        self.expiry_index.record_many(stats)
+    
+    def _ingest_chunk(self, db, entries: List[os.DirEntry]) -> List[dict]:
+        """Record one chunk of files: one existence query, one bulk insert, one commit"""
+        from app.models.file import File
+        
+        results = []
+        rows = []
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError as e:
+                results.append({"success": False, "file_path": entry.path, "error": str(e)})
+                continue
+            file_ext, category = self.classifier.match(entry.path)
+            rows.append({
+                "original_name": entry.name,
+                "original_path": entry.path,
+                "file_size": stat.st_size,
+                "file_type": file_ext,
+                "category": category,
+                "created_at": datetime.fromtimestamp(stat.st_ctime),
+                "is_organized": False
+            })
+        
+        try:
+            # Already recorded at its current location: pending at that path, or organized into it
+            paths = [row["original_path"] for row in rows]
+            existing = {
+                path for (path,) in
+                db.query(File.original_path).filter(File.original_path.in_(paths), File.is_organized == False)  # noqa: E712
+            }
+            existing.update(
+                path for (path,) in
+                db.query(File.new_path).filter(File.new_path.in_(paths))
+            )
+            new_rows = [row for row in rows if row["original_path"] not in existing]
+            if new_rows:
+                db.bulk_insert_mappings(File, new_rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Error ingesting {len(rows)} files: {e}")
+            results.extend(
+                {"success": False, "file_path": row["original_path"], "error": str(e)}
+                for row in rows
+            )
+            return results
+        
+        for row in rows:
+            if row["original_path"] in existing:
+                results.append({"success": True, "message": "File already in database", "file_path": row["original_path"]})
+            else:
+                results.append({
                     "success": True,
-                    "file_path": file_path,
-                    "category": category,
+                    "inserted": True,
+                    "file_path": row["original_path"],
+                    "category": row["category"],
                     "message": "File added to database"
-                }
-            finally:
-                db.close()
-                
-        except Exception as e:
-            print(f"Error scanning file {file_path}: {e}")
-            return {
-                "success": False,
-                "file_path": file_path,
-                "error": str(e)
-            }
+                })
+        return results
     
     def _should_organize(self, file_path: str) -> bool:
         """Check if file should be organized"""
-        file_ext = Path(file_path).suffix.lower()
-        return file_ext in settings.supported_extensions
+        return self.extension_filter.matches(file_path)
@@ -2,19 +2,28 @@
 File organization service for intelligent file categorization and naming.
 """
 
+import logging
 import os
-import shutil
-import hashlib
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, List, Tuple
-import magic
 from PIL import Image
 import PyPDF2
 
 from app.core.config import settings
+from app.core.database import SessionLocal
+from sqlalchemy.orm import Session
 from app.models.file import File
 from app.models.organization_rule import OrganizationRule
+from app.services.checksum_cache import get_checksum_cache
+from app.services.classifier import get_classifier
+from app.services.content_reader import ContentReader, HashConsumer, HeadSniffer
+from app.services.duplicate_detector import DuplicateDetector
+from app.services.hashing import FileHasher
+from app.services.mime_detector import get_mime_detector
+from app.services.name_allocator import NameAllocatorRegistry, move_into_place
+
+logger = logging.getLogger(__name__)
 
 class FileOrganizerService:
     """Service for organizing and categorizing files"""
@@ -22,6 +31,19 @@ class FileOrganizerService:
     def __init__(self):
         self.supported_extensions = settings.supported_extensions
         self.default_categories = settings.default_categories
+        self.classifier = get_classifier(self.default_categories, default="other")
+        self.checksum_cache = get_checksum_cache(settings.checksum_cache_path)
+        self.name_allocators = NameAllocatorRegistry()
+        self.hasher = FileHasher(
+            algorithm=settings.hash_algorithm,
+            buffer_size=settings.hash_buffer_size,
+            mmap_threshold=settings.hash_mmap_threshold
+        )
+        self.mime_detector = get_mime_detector()
+        self.content_reader = ContentReader(
+            buffer_size=settings.hash_buffer_size,
+            mmap_threshold=settings.hash_mmap_threshold
+        )
     
     def organize_file(self, file_path: str) -> Dict:
         """
@@ -33,80 +55,203 @@ class FileOrganizerService:
         Returns:
             Dict with organization results
         """
-        try:
-            # Get file information
-            file_info = self._get_file_info(file_path)
-            
-            # Determine category
-            category = self._determine_category(file_path, file_info)
-            
-            # Generate new name
-            new_name = self._generate_smart_name(file_path, file_info, category)
-            
-            # Determine target folder
-            target_folder = self._get_target_folder(category)
-            
-            # Create target directory if it doesn't exist
+        return self.organize_batch([file_path])[0]
+    
+    def organize_batch(self, file_paths: List[str]) -> List[Dict]:
+        """
+        Organize several files together.
+        
+        Every file is classified and named first; each distinct target
+        folder is then created once and the files are moved into it.
+        
+        Returns:
+            One result dict per path, in order
+        """
+        results: List[Optional[Dict]] = [None] * len(file_paths)
+        target_folders: Dict[str, str] = {}
+        planned = []
+        
+        for index, file_path in enumerate(file_paths):
+            try:
+                # Get file information
+                file_info = self._get_file_info(file_path)
+                
+                # Determine category and generate new name
+                category = self._determine_category(file_path, file_info)
+                new_name = self._generate_smart_name(file_path, file_info, category)
+                
+                # Determine target folder (once per category for the batch)
+                if category not in target_folders:
+                    target_folders[category] = self._get_target_folder(category)
+                planned.append((index, file_path, file_info, category, new_name))
+            except Exception as e:
+                results[index] = self._error_result(file_path, e)
+        
+        # Create target directories if they don't exist
+        for target_folder in set(target_folders.values()):
             os.makedirs(target_folder, exist_ok=True)
-            
-            # Generate new path
-            new_path = os.path.join(target_folder, new_name)
-            
-            # Handle duplicates
-            new_path = self._handle_duplicates(new_path)
-            
-            # Move file
-            shutil.move(file_path, new_path)
-            
-            return {
-                "success": True,
-                "original_path": file_path,
-                "new_path": new_path,
-                "category": category,
-                "new_name": new_name,
-                "file_info": file_info
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "original_path": file_path
+        
+        for index, file_path, file_info, category, new_name in planned:
+            target_folder = target_folders[category]
+            try:
+                # Handle duplicates (reserves the name with an empty placeholder)
+                new_path = self._handle_duplicates(os.path.join(target_folder, new_name))
+                
+                # Move file
+                try:
+                    move_into_place(file_path, new_path)
+                except Exception:
+                    self.name_allocators.get(target_folder).release(new_path, remove_placeholder=True)
+                    raise
+                
+                results[index] = {
+                    "success": True,
+                    "original_path": file_path,
+                    "new_path": new_path,
+                    "category": category,
+                    "new_name": new_name,
+                    "file_info": file_info
+                }
+            except Exception as e:
+                results[index] = self._error_result(file_path, e)
+        
+        return results
+    
+    def record_results(self, results: List[Dict], db: Optional[Session] = None) -> int:
+        """
+        Save successful organize results to the database.
+        
+        Each organize is its own row, so a new download that reuses an old
+        file name never overwrites the earlier file's history. The only row
+        updated in place is a pending one (is_organized false, same
+        original_path) left by an ingest scan.
+        
+        The batch is written in one transaction. The files have already
+        been moved, so if that commit fails it is rolled back and each
+        result is retried on its own; only rows that still fail are lost
+        (and logged). Every successful result gets a "recorded" flag. Pass
+        db to reuse a session across calls; it is committed but not closed.
+        
+        Returns:
+            Number of results recorded
+        """
+        moved = [result for result in results if result["success"]]
+        if not moved:
+            return 0
+        
+        session = db or SessionLocal()
+        try:
+            try:
+                self._save_results(session, moved)
+                session.commit()
+                recorded = moved
+            except Exception:
+                session.rollback()
+                logger.exception("Error recording %d organized files, retrying one by one", len(moved))
+                recorded = []
+                for result in moved:
+                    try:
+                        self._save_results(session, [result])
+                        session.commit()
+                        recorded.append(result)
+                    except Exception:
+                        session.rollback()
+                        logger.exception("Error recording %s -> %s", result["original_path"], result["new_path"])
+        finally:
+            if db is None:
+                session.close()
+        
+        recorded_ids = {id(result) for result in recorded}
+        for result in moved:
+            result["recorded"] = id(result) in recorded_ids
+        return len(recorded)
+    
+    def _save_results(self, session: Session, results: List[Dict]):
+        """Add rows for organize results to the session (not committed)"""
+        rows = [
+            {
+                "original_name": os.path.basename(result["original_path"]),
+                "new_name": result.get("new_name"),
+                "original_path": result["original_path"],
+                "new_path": result.get("new_path"),
+                "file_size": result["file_info"]["size"],
+                "file_type": result["file_info"]["extension"],
+                "category": result.get("category"),
+                "mime_type": result["file_info"]["mime_type"],
+                "is_organized": True,
+                "checksum": result["file_info"]["checksum"]
             }
+            for result in results
+        ]
+        pending = {}
+        for record in session.query(File).filter(
+            File.original_path.in_([row["original_path"] for row in rows]),
+            File.is_organized == False  # noqa: E712
+        ):
+            pending.setdefault(record.original_path, record)
+        for row in rows:
+            record = pending.pop(row["original_path"], None)
+            if record is None:
+                session.add(File(**row))
+            else:
+                for column, value in row.items():
+                    setattr(record, column, value)
+    
+    def _error_result(self, file_path: str, error: Exception) -> Dict:
+        return {
+            "success": False,
+            "error": str(error),
+            "original_path": file_path
+        }
     
     def _get_file_info(self, file_path: str) -> Dict:
-        """Extract file information and metadata"""
-        stat = os.stat(file_path)
+        """
+        Extract file information and metadata.
         
-        # Get MIME type
-        mime_type = magic.from_file(file_path, mime=True)
+        The content is read at most once: the MIME type comes from the
+        extension when it is trusted and is otherwise sniffed from the first
+        bytes, and the checksum (unless cached) comes from the same pass.
+        """
+        stat = os.stat(file_path)
         
         # Get file extension
         file_ext = Path(file_path).suffix.lower()
         
-        # Calculate checksum for duplicate detection
-        checksum = self._calculate_checksum(file_path)
+        # Get MIME type, reading the head only if the extension can't be trusted
+        consumers = []
+        mime_type, mime_tier = self.mime_detector.detect_without_content(file_ext, stat)
+        if mime_type is None:
+            sniffer = HeadSniffer(settings.mime_sniff_bytes)
+            consumers.append(sniffer)
+        
+        # Calculate checksum for duplicate detection, unless it is cached
+        checksum = self.checksum_cache.lookup(stat, self.hasher.algorithm)
+        if checksum is None:
+            hasher = HashConsumer(self.hasher.algorithm)
+            consumers.append(hasher)
+        
+        self.content_reader.read(file_path, consumers)
+        
+        if mime_type is None:
+            mime_type, mime_tier = self.mime_detector.detect_head(sniffer.head, stat)
+        if checksum is None:
+            checksum = hasher.result()
+            self.checksum_cache.store(stat, self.hasher.algorithm, checksum)
         
         return {
             "size": stat.st_size,
             "created": datetime.fromtimestamp(stat.st_ctime),
             "modified": datetime.fromtimestamp(stat.st_mtime),
             "mime_type": mime_type,
+            "mime_tier": mime_tier,  # Which detection tier decided (see mime_detector)
             "extension": file_ext,
             "checksum": checksum
         }
     
     def _determine_category(self, file_path: str, file_info: Dict) -> str:
         """Determine the category for a file"""
-        file_ext = file_info["extension"]
-        
-        # Check against default categories
-        for category, extensions in self.default_categories.items():
-            if file_ext in extensions:
-                return category
-        
-        # Default to "other" if no category matches
-        return "other"
+        # Check against default categories, defaulting to "other" if none match
+        return self.classifier.classify(file_path)
     
     def _generate_smart_name(self, file_path: str, file_info: Dict, category: str) -> str:
         """Generate a smart name for the file"""
@@ -153,48 +298,46 @@ class FileOrganizerService:
         year_month = now.strftime("%Y-%m")
         return os.path.join(category_folder, year_month)
     
+    def target_roots(self) -> List[str]:
+        """Category folders the organizer moves files into (see _get_target_folder)"""
+        categories = list(self.default_categories) + ["other"]
+        return sorted({os.path.join(settings.downloads_path, category.title()) for category in categories})
+    
     def _handle_duplicates(self, target_path: str) -> str:
         """Handle duplicate file names"""
-        if not os.path.exists(target_path):
-            return target_path
-        
-        # Add number suffix
-        base_path = Path(target_path)
-        counter = 1
-        
-        while True:
-            new_name = f"{base_path.stem}_{counter}{base_path.suffix}"
-            new_path = base_path.parent / new_name
-            
-            if not os.path.exists(new_path):
-                return str(new_path)
-            
-            counter += 1
+        target_folder, new_name = os.path.split(target_path)
+        return self.name_allocators.get(target_folder).allocate(new_name, create=True)
+    
+    def _calculate_checksum(self, file_path: str, stat: Optional[os.stat_result] = None) -> str:
+        """Calculate checksum for duplicate detection, reusing cached results"""
+        return self.checksum_cache.get_or_compute(
+            file_path,
+            self.hasher,
+            algorithm=self.hasher.algorithm,
+            stat=stat
+        )
     
-    def _calculate_checksum(self, file_path: str) -> str:
-        """Calculate MD5 checksum for duplicate detection"""
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+    def _checksum_for_duplicates(self, file_path: str) -> Tuple[str, int]:
+        """Checksum plus bytes read to get it (0 on a cache hit), for DuplicateDetector"""
+        stat = os.stat(file_path)
+        checksum = self.checksum_cache.lookup(stat, self.hasher.algorithm)
+        if checksum is not None:
+            return checksum, 0
+        checksum = self.hasher.hash_file(file_path)
+        self.checksum_cache.store(stat, self.hasher.algorithm, checksum)
+        return checksum, stat.st_size
     
     def detect_duplicates(self, file_paths: List[str]) -> List[Dict]:
-        """Detect duplicate files based on content"""
-        checksums = {}
-        duplicates = []
+        """
+        Detect duplicate files based on content.
         
-        for file_path in file_paths:
-            if os.path.exists(file_path):
-                checksum = self._calculate_checksum(file_path)
-                
-                if checksum in checksums:
-                    duplicates.append({
-                        "original": checksums[checksum],
-                        "duplicate": file_path,
-                        "checksum": checksum
-                    })
-                else:
-                    checksums[checksum] = file_path
-        
-        return duplicates
+        Returns:
+            List of duplicate groups: {"checksum", "size", "files"}
+        """
+        detector = DuplicateDetector(
+            block_size=settings.duplicate_block_size,
+            workers=settings.duplicate_workers,
+            algorithm=self.hasher.algorithm,
+            hash_file=self._checksum_for_duplicates
+        )
+        return detector.find_groups(file_paths)
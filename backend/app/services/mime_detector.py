@@ -0,0 +1,165 @@
+"""
+Tiered MIME type detection.
+
+Each file is decided by the cheapest tier that can:
+
+1. ``cache``: a type detected earlier for the same fingerprint (device,
+   inode, size, mtime_ns), which survives the organizer's renames
+2. ``extension``: the extension is in the trusted set and maps to one type
+3. ``signature``: a magic number at the start of the head bytes
+4. ``libmagic``: full detection on the head bytes
+
+Only the last two need file content, and only the head. Extensions that
+are unknown or not trusted (installers and other executables by default),
+ambiguous signatures (ZIP and OLE2 containers, PE/ELF binaries) and empty
+files fall through to the later tiers.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import magic
+
+from app.core.config import settings
+
+TIERS = ("cache", "extension", "signature", "libmagic")
+
+# Types as libmagic reports them, so every tier agrees
+EXTENSION_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+    ".rtf": "text/rtf",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".bmp": "image/bmp",
+    ".svg": "image/svg+xml",
+    ".mp4": "video/mp4",
+    ".avi": "video/x-msvideo",
+    ".mov": "video/quicktime",
+    ".wmv": "video/x-ms-asf",
+    ".flv": "video/x-flv",
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/x-wav",
+    ".flac": "audio/flac",
+    ".aac": "audio/x-hx-aac-adts",
+    ".zip": "application/zip",
+    ".rar": "application/x-rar",
+    ".7z": "application/x-7z-compressed",
+    ".tar": "application/x-tar",
+    ".gz": "application/gzip",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".xls": "application/vnd.ms-excel",
+    ".csv": "text/csv",
+    ".ppt": "application/vnd.ms-powerpoint",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
+
+# ((offset, magic number), ...) -> type; only signatures that identify a single type
+SIGNATURES: Tuple[Tuple[Tuple[Tuple[int, bytes], ...], str], ...] = (
+    (((0, b"%PDF-"),), "application/pdf"),
+    (((0, b"\x89PNG\r\n\x1a\n"),), "image/png"),
+    (((0, b"\xff\xd8\xff"),), "image/jpeg"),
+    (((0, b"GIF87a"),), "image/gif"),
+    (((0, b"GIF89a"),), "image/gif"),
+    (((0, b"7z\xbc\xaf\x27\x1c"),), "application/x-7z-compressed"),
+    (((0, b"Rar!\x1a\x07"),), "application/x-rar"),
+    (((0, b"\x1f\x8b"),), "application/gzip"),
+    (((0, b"fLaC"),), "audio/flac"),
+    (((0, b"ID3"),), "audio/mpeg"),
+    (((0, b"FLV\x01"),), "video/x-flv"),
+    (((0, b"xar!"),), "application/x-xar"),
+    (((0, b"RIFF"), (8, b"WAVE")), "audio/x-wav"),
+    (((0, b"RIFF"), (8, b"AVI ")), "video/x-msvideo"),
+)
+
+
+class MimeDetector:
+    """Picks the cheapest detection tier per file and reports (and counts) which tier decided"""
+
+    def __init__(self, trusted_extensions: Iterable[str], cache_size: int = 10000):
+        self.extension_types = {
+            ext.lower(): EXTENSION_TYPES[ext.lower()]
+            for ext in trusted_extensions
+            if ext.lower() in EXTENSION_TYPES
+        }
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {tier: 0 for tier in TIERS}
+
+    def _count(self, tier: str):
+        with self._lock:
+            self._counts[tier] += 1
+
+    @staticmethod
+    def fingerprint(stat) -> tuple:
+        return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def detect_without_content(self, file_ext: str, stat) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Decide from the cache or the extension alone.
+
+        Returns:
+            (MIME type, deciding tier), or (None, None) if the head bytes are
+            needed (see detect_head)
+        """
+        with self._lock:
+            cached = self._cache.get(self.fingerprint(stat))
+            if cached is not None:
+                self._cache.move_to_end(self.fingerprint(stat))
+        if cached is not None:
+            self._count("cache")
+            return cached, "cache"
+
+        mime_type = self.extension_types.get(file_ext.lower())
+        if mime_type is not None and stat.st_size > 0:
+            self._count("extension")
+            return mime_type, "extension"
+        return None, None
+
+    def detect_head(self, head: bytes, stat=None) -> Tuple[str, str]:
+        """Decide from the head bytes (signature table first, then libmagic); returns (MIME type, tier)"""
+        if not head:
+            mime_type, tier = "inode/x-empty", "signature"  # What libmagic reports for empty files
+        else:
+            mime_type, tier = self._match_signature(head), "signature"
+            if mime_type is None:
+                mime_type, tier = magic.from_buffer(head, mime=True), "libmagic"
+        self._count(tier)
+
+        if stat is not None and self.cache_size:
+            with self._lock:
+                self._cache[self.fingerprint(stat)] = mime_type
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return mime_type, tier
+
+    @staticmethod
+    def _match_signature(head: bytes) -> Optional[str]:
+        for checks, mime_type in SIGNATURES:
+            if all(head.startswith(signature, offset) for offset, signature in checks):
+                return mime_type
+        return None
+
+    def metrics(self) -> Dict[str, int]:
+        """How often each tier decided, plus the cache size"""
+        with self._lock:
+            return {**self._counts, "cached": len(self._cache)}
+
+
+_detector: Optional[MimeDetector] = None
+_detector_lock = threading.Lock()
+
+
+def get_mime_detector() -> MimeDetector:
+    """Return the process-wide detector, so the cache is shared by every organizer"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = MimeDetector(settings.mime_trusted_extensions, settings.mime_cache_size)
+        return _detector
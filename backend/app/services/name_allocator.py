@@ -0,0 +1,102 @@
+"""
+Unique file name allocation within a target directory.
+
+The directory is listed once; after that each allocation is a set lookup
+plus a per-stem counter that only moves forward, instead of probing
+``name_1``, ``name_2``, ... with one ``os.path.exists`` per candidate.
+
+The in-memory view can go stale when other processes write to the same
+directory, so every allocation is confirmed against the filesystem: with
+``create=True`` an empty placeholder is created with O_CREAT | O_EXCL (the
+caller then moves the real file over it), otherwise the chosen path is
+checked with a single ``lexists``.
+"""
+
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+class NameAllocator:
+    """Hands out unique names inside one directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._next_counter: Dict[Tuple[str, str], int] = {}
+        try:
+            self._taken = set(os.listdir(directory))
+        except OSError:
+            self._taken = set()
+
+    def allocate(self, name: str, create: bool = False) -> str:
+        """
+        Return a free path for ``name`` in this directory.
+
+        Args:
+            name: Desired file name; ``stem_N.suffix`` is used on collision
+            create: Atomically create an empty placeholder at the returned path
+        """
+        base = Path(name)
+        key = (base.stem, base.suffix)
+        candidate = name
+
+        with self._lock:
+            while True:
+                if candidate not in self._taken and self._claim(candidate, create):
+                    self._taken.add(candidate)
+                    return os.path.join(self.directory, candidate)
+
+                # Taken (possibly by another writer we didn't know about) - try the next counter
+                self._taken.add(candidate)
+                counter = self._next_counter.get(key, 1)
+                self._next_counter[key] = counter + 1
+                candidate = f"{base.stem}_{counter}{base.suffix}"
+
+    def _claim(self, candidate: str, create: bool) -> bool:
+        path = os.path.join(self.directory, candidate)
+        if not create:
+            return not os.path.lexists(path)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        os.close(fd)
+        return True
+
+    def release(self, path: str, remove_placeholder: bool = False):
+        """Give a name back, e.g. after the move into it failed"""
+        if remove_placeholder:
+            try:
+                if os.path.getsize(path) == 0:
+                    os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._taken.discard(os.path.basename(path))
+
+
+class NameAllocatorRegistry:
+    """Thread-safe map of directory -> NameAllocator"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._allocators: Dict[str, NameAllocator] = {}
+
+    def get(self, directory: str) -> NameAllocator:
+        with self._lock:
+            allocator = self._allocators.get(directory)
+            if allocator is None:
+                allocator = self._allocators[directory] = NameAllocator(directory)
+            return allocator
+
+
+def move_into_place(source: str, target: str):
+    """Move a file onto an allocated path, replacing its placeholder"""
+    try:
+        os.replace(source, target)
+    except OSError:
+        # Different filesystem (or platform restrictions) - copy over the placeholder
+        shutil.move(source, target)
@@ -0,0 +1,207 @@
+"""
+Out-of-band storage for per-file task details.
+
+Background tasks used to return every per-file result through the Celery
+result backend in one JSON blob. They now stream the details into a
+gzip-compressed JSON-lines file and return a compact summary plus the
+file's handle; the API pages through the file on demand.
+
+Gzip members can be concatenated, so a merge step joins shard files with
+a plain byte copy instead of decompressing and recompressing them. Each
+file is written as a series of members of ``CHUNK_RECORDS`` records, and a
+small sidecar index records where each member starts, so a page is read by
+seeking to its member instead of decompressing the file from the start.
+"""
+
+import bisect
+import gzip
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+HANDLE_PATTERN = re.compile(r"^[a-z_]+-[0-9a-f]{32}$")
+SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".idx.json"
+CHUNK_RECORDS = 1000  # Records per gzip member; a page decompresses at most one extra member
+
+
+class ResultWriter:
+    """Appends records to a result file; it only becomes readable once closed"""
+
+    def __init__(self, path: str, handle: str, chunk_records: int = CHUNK_RECORDS):
+        self.handle = handle
+        self.count = 0
+        self.chunk_records = chunk_records
+        self._path = path
+        self._tmp_path = path + ".tmp"
+        self._raw = open(self._tmp_path, "wb")
+        self._member = None
+        self._members: List[List[int]] = []  # [byte offset, first record index] per gzip member
+
+    def write(self, record: Dict):
+        if self._member is None:
+            self._members.append([self._raw.tell(), self.count])
+            self._member = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+        self._member.write((json.dumps(record, default=str) + "\n").encode("utf-8"))
+        self.count += 1
+        if self.count % self.chunk_records == 0:
+            self._close_member()
+
+    def extend(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def _close_member(self):
+        if self._member is not None:
+            self._member.close()  # Leaves the underlying file open
+            self._member = None
+
+    def close(self):
+        if self._raw is not None:
+            self._close_member()
+            self._raw.close()
+            self._raw = None
+            _write_index(self._path, {"count": self.count, "members": self._members})
+            os.replace(self._tmp_path, self._path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _index_path(path: str) -> str:
+    return path[:-len(SUFFIX)] + INDEX_SUFFIX
+
+
+def _write_index(path: str, index: Dict):
+    tmp_path = _index_path(path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, _index_path(path))
+
+
+def _read_index(path: str) -> Dict:
+    try:
+        with open(_index_path(path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # No usable index: one member from the start, record count unknown
+        return {"count": None, "members": [[0, 0]]}
+
+
+class ResultStore:
+    """Directory of compressed per-task detail files, addressed by handle"""
+
+    def __init__(self, directory: str, retention_hours: Optional[float] = None):
+        self.directory = directory
+        self.retention_hours = retention_hours
+        os.makedirs(directory, exist_ok=True)
+
+    def create(self, kind: str) -> ResultWriter:
+        """Start a new result file; kind prefixes the handle (e.g. "scan")"""
+        self.prune()
+        handle = f"{kind}-{uuid.uuid4().hex}"
+        return ResultWriter(self._path(handle), handle)
+
+    def merge(self, kind: str, handles: List[str]) -> str:
+        """Concatenate several result files into a new one and return its handle"""
+        handle = f"{kind}-{uuid.uuid4().hex}"
+        target = self._path(handle)
+        members: List[List[int]] = []
+        count = 0
+        indexed = True
+        with open(target + ".tmp", "wb") as out:
+            for part in handles:
+                path = self._path(part)
+                index = _read_index(path)
+                # Shift each part's members past everything copied so far
+                members.extend([out.tell() + offset, count + first] for offset, first in index["members"])
+                indexed = indexed and index["count"] is not None
+                count += index["count"] or 0
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        if not indexed:
+            # A part without an index: readers start from the beginning
+            members, count = [[0, 0]], None
+        _write_index(target, {"count": count, "members": members})
+        os.replace(target + ".tmp", target)
+        for part in handles:
+            self.delete(part)
+        return handle
+
+    def read_page(self, handle: str, offset: int = 0, limit: int = 100) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Return up to ``limit`` records starting at ``offset``.
+
+        Returns:
+            (records, next_offset); next_offset is None on the last page
+
+        Raises:
+            KeyError: Unknown or malformed handle
+        """
+        path = self._path(handle)
+        if not os.path.exists(path):
+            raise KeyError(handle)
+
+        index = _read_index(path)
+        count = index["count"]
+        if count is not None and offset >= count:
+            return [], None
+
+        # Start at the last member that begins at or before offset
+        members = index["members"]
+        position = bisect.bisect_right([first for _, first in members], offset) - 1
+        member_offset, first = members[max(position, 0)]
+
+        records = []
+        with open(path, "rb") as raw:
+            raw.seek(member_offset)
+            with gzip.GzipFile(fileobj=raw, mode="rb") as f:
+                for record_index, line in enumerate(f, start=first):
+                    if record_index < offset:
+                        continue
+                    if len(records) == limit:
+                        return records, offset + limit
+                    records.append(json.loads(line))
+        return records, None
+
+    def delete(self, handle: str):
+        try:
+            path = self._path(handle)
+        except KeyError:
+            return
+        for target in (path, _index_path(path)):
+            try:
+                os.remove(target)
+            except OSError:
+                pass
+
+    def prune(self):
+        """Remove result files older than retention_hours"""
+        if not self.retention_hours:
+            return
+        cutoff = time.time() - self.retention_hours * 3600
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.endswith((SUFFIX, INDEX_SUFFIX)) and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    continue
+
+    def _path(self, handle: str) -> str:
+        if not HANDLE_PATTERN.match(handle):
+            raise KeyError(handle)
+        return os.path.join(self.directory, handle + SUFFIX)
+
+
+def get_result_store() -> ResultStore:
+    return ResultStore(settings.task_results_path, settings.task_results_retention_hours)
@@ -0,0 +1,321 @@
+"""
+Persistent incremental scan index for the downloads folder.
+
+The index keeps one row per file (path, size, mtime_ns, inode, category) and
+one row per directory (path, mtime_ns) in a small SQLite sidecar file. On
+refresh, a directory whose own mtime has not changed is not listed again:
+its files are served from the index and only its known subdirectories are
+visited. Changed directories are re-listed and only entries whose
+fingerprint differs are rewritten.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.walker import scan_directory
+
+INDEX_FILENAME = ".scan_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_dirs_parent ON dirs (parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_files_parent_name ON files (parent, name);
+CREATE INDEX IF NOT EXISTS ix_files_parent_size ON files (parent, size, path);
+CREATE INDEX IF NOT EXISTS ix_files_parent_mtime ON files (parent, mtime_ns, path);
+"""
+
+_FILE_COLUMNS = "path, parent, name, extension, size, mtime_ns, inode, category"
+
+# Rows fetched per query by iter_files
+ITER_PAGE_SIZE = 500
+
+# Public sort keys -> indexed columns
+SORT_COLUMNS = {"name": "name", "size": "size", "modified": "mtime_ns"}
+
+
+def encode_cursor(sort: str, order: str, value, path: str) -> str:
+    """Build an opaque continuation token from the last row of a page"""
+    payload = json.dumps([sort, order, value, path], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[object, str]:
+    """Return (sort value, path) from a token, checking it matches the requested ordering"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, path = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValueError("Cursor was issued for a different sort order")
+    return value, path
+
+
+class ScanIndex:
+    """On-disk, incrementally refreshed index of a folder tree"""
+
+    def __init__(self, root_path: str, classify: Callable[[str], str], index_path: str):
+        self.root_path = root_path
+        self.index_path = index_path
+        self.classify = classify
+        self._lock = threading.Lock()
+        self._refresh_count = 0
+        self._last_stats: Dict[str, int] = {}
+
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Bring the index up to date with the filesystem.
+
+        Concurrent callers share work: a caller that waited while another
+        thread ran a refresh that started after the caller arrived reuses
+        that result instead of walking again.
+        """
+        arrived_at = self._refresh_count
+        stats = {"dirs_listed": 0, "dirs_skipped": 0, "files_updated": 0, "files_removed": 0}
+
+        with self._lock:
+            if self._refresh_count != arrived_at:
+                return self._last_stats
+            self._refresh_count += 1
+            self._refresh_tree(stats)
+            self._last_stats = stats
+
+        return stats
+
+    def _refresh_tree(self, stats: Dict[str, int]):
+        with closing(self._connect()) as conn, conn:
+            known_dirs = {row["path"]: row["mtime_ns"] for row in conn.execute("SELECT path, mtime_ns FROM dirs")}
+            seen_dirs = set()
+            pending = [(self.root_path, None)]
+
+            while pending:
+                dir_path, parent = pending.pop()
+                try:
+                    dir_mtime_ns = os.stat(dir_path).st_mtime_ns
+                except OSError:
+                    continue
+                seen_dirs.add(dir_path)
+
+                if known_dirs.get(dir_path) == dir_mtime_ns:
+                    # Directory listing unchanged - reuse its files and known subdirectories
+                    stats["dirs_skipped"] += 1
+                    subdirs = [row["path"] for row in conn.execute("SELECT path FROM dirs WHERE parent = ?", (dir_path,))]
+                else:
+                    stats["dirs_listed"] += 1
+                    subdirs = self._rescan_directory(conn, dir_path, stats)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+                        (dir_path, parent, dir_mtime_ns)
+                    )
+
+                pending.extend((subdir, dir_path) for subdir in subdirs)
+
+            # Forget directories that no longer exist, along with their files
+            for gone in set(known_dirs) - seen_dirs:
+                cursor = conn.execute("DELETE FROM files WHERE parent = ?", (gone,))
+                stats["files_removed"] += cursor.rowcount
+                conn.execute("DELETE FROM dirs WHERE path = ?", (gone,))
+
+    def _rescan_directory(self, conn: sqlite3.Connection, dir_path: str, stats: Dict[str, int]) -> List[str]:
+        """Re-list one directory, rewriting only entries whose fingerprint changed"""
+        existing = {
+            row["name"]: (row["size"], row["mtime_ns"], row["inode"])
+            for row in conn.execute("SELECT name, size, mtime_ns, inode FROM files WHERE parent = ?", (dir_path,))
+        }
+        current = set()
+
+        try:
+            files, subdirs = scan_directory(dir_path, exclude=[INDEX_FILENAME + "*"])
+        except OSError:
+            # Unreadable directory - keep what we knew about it
+            return [row["path"] for row in conn.execute("SELECT path FROM dirs WHERE parent = ?", (dir_path,))]
+
+        for entry in files:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            current.add(entry.name)
+            fingerprint = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            if existing.get(entry.name) == fingerprint:
+                continue
+
+            conn.execute(
+                f"INSERT OR REPLACE INTO files ({_FILE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.path,
+                    dir_path,
+                    entry.name,
+                    os.path.splitext(entry.name)[1].lower(),
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    stat.st_ino,
+                    self.classify(entry.path)
+                )
+            )
+            stats["files_updated"] += 1
+
+        removed = set(existing) - current
+        if removed:
+            conn.executemany(
+                "DELETE FROM files WHERE parent = ? AND name = ?",
+                [(dir_path, name) for name in removed]
+            )
+            stats["files_removed"] += len(removed)
+
+        return [subdir.path for subdir in subdirs]
+
+    def iter_files(self, dir_path: str, limit: Optional[int] = None) -> Iterator[sqlite3.Row]:
+        """
+        Yield indexed files directly inside a directory, ordered by name.
+
+        Rows are fetched in keyset pages of ITER_PAGE_SIZE, each on its own
+        short-lived connection, so no connection is held between next()
+        calls and the generator may be advanced from any thread.
+        """
+        last_name = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            page_size = ITER_PAGE_SIZE if remaining is None else min(ITER_PAGE_SIZE, remaining)
+            query = f"SELECT {_FILE_COLUMNS} FROM files WHERE parent = ?"
+            params: tuple = (dir_path,)
+            if last_name is not None:
+                query += " AND name > ?"
+                params += (last_name,)
+            query += " ORDER BY name LIMIT ?"
+            params += (page_size,)
+
+            with closing(self._connect()) as conn:
+                rows = conn.execute(query, params).fetchall()
+
+            yield from rows
+            if len(rows) < page_size:
+                return
+            last_name = rows[-1]["name"]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def list_files(self, dir_path: str, limit: Optional[int] = None) -> List[sqlite3.Row]:
+        """Return indexed files directly inside a directory, ordered by name"""
+        return list(self.iter_files(dir_path, limit))
+
+    def query_files(
+        self,
+        dir_path: str,
+        filters: Optional[Dict] = None,
+        sort: str = "name",
+        order: str = "asc",
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[sqlite3.Row], Optional[str]]:
+        """
+        Return one page of files directly inside a directory.
+
+        Filters (all optional): category, extension, min_size, max_size,
+        min_mtime_ns, max_mtime_ns. Pagination is keyset-based on
+        (sort column, path), so pages stay stable while files are added.
+
+        Returns:
+            (rows, next_cursor); next_cursor is None on the last page
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unknown sort order: {order}")
+
+        column = SORT_COLUMNS[sort]
+        filters = filters or {}
+        clauses = ["parent = ?"]
+        params: list = [dir_path]
+
+        if filters.get("category"):
+            clauses.append("category = ? COLLATE NOCASE")
+            params.append(filters["category"])
+        if filters.get("extension"):
+            extension = filters["extension"].lower()
+            clauses.append("extension = ?")
+            params.append(extension if extension.startswith(".") else f".{extension}")
+        for key, condition in (
+            ("min_size", "size >= ?"),
+            ("max_size", "size <= ?"),
+            ("min_mtime_ns", "mtime_ns >= ?"),
+            ("max_mtime_ns", "mtime_ns <= ?")
+        ):
+            if filters.get(key) is not None:
+                clauses.append(condition)
+                params.append(filters[key])
+
+        if cursor:
+            value, path = decode_cursor(cursor, sort, order)
+            comparison = ">" if order == "asc" else "<"
+            clauses.append(f"({column}, path) {comparison} (?, ?)")
+            params.extend([value, path])
+
+        direction = order.upper()
+        query = (
+            f"SELECT {_FILE_COLUMNS} FROM files WHERE {' AND '.join(clauses)} "
+            f"ORDER BY {column} {direction}, path {direction} LIMIT ?"
+        )
+        params.append(limit + 1)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(sort, order, last[column], last["path"])
+
+        return rows, next_cursor
+
+    def count_entries(self, dir_paths: Iterable[str]) -> Dict[str, Optional[int]]:
+        """Count files and subdirectories directly inside each directory (None if not indexed)"""
+        counts = {}
+        with closing(self._connect()) as conn:
+            for dir_path in dir_paths:
+                if conn.execute("SELECT 1 FROM dirs WHERE path = ?", (dir_path,)).fetchone() is None:
+                    counts[dir_path] = None
+                    continue
+                files = conn.execute("SELECT COUNT(*) FROM files WHERE parent = ?", (dir_path,)).fetchone()[0]
+                dirs = conn.execute("SELECT COUNT(*) FROM dirs WHERE parent = ?", (dir_path,)).fetchone()[0]
+                counts[dir_path] = files + dirs
+        return counts
+
+    def summarize(self, dir_path: str) -> Dict[str, Dict[str, int]]:
+        """Per-category file counts and total sizes for files directly inside a directory"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT category, COUNT(*) AS count, COALESCE(SUM(size), 0) AS size "
+                "FROM files WHERE parent = ? GROUP BY category ORDER BY category",
+                (dir_path,)
+            ).fetchall()
+        return {row["category"]: {"count": row["count"], "size": row["size"]} for row in rows}
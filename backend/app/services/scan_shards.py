@@ -0,0 +1,138 @@
+"""
+Splitting a downloads scan into directory-subtree shards.
+
+A shard is a list of units. Each unit is either a whole subtree
+(``recursive=True``) or only the files directly inside a directory whose
+subdirectories were split off into other units. Subtree sizes come from
+the previous scan, stored as a JSON map of directory -> file count:
+
+* a subtree known to be at most ``target_files`` stays whole;
+* a larger one is listed and its children are considered separately;
+* a directory the previous scan didn't see (new, or holding no files)
+  is kept whole and counted as a single file.
+
+Units are then packed into shards (largest first, onto the least loaded
+shard), with the shard count capped at ``max_shards``. The first scan has
+no stats, so the root is split one level down.
+"""
+
+import json
+import math
+import os
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.services.walker import scan_directory, walk_files
+
+Unit = Dict  # {"path": str, "depth": int, "recursive": bool}
+
+
+def load_dir_sizes(stats_path: str) -> Dict[str, int]:
+    """Subtree file counts recorded by the previous scan ({} if none)"""
+    try:
+        with open(stats_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("dirs", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_dir_sizes(stats_path: str, root: str, dir_counts: Dict[str, int]):
+    """Roll per-directory file counts up into subtree counts and store them"""
+    sizes: Counter = Counter()
+    root = os.path.normpath(root)
+    for dir_path, count in dir_counts.items():
+        path = os.path.normpath(dir_path)
+        while True:
+            sizes[path] += count
+            if path == root:
+                break
+            parent = os.path.dirname(path)
+            if parent == path or not path.startswith(root):
+                break
+            path = parent
+
+    os.makedirs(os.path.dirname(os.path.abspath(stats_path)), exist_ok=True)
+    tmp_path = stats_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"root": root, "dirs": sizes}, f)
+    os.replace(tmp_path, stats_path)
+
+
+def plan_shards(
+    root: str,
+    dir_sizes: Dict[str, int],
+    target_files: int,
+    max_shards: int,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    max_depth: Optional[int] = None,
+    exclude_paths: Optional[Iterable[str]] = None
+) -> List[List[Unit]]:
+    """Group the tree below root into at most max_shards shards of ~target_files files"""
+    root = os.path.normpath(root)
+    exclude_paths = list(exclude_paths or [])
+    units: List[Tuple[int, Unit]] = []
+
+    def split(path: str, depth: int):
+        size = dir_sizes.get(path)
+        if not dir_sizes:
+            # No previous scan: split the root one level, treat each child as a full shard
+            split_here = path == root
+            size = target_files
+        else:
+            split_here = size is not None and size > target_files
+            size = 1 if size is None else size
+        if not split_here or (max_depth is not None and depth >= max_depth):
+            units.append((size, {"path": path, "depth": depth, "recursive": True}))
+            return
+        try:
+            files, subdirs = scan_directory(path, root, include, exclude, exclude_paths)
+        except OSError:
+            return
+        units.append((len(files), {"path": path, "depth": depth, "recursive": False}))
+        for subdir in subdirs:
+            split(os.path.normpath(subdir.path), depth + 1)
+
+    split(root, 0)
+
+    total = sum(size for size, _ in units)
+    shard_count = max(1, min(max_shards, len(units), math.ceil(total / max(1, target_files))))
+    shards: List[List[Unit]] = [[] for _ in range(shard_count)]
+    loads = [0] * shard_count
+    for size, unit in sorted(units, key=lambda item: item[0], reverse=True):
+        index = loads.index(min(loads))
+        shards[index].append(unit)
+        loads[index] += size
+    return [shard for shard in shards if shard]
+
+
+def iter_shard_files(
+    root: str,
+    units: Iterable[Unit],
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    max_depth: Optional[int] = None,
+    exclude_paths: Optional[Iterable[str]] = None
+) -> Iterator[os.DirEntry]:
+    """Yield the files covered by one shard, leaving out anything below exclude_paths"""
+    exclude_paths = list(exclude_paths or [])
+    pruned = tuple(os.path.normcase(os.path.abspath(path)) + os.sep for path in exclude_paths)
+    for unit in units:
+        if (os.path.normcase(os.path.abspath(unit["path"])) + os.sep).startswith(pruned):
+            # Planned before the directory was excluded (or by a scan, which doesn't exclude it)
+            continue
+        if unit["recursive"]:
+            yield from walk_files(
+                unit["path"],
+                include=include,
+                exclude=exclude,
+                exclude_paths=exclude_paths,
+                max_depth=None if max_depth is None else max_depth - unit["depth"],
+                relative_to=root
+            )
+        else:
+            try:
+                files, _ = scan_directory(unit["path"], root, include, exclude, exclude_paths)
+            except OSError:
+                continue
+            yield from files
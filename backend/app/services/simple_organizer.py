@@ -4,23 +4,45 @@ Based on the working simple_organizer.py script
 """
 
 import os
-import shutil
+import sqlite3
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.services.classifier import get_classifier
+from app.services.expiry_index import ExpiryIndex
+from app.services.name_allocator import NameAllocatorRegistry, move_into_place
+from app.services.scan_index import INDEX_FILENAME, ScanIndex
+from app.services.walker import walk_files
 
 class SimpleOrganizerService:
     """Simple file organizer service that actually works"""
     
-    def __init__(self, downloads_path: str = None):
+    def __init__(
+        self,
+        downloads_path: str = None,
+        include: Optional[List[str]] = None,
+        exclude: Optional[List[str]] = None,
+        max_depth: Optional[int] = None,
+        expiry_index: Optional[ExpiryIndex] = None
+    ):
         if downloads_path:
             self.downloads_path = downloads_path
         else:
             # Use cross-platform detection
-            import os
             self.downloads_path = os.path.expanduser("~/Downloads")
         self.organized_path = os.path.join(self.downloads_path, "Organized")
         
+        # Walker filters used when organizing
+        self.include = include
+        self.exclude = exclude
+        self.max_depth = max_depth
+        
+        # Cleanup's index of the downloads tree; real moves are recorded in it
+        self.expiry_index = expiry_index
+        
         # File categories
         self.categories = {
             "Images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".webp", ".avif"],
@@ -33,9 +55,17 @@ class SimpleOrganizerService:
             "Software": [".exe", ".msi", ".dmg", ".pkg", ".deb", ".rpm"],
             "Other": []
         }
+        self.classifier = get_classifier(self.categories, default="Other")
         
         # Create organized folder structure
         self._create_folders()
+        
+        # Persistent index of the downloads tree, refreshed incrementally
+        self.index = ScanIndex(
+            self.downloads_path,
+            self._get_category,
+            os.path.join(self.organized_path, INDEX_FILENAME)
+        )
     
     def _create_folders(self):
         """Create organized folder structure"""
@@ -45,19 +75,15 @@ class SimpleOrganizerService:
     
     def _get_category(self, file_path: str) -> str:
         """Determine file category based on extension"""
-        file_ext = Path(file_path).suffix.lower()
-        
-        for category, extensions in self.categories.items():
-            if file_ext in extensions:
-                return category
-        
-        return "Other"
+        return self.classifier.classify(file_path)
     
-    def _generate_smart_name(self, file_path: str, category: str) -> str:
+    def _generate_smart_name(self, file_path: str, category: str, mtime: Optional[float] = None) -> str:
         """Generate a smart name for the file"""
         original_name = Path(file_path).name
         file_ext = Path(file_path).suffix
-        created_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+        if mtime is None:
+            mtime = os.path.getmtime(file_path)
+        created_time = datetime.fromtimestamp(mtime)
         
         # Generate timestamp
         timestamp = created_time.strftime("%Y-%m-%d_%H-%M")
@@ -89,122 +115,239 @@ class SimpleOrganizerService:
             # Default naming pattern
             return f"file_{timestamp}{file_ext}"
     
-    def _handle_duplicates(self, target_path: str) -> str:
-        """Handle duplicate file names"""
-        if not os.path.exists(target_path):
-            return target_path
+    def _handle_duplicates(self, allocators: NameAllocatorRegistry, target_path: str, create: bool) -> str:
+        """Handle duplicate file names via the per-folder allocator"""
+        target_folder, new_name = os.path.split(target_path)
+        return allocators.get(target_folder).allocate(new_name, create=create)
+    
+    def _refresh_index(self) -> bool:
+        """Bring the scan index up to date, returning False if the folder can't be read"""
+        if not os.path.exists(self.downloads_path):
+            return False
         
-        # Add number suffix
-        base_path = Path(target_path)
-        counter = 1
+        try:
+            self.index.refresh()
+        except (OSError, sqlite3.Error):
+            return False
         
-        while True:
-            new_name = f"{base_path.stem}_{counter}{base_path.suffix}"
-            new_path = base_path.parent / new_name
-            
-            if not os.path.exists(new_path):
-                return str(new_path)
-            
-            counter += 1
+        return True
     
     def scan_files(self, max_files: int = 100) -> List[Dict]:
         """Scan downloads folder and return file information"""
-        files_found = []
+        return list(self.iter_scan_files(max_files))
+    
+    def iter_scan_files(self, max_files: Optional[int] = None) -> Iterator[Dict]:
+        """Yield file information for the top level of the downloads folder"""
+        if not self._refresh_index():
+            return
         
-        if not os.path.exists(self.downloads_path):
-            return files_found
+        for row in self.index.iter_files(self.downloads_path, limit=max_files):
+            yield self._file_record(row)
+    
+    def query_files(
+        self,
+        category: Optional[str] = None,
+        extension: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        modified_after: Optional[datetime] = None,
+        modified_before: Optional[datetime] = None,
+        sort: str = "name",
+        order: str = "asc",
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Return one filtered, sorted page of top-level files and the cursor for the next page.
+        
+        Raises:
+            ValueError: for an unknown sort key/order or an invalid cursor
+        """
+        if not self._refresh_index():
+            return [], None
+        
+        filters = {
+            "category": category,
+            "extension": extension,
+            "min_size": min_size,
+            "max_size": max_size,
+            "min_mtime_ns": int(modified_after.timestamp() * 1e9) if modified_after else None,
+            "max_mtime_ns": int(modified_before.timestamp() * 1e9) if modified_before else None
+        }
+        rows, next_cursor = self.index.query_files(
+            self.downloads_path,
+            filters=filters,
+            sort=sort,
+            order=order,
+            cursor=cursor,
+            limit=limit
+        )
+        
+        return [self._file_record(row) for row in rows], next_cursor
+    
+    def _file_record(self, row) -> Dict:
+        created_time = datetime.fromtimestamp(row["mtime_ns"] / 1e9)
+        
+        return {
+            "name": row["name"],
+            "path": row["path"],
+            "category": row["category"],
+            "size": row["size"],
+            "size_mb": round(row["size"] / (1024 * 1024), 2),
+            "created": created_time.isoformat(),
+            "extension": row["extension"]
+        }
+    
+    def organize_files(self, dry_run: bool = True, workers: int = 1) -> Tuple[int, List[str], List[Dict]]:
+        """
+        Organize files into categories.
+        
+        With workers > 1, stat/naming and moves run on a thread pool while
+        name allocation stays in walk order, so results match serial mode.
+        Names are unique within a run, including dry runs.
+        """
+        results = list(self.iter_organize(dry_run=dry_run, workers=workers))
+        
+        organized_count = sum(1 for result in results if result["success"])
+        errors = [
+            f"Error with {result['original_name']}: {result['error']}"
+            for result in results if not result["success"]
+        ]
+        
+        return organized_count, errors, results
+    
+    def iter_organize(self, dry_run: bool = True, workers: int = 1) -> Iterator[Dict]:
+        """Organize files, yielding each result in walk order as soon as it is final"""
+        entries = walk_files(
+            self.downloads_path,
+            include=self.include,
+            exclude=self.exclude,
+            exclude_paths=[self.organized_path],
+            max_depth=self.max_depth
+        )
+        
+        # Target folders are listed once per run; allocation is serialized per folder
+        allocators = NameAllocatorRegistry()
         
-        # Only scan the top level of downloads folder for performance
+        if workers > 1:
+            results = self._organize_parallel(entries, allocators, dry_run, workers)
+        else:
+            results = (self._organize_entry(self._plan_entry(entry), allocators, dry_run) for entry in entries)
+        
+        if dry_run or self.expiry_index is None:
+            yield from results
+        else:
+            yield from self._record_moves(results)
+    
+    def _record_moves(self, results: Iterator[Dict], batch_size: int = 200) -> Iterator[Dict]:
+        """Pass results through, following each move in the expiry index (in batches)"""
+        moves = []
         try:
-            files = os.listdir(self.downloads_path)
-            for file in files[:max_files]:  # Limit to max_files for performance
-                file_path = os.path.join(self.downloads_path, file)
-                
-                # Skip directories and the Organized folder
-                if os.path.isdir(file_path) or "Organized" in file_path:
-                    continue
-                
-                try:
-                    category = self._get_category(file_path)
-                    file_size = os.path.getsize(file_path)
-                    created_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    
-                    files_found.append({
-                        "name": file,
-                        "path": file_path,
-                        "category": category,
-                        "size": file_size,
-                        "size_mb": round(file_size / (1024 * 1024), 2),
-                        "created": created_time.isoformat(),
-                        "extension": Path(file_path).suffix.lower()
-                    })
-                except (OSError, IOError):
-                    # Skip files that can't be accessed
-                    continue
-        except (OSError, IOError):
-            # Skip if downloads folder can't be accessed
-            pass
-        
-        return files_found
-    
-    def organize_files(self, dry_run: bool = True) -> Tuple[int, List[str]]:
-        """Organize files into categories"""
-        organized_count = 0
-        errors = []
-        results = []
-        
-        for root, dirs, files in os.walk(self.downloads_path):
-            # Skip the organized folder
-            if "Organized" in root:
-                continue
-                
-            for file in files:
-                file_path = os.path.join(root, file)
-                
-                try:
-                    # Get category
-                    category = self._get_category(file_path)
-                    
-                    # Generate new name
-                    new_name = self._generate_smart_name(file_path, category)
-                    
-                    # Create target path
-                    target_folder = os.path.join(self.organized_path, category)
-                    target_path = os.path.join(target_folder, new_name)
-                    
-                    # Handle duplicates
-                    target_path = self._handle_duplicates(target_path)
-                    
-                    result = {
-                        "original_name": file,
-                        "new_name": new_name,
-                        "category": category,
-                        "original_path": file_path,
-                        "new_path": target_path,
-                        "success": True
-                    }
-                    
+            for result in results:
+                if result.get("moved"):
+                    moves.append((result["original_path"], result["new_path"]))
+                    if len(moves) >= batch_size:
+                        self.expiry_index.move_many(moves)
+                        moves = []
+                yield result
+        finally:
+            self.expiry_index.move_many(moves)
+    
+    def _organize_parallel(
+        self,
+        entries,
+        allocators: NameAllocatorRegistry,
+        dry_run: bool,
+        workers: int
+    ) -> Iterator[Dict]:
+        """Plan and move on a thread pool, allocating names in walk order"""
+        window = workers * 4
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Bounded windows of planned and moving files, so moves start while
+            # planning continues and memory doesn't grow with the tree
+            planned = deque()
+            moving = deque()
+            
+            def dispatch(result: Dict):
+                if result["success"]:
+                    self._assign_target(result, allocators, dry_run)
                     if not dry_run:
-                        # Move file
-                        shutil.move(file_path, target_path)
-                        result["moved"] = True
-                    else:
-                        result["moved"] = False
-                    
-                    results.append(result)
-                    organized_count += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error with {file}: {str(e)}"
-                    errors.append(error_msg)
-                    results.append({
-                        "original_name": file,
-                        "original_path": file_path,
-                        "success": False,
-                        "error": str(e)
-                    })
+                        moving.append(pool.submit(self._move_file, result, allocators))
+                        return
+                moving.append(result)
+            
+            def finish(item) -> Dict:
+                return item.result() if isinstance(item, Future) else item
+            
+            for entry in entries:
+                planned.append(pool.submit(self._plan_entry, entry))
+                if len(planned) >= window:
+                    dispatch(planned.popleft().result())
+                while len(moving) >= window:
+                    yield finish(moving.popleft())
+            
+            while planned:
+                dispatch(planned.popleft().result())
+            while moving:
+                yield finish(moving.popleft())
+    
+    def _organize_entry(self, result: Dict, allocators: NameAllocatorRegistry, dry_run: bool) -> Dict:
+        """Allocate a target for a planned file and move it (serial mode)"""
+        if result["success"]:
+            self._assign_target(result, allocators, dry_run)
+            if not dry_run:
+                result = self._move_file(result, allocators)
+        return result
+    
+    def _plan_entry(self, entry: os.DirEntry) -> Dict:
+        """Categorize and name one file (no filesystem changes)"""
+        file = entry.name
+        file_path = entry.path
         
-        return organized_count, errors, results
+        try:
+            # Get category
+            category = self._get_category(file_path)
+            
+            # Generate new name
+            new_name = self._generate_smart_name(file_path, category, entry.stat().st_mtime)
+            
+            return {
+                "original_name": file,
+                "new_name": new_name,
+                "category": category,
+                "original_path": file_path,
+                "new_path": None,
+                "success": True
+            }
+        except Exception as e:
+            return self._error_result(file, file_path, e)
+    
+    def _assign_target(self, result: Dict, allocators: NameAllocatorRegistry, dry_run: bool):
+        """Allocate the target path for a planned file"""
+        target_path = os.path.join(self.organized_path, result["category"], result["new_name"])
+        
+        # Handle duplicates (a placeholder is created for real moves)
+        result["new_path"] = self._handle_duplicates(allocators, target_path, create=not dry_run)
+        result["moved"] = False
+    
+    def _move_file(self, result: Dict, allocators: NameAllocatorRegistry) -> Dict:
+        """Move a planned file onto its allocated path"""
+        try:
+            move_into_place(result["original_path"], result["new_path"])
+            result["moved"] = True
+            return result
+        except Exception as e:
+            allocators.get(os.path.dirname(result["new_path"])).release(result["new_path"], remove_placeholder=True)
+            return self._error_result(result["original_name"], result["original_path"], e)
+    
+    def _error_result(self, file: str, file_path: str, error: Exception) -> Dict:
+        return {
+            "original_name": file,
+            "original_path": file_path,
+            "success": False,
+            "error": str(error)
+        }
     
     def get_stats(self) -> Dict:
         """Get current organization statistics"""
@@ -214,15 +357,19 @@ class SimpleOrganizerService:
             "categories": {}
         }
         
-        for category in self.categories.keys():
-            category_path = os.path.join(self.organized_path, category)
-            if os.path.exists(category_path):
-                try:
-                    files = os.listdir(category_path)
-                    stats["categories"][category] = len(files)
-                except (OSError, IOError):
-                    stats["categories"][category] = 0
-            else:
-                stats["categories"][category] = 0
+        category_paths = {
+            category: os.path.join(self.organized_path, category)
+            for category in self.categories.keys()
+        }
+        
+        counts = {}
+        if self._refresh_index():
+            try:
+                counts = self.index.count_entries(category_paths.values())
+            except sqlite3.Error:
+                counts = {}
+        
+        for category, category_path in category_paths.items():
+            stats["categories"][category] = counts.get(category_path) or 0
         
         return stats
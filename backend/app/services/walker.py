@@ -0,0 +1,108 @@
+"""
+Shared directory tree walker built on os.scandir.
+
+Unlike ``os.walk`` followed by per-file ``getsize``/``getmtime``/``isdir``
+calls, the walker hands back ``os.DirEntry`` objects whose type and stat
+results are cached, and prunes excluded subtrees before descending into
+them.
+
+Patterns are shell-style globs matched against both the entry name and its
+path relative to the walk root (with ``/`` separators), so ``"*.tmp"``,
+``"Organized"`` and ``"Projects/*/build"`` all work.
+"""
+
+import os
+from fnmatch import fnmatch
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def _matches(name: str, rel_path: str, patterns: Iterable[str]) -> bool:
+    return any(fnmatch(name, pattern) or fnmatch(rel_path, pattern) for pattern in patterns)
+
+
+def _relative(root: str, path: str) -> str:
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def scan_directory(
+    dir_path: str,
+    root: Optional[str] = None,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    exclude_paths: Optional[Iterable[str]] = None
+) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+    """
+    List one directory.
+
+    Returns:
+        (files, subdirectories) after include/exclude filtering; excluded
+        subdirectories are left out entirely
+    """
+    root = root or dir_path
+    exclude = exclude or []
+    pruned = {os.path.normcase(os.path.abspath(path)) for path in (exclude_paths or [])}
+
+    files = []
+    subdirs = []
+
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                continue
+
+            if exclude or include:
+                rel_path = _relative(root, entry.path)
+                if exclude and _matches(entry.name, rel_path, exclude):
+                    continue
+
+            if is_dir:
+                if pruned and os.path.normcase(os.path.abspath(entry.path)) in pruned:
+                    continue
+                subdirs.append(entry)
+            elif is_file:
+                if include and not _matches(entry.name, rel_path, include):
+                    continue
+                files.append(entry)
+
+    return files, subdirs
+
+
+def walk_files(
+    root: str,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+    exclude_paths: Optional[Iterable[str]] = None,
+    max_depth: Optional[int] = None,
+    relative_to: Optional[str] = None
+) -> Iterator[os.DirEntry]:
+    """
+    Yield every file below ``root``, top-down in listing order.
+
+    Args:
+        root: Directory to walk
+        include: Only yield files matching one of these globs
+        exclude: Skip files and prune directories matching these globs
+        exclude_paths: Directories to prune by path, e.g. the Organized folder
+        max_depth: 0 yields only files directly in root; None is unlimited
+        relative_to: Directory that patterns are matched relative to, when
+            walking a subtree of a larger tree (defaults to root)
+    """
+    exclude_paths = list(exclude_paths or [])
+    relative_to = relative_to or root
+    pending = [(root, 0)]
+
+    while pending:
+        dir_path, depth = pending.pop()
+        try:
+            files, subdirs = scan_directory(dir_path, relative_to, include, exclude, exclude_paths)
+        except OSError:
+            # Skip directories that can't be read
+            continue
+
+        yield from files
+
+        if max_depth is None or depth < max_depth:
+            pending.extend((subdir.path, depth + 1) for subdir in reversed(subdirs))
@@ -0,0 +1,259 @@
+"""
+Bounded hand-off from the watchdog observer to a pool of organizer workers.
+
+Watchdog delivers events on its own thread, which has no event loop and
+must not block for long (the kernel's inotify buffer overflows if it
+does). Ready paths are put on a bounded ``queue.Queue`` and drained by
+``workers`` threads in micro-batches: a worker takes the first waiting
+path, then keeps collecting until it has ``batch_size`` paths or
+``flush_interval`` seconds have passed, and hands the whole list to
+``process``. When a bulk copy floods the folder and the queue is
+full, ``put`` waits up to ``put_timeout`` for room (backpressure) and then
+appends the path to a JSON-lines spill file instead of growing memory. The
+workers refill the queue from the spill file once it drains, and an idle
+worker checks the spill file every ``refill_interval`` seconds, so paths
+spilled while every worker was waiting are not stranded. Whatever is still
+spilled when the process stops is picked up at the next start.
+
+The spill file is append-only. A refill reads only as many lines as the
+queue has room for, starting at a read offset kept next to the file
+(``<spill_path>.offset``); the file is removed once it is fully read.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+_STOP = object()
+LATENCY_SAMPLES = 1024
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class WorkQueue:
+    """Bounded, disk-spilling queue of file paths processed by worker threads"""
+
+    def __init__(
+        self,
+        process: Callable[[List[str]], None],
+        workers: int = 2,
+        maxsize: int = 1000,
+        put_timeout: float = 0.5,
+        spill_path: Optional[str] = None,
+        batch_size: int = 1,
+        flush_interval: float = 0.0,
+        refill_interval: float = 0.5
+    ):
+        self.process = process
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.refill_interval = refill_interval
+        self.put_timeout = put_timeout
+        self.spill_path = spill_path
+        if spill_path:
+            os.makedirs(os.path.dirname(os.path.abspath(spill_path)), exist_ok=True)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, maxsize))
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._spilled = 0
+        self._spill_offset = 0  # Bytes of the spill file already moved back into the queue
+        self._metrics = {"enqueued": 0, "spilled": 0, "processed": 0, "failed": 0, "batches": 0}
+        self._wait_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._process_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+        if spill_path and os.path.exists(spill_path):
+            self._spill_offset = self._read_spill_offset()
+            with open(spill_path, "rb") as f:
+                if self._spill_offset > os.fstat(f.fileno()).st_size:
+                    self._spill_offset = 0  # Offset from another spill file; start over
+                f.seek(self._spill_offset)
+                self._spilled = sum(1 for line in f if line.strip())
+
+    def start(self):
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"organize-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._refill()
+
+    def stop(self):
+        """Let the workers finish what they hold and exit; queued paths are spilled for the next start"""
+        if not self._threads:
+            return
+        leftovers = self._drain()
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        leftovers.extend(self._drain())
+        if leftovers and self.spill_path:
+            self._spill(leftovers)
+
+    def put(self, file_path: str):
+        """Enqueue a path; waits up to put_timeout for room, then spills to disk"""
+        item = (file_path, time.time())
+        with self._lock:
+            # Keep FIFO order: while anything is spilled, new work goes behind it
+            spilling = self._spilled > 0
+        if not spilling:
+            try:
+                self._queue.put(item, timeout=self.put_timeout)
+                with self._lock:
+                    self._metrics["enqueued"] += 1
+                return
+            except queue.Full:
+                pass
+        if self.spill_path is None:
+            # Nowhere to spill - block until a worker makes room
+            self._queue.put(item)
+            with self._lock:
+                self._metrics["enqueued"] += 1
+            return
+        self._spill([item])
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            wait_times = list(self._wait_times)
+            process_times = list(self._process_times)
+            return {
+                **self._metrics,
+                "depth": self._queue.qsize(),
+                "spill_depth": self._spilled,
+                "wait_p50_ms": _percentile(wait_times, 0.5) * 1e3,
+                "wait_p99_ms": _percentile(wait_times, 0.99) * 1e3,
+                "batch_p50_ms": _percentile(process_times, 0.5) * 1e3,
+                "batch_p99_ms": _percentile(process_times, 0.99) * 1e3
+            }
+
+    def _work(self):
+        while True:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._run_batch(batch)
+            if stopping:
+                return
+            if self._queue.empty():
+                self._refill()
+
+    def _next_batch(self) -> Tuple[List[Tuple[str, float]], bool]:
+        """Block for one item, then gather more until batch_size or flush_interval"""
+        while True:
+            try:
+                item = self._queue.get(timeout=self.refill_interval)
+                break
+            except queue.Empty:
+                # Idle: pick up anything spilled while no worker was about to refill
+                self._refill()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run_batch(self, batch: List[Tuple[str, float]]):
+        started = time.time()
+        try:
+            self.process([file_path for file_path, _ in batch])
+            outcome = "processed"
+        except Exception as e:
+            print(f"Error processing batch of {len(batch)} files: {e}")
+            outcome = "failed"
+        finished = time.time()
+        with self._lock:
+            self._metrics[outcome] += len(batch)
+            self._metrics["batches"] += 1
+            self._wait_times.extend(started - enqueued_at for _, enqueued_at in batch)
+            self._process_times.append(finished - started)
+
+    def _drain(self) -> List[Tuple[str, float]]:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not _STOP:
+                items.append(item)
+
+    def _spill(self, items: List[Tuple[str, float]]):
+        with self._lock:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for file_path, enqueued_at in items:
+                    f.write(json.dumps({"path": file_path, "enqueued_at": enqueued_at}) + "\n")
+            self._spilled += len(items)
+            self._metrics["spilled"] += len(items)
+
+    def _refill(self):
+        """Move the next spilled paths back into the queue, as many as fit"""
+        with self._lock:
+            if not self._spilled:
+                return
+
+            moved = 0
+            with open(self.spill_path, "rb") as f:
+                f.seek(self._spill_offset)
+                while self._spilled:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if line.strip():
+                        record = json.loads(line)
+                        try:
+                            self._queue.put_nowait((record["path"], record["enqueued_at"]))
+                        except queue.Full:
+                            break
+                        moved += 1
+                        self._spilled -= 1
+                    self._spill_offset += len(line)
+
+            if self._spilled:
+                self._write_spill_offset(self._spill_offset)
+            else:
+                # Fully read: start the next spill with a fresh file
+                for path in (self.spill_path, self._offset_path()):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._spill_offset = 0
+            self._metrics["enqueued"] += moved
+
+    def _offset_path(self) -> str:
+        return self.spill_path + ".offset"
+
+    def _read_spill_offset(self) -> int:
+        try:
+            with open(self._offset_path(), "r", encoding="utf-8") as f:
+                return max(0, int(f.read().strip() or 0))
+        except (OSError, ValueError):
+            return 0
+
+    def _write_spill_offset(self, offset: int):
+        tmp_path = self._offset_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+        os.replace(tmp_path, self._offset_path())
@@ -2,9 +2,23 @@
 Background tasks for file processing.
 """
 
-from celery import current_task
+import time
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+from celery import chord, current_task, group
+from celery.utils import uuid
 from app.core.celery import celery_app
+from app.core.config import settings
+from app.core.executor import submit_task
+from app.services.classifier import get_extension_filter
+from app.services.dashboard_cache import dashboard_snapshot
+from app.services.expiry_index import ExpiryIndex, get_expiry_index
 from app.services.file_organizer import FileOrganizerService
+from app.services.mime_detector import TIERS as MIME_TIERS
+from app.services.result_store import get_result_store
+from app.services.scan_shards import iter_shard_files, load_dir_sizes, plan_shards, save_dir_sizes
+from app.services.walker import walk_files
 from app.models.file import File
 from app.core.database import SessionLocal
 import os
@@ -32,25 +46,7 @@ def organize_file_task(self, file_path: str):
         result = organizer.organize_file(file_path)
         
         # Save to database if successful
-        if result["success"]:
-            db = SessionLocal()
-            try:
-                file_record = File(
-                    original_name=os.path.basename(file_path),
-                    new_name=result.get("new_name"),
-                    original_path=file_path,
-                    new_path=result.get("new_path"),
-                    file_size=result["file_info"]["size"],
-                    file_type=result["file_info"]["extension"],
-                    category=result.get("category"),
-                    mime_type=result["file_info"]["mime_type"],
-                    is_organized=True,
-                    checksum=result["file_info"]["checksum"]
-                )
-                db.add(file_record)
-                db.commit()
-            finally:
-                db.close()
+        organizer.record_results([result])
         
         return {
             "status": "completed",
@@ -63,37 +59,269 @@ def organize_file_task(self, file_path: str):
             "error": str(e)
         }
 
+@celery_app.task(bind=True)
+def organize_batch_task(self, file_paths: List[str] = None, units: List[Dict] = None):
+    """
+    Background task to organize many files with one organizer and one DB session.
+    
+    Args:
+        file_paths: Paths to organize
+        units: Or a directory shard (see scan_shards) whose files to organize
+        
+    Returns:
+        Dict with batch metrics and a details handle for per-file results
+    """
+    try:
+        started = time.perf_counter()
+        commit_size = settings.organize_commit_size
+        organizer = FileOrganizerService()
+        expiry_index = get_expiry_index()
+        should_organize = get_extension_filter(settings.supported_extensions).matches
+        
+        if file_paths is None:
+            entries = iter_shard_files(
+                settings.downloads_path,
+                units or [],
+                include=settings.scan_include_patterns,
+                exclude=settings.scan_exclude_patterns,
+                max_depth=settings.scan_max_depth,
+                exclude_paths=organizer.target_roots()  # Already organized
+            )
+            file_paths = (entry.path for entry in entries)
+        paths = (path for path in file_paths if should_organize(path))
+        
+        metrics = {"files": 0, "organized": 0, "failed": 0, "recorded": 0, "chunks": 0}
+        # Counted from this batch's own results; the detector's totals are shared by concurrent batches
+        mime_tiers: Counter = Counter()
+        db = SessionLocal()
+        try:
+            with get_result_store().create("organize") as details:
+                while True:
+                    chunk = list(islice(paths, commit_size))
+                    if not chunk:
+                        break
+                    
+                    results = organizer.organize_batch(chunk)
+                    metrics["recorded"] += organizer.record_results(results, db=db)
+                    # Organized files stay under downloads_path, so cleanup must follow them
+                    expiry_index.move_many(
+                        (result["original_path"], result["new_path"]) for result in results if result["success"]
+                    )
+                    if any(result["success"] for result in results):
+                        dashboard_snapshot.mark_stale()  # Possibly in another process than the API
+                    details.extend(results)
+                    mime_tiers.update(result["file_info"]["mime_tier"] for result in results if "file_info" in result)
+                    
+                    metrics["chunks"] += 1
+                    metrics["files"] += len(results)
+                    metrics["organized"] += sum(1 for result in results if result["success"])
+                    metrics["failed"] = metrics["files"] - metrics["organized"]
+                    self.update_state(
+                        state="PROGRESS",
+                        meta={"status": "Organizing files", **metrics}
+                    )
+        finally:
+            db.close()
+        
+        elapsed = time.perf_counter() - started
+        return {
+            "status": "completed",
+            **metrics,
+            "mime_tiers": {tier: mime_tiers[tier] for tier in MIME_TIERS},
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(metrics["files"] / elapsed, 1) if elapsed > 0 else 0.0,
+            "details": details.handle
+        }
+        
+    except Exception as e:
+        return {
+            "status": "failed",
+            "error": str(e)
+        }
+
+def organize_paths(file_paths: Iterable[str], batch_size: Optional[int] = None):
+    """
+    Queue paths for organizing as organize_batch_task batches.
+    
+    Returns:
+        GroupResult covering every batch
+    """
+    batch_size = batch_size or settings.organize_task_batch_size
+    file_paths = iter(file_paths)
+    batches = iter(lambda: list(islice(file_paths, batch_size)), [])
+    return celery_app.GroupResult(
+        uuid(),
+        [submit_task(organize_batch_task, file_paths=batch) for batch in batches]
+    )
+
+def organize_downloads():
+    """
+    Queue the whole downloads folder for organizing, one organize_batch_task per shard.
+    
+    Shards are planned like a scan's (see scan_shards), sized to
+    organize_task_batch_size files, without the organizer's category folders.
+    
+    Returns:
+        GroupResult covering every shard
+    """
+    shards = plan_shards(
+        settings.downloads_path,
+        load_dir_sizes(settings.scan_shard_stats_path),
+        target_files=settings.organize_task_batch_size,
+        max_shards=settings.scan_shard_max,
+        include=settings.scan_include_patterns,
+        exclude=settings.scan_exclude_patterns,
+        max_depth=settings.scan_max_depth,
+        exclude_paths=FileOrganizerService().target_roots()
+    )
+    return celery_app.GroupResult(
+        uuid(),
+        [submit_task(organize_batch_task, units=shard) for shard in shards]
+    )
+
 @celery_app.task(bind=True)
 def scan_downloads_folder_task(self):
     """
     Background task to scan the entire downloads folder.
     
+    The tree is split into directory-subtree shards sized from the previous
+    scan; each shard runs as its own task and merge_scan_shards_task
+    combines them. This task is replaced by that chord, so its result (and
+    its PROGRESS updates as shards finish) stay on this task's id.
+    
     Returns:
         Dict with scan results
     """
     try:
-        from app.services.file_monitor import FileMonitorService
-        
         # Update task status
         self.update_state(
             state="PROGRESS",
-            meta={"status": "Scanning downloads folder"}
+            meta={"status": "Planning scan shards"}
+        )
+        
+        shards = plan_shards(
+            settings.downloads_path,
+            load_dir_sizes(settings.scan_shard_stats_path),
+            target_files=settings.scan_shard_target_files,
+            max_shards=settings.scan_shard_max,
+            include=settings.scan_include_patterns,
+            exclude=settings.scan_exclude_patterns,
+            max_depth=settings.scan_max_depth
         )
         
-        # Scan the folder
-        monitor = FileMonitorService()
-        results = monitor.scan_existing_files()
+        if len(shards) <= 1 or self.request.id is None or self.request.is_eager:
+            # Nothing to fan out (or not running on a worker) - scan inline
+            self.update_state(
+                state="PROGRESS",
+                meta={"status": "Scanning downloads folder", "shards_total": 1, "shards_done": 0}
+            )
+            return _merge_scan_shards([_scan_shard(shard) for shard in shards])
+        
+        shard_ids = [uuid() for _ in shards]
+        header = group(
+            scan_shard_task.s(shard, progress_id=self.request.id, sibling_ids=shard_ids).set(task_id=shard_id)
+            for shard, shard_id in zip(shards, shard_ids)
+        )
+        workflow = chord(header, merge_scan_shards_task.s())
+        
+    except Exception as e:
+        return {
+            "status": "failed",
+            "error": str(e)
+        }
+    
+    self.update_state(
+        state="PROGRESS",
+        meta={"status": "Scanning downloads folder", "shards_total": len(shards), "shards_done": 0}
+    )
+    # Raises Ignore to hand this task's id over to the chord
+    return self.replace(workflow)
+
+@celery_app.task(bind=True)
+def scan_shard_task(self, units: List[Dict], progress_id: str = None, sibling_ids: List[str] = None):
+    """
+    Scan one shard of the downloads folder and report progress on the parent scan.
+    
+    Args:
+        units: Subtrees / directories making up this shard (see scan_shards)
+        progress_id: Task id of the scan this shard belongs to
+        sibling_ids: Task ids of all shards in the scan, for progress counting
+    """
+    result = _scan_shard(units)
+    
+    if progress_id and sibling_ids:
+        done = 1 + sum(
+            1 for shard_id in sibling_ids
+            if shard_id != self.request.id and celery_app.AsyncResult(shard_id).ready()
+        )
+        self.update_state(
+            task_id=progress_id,
+            state="PROGRESS",
+            meta={"status": "Scanning downloads folder", "shards_total": len(sibling_ids), "shards_done": done}
+        )
+    
+    return result
+
+@celery_app.task
+def merge_scan_shards_task(shard_results: List[Dict]):
+    """Combine shard results into the scan summary"""
+    return _merge_scan_shards(shard_results)
+
+def _scan_shard(units: List[Dict]) -> Dict:
+    """
+    Ingest the files of one shard.
+    
+    Per-file results go to a result file rather than the task result; the
+    shard returns counts, its details handle and files per directory (for
+    the next plan).
+    """
+    from app.services.file_monitor import FileMonitorService
+    
+    monitor = FileMonitorService()
+    dir_counts: Counter = Counter()
+    
+    entries = iter_shard_files(
+        settings.downloads_path,
+        units,
+        include=settings.scan_include_patterns,
+        exclude=settings.scan_exclude_patterns,
+        max_depth=settings.scan_max_depth
+    )
+    with get_result_store().create("scan_shard") as details:
+        def collect(chunk):
+            details.extend(chunk)
+            dir_counts.update(os.path.dirname(result["file_path"]) for result in chunk)
+        
+        summary = monitor.ingest_entries(entries, on_chunk=collect)
+    
+    return {
+        "total_files": summary["files_seen"],
+        "failed": summary["failed"],
+        "details": details.handle,
+        "dir_counts": dir_counts
+    }
+
+def _merge_scan_shards(shard_results: List[Dict]) -> Dict:
+    try:
+        dir_counts: Counter = Counter()
+        for shard in shard_results:
+            dir_counts.update(shard["dir_counts"])
+        
+        # Shard sizes for the next scan are tuned from this one
+        save_dir_sizes(settings.scan_shard_stats_path, settings.downloads_path, dir_counts)
         
         # Count results
-        successful = sum(1 for r in results if r["success"])
-        failed = len(results) - successful
+        total_files = sum(shard["total_files"] for shard in shard_results)
+        failed = sum(shard["failed"] for shard in shard_results)
+        details = get_result_store().merge("scan", [shard["details"] for shard in shard_results])
         
         return {
             "status": "completed",
-            "total_files": len(results),
-            "successful": successful,
+            "total_files": total_files,
+            "successful": total_files - failed,
             "failed": failed,
-            "results": results
+            "shards": len(shard_results),
+            "details": details  # Page through with GET /api/tasks/results/{details}
         }
         
     except Exception as e:
@@ -103,49 +331,55 @@ def scan_downloads_folder_task(self):
         }
 
 @celery_app.task(bind=True)
-def cleanup_old_files_task(self, days_old: int = 30):
+def cleanup_old_files_task(self, days_old: Optional[int] = None, dry_run: bool = False):
     """
     Background task to cleanup old files.
     
+    Candidates come from the expiry index, oldest first, per retention rule
+    (temporary files, then each category). Files are deleted in batches of
+    cleanup_batch_size with cleanup_batch_interval seconds between batches.
+    
     Args:
-        days_old: Files older than this many days will be cleaned up
+        days_old: Override the retention for categories without their own setting
+        dry_run: Only report what would be deleted
         
     Returns:
         Dict with cleanup results
     """
     try:
-        from datetime import datetime, timedelta
-        from app.core.config import settings
-        
-        # Update task status
         self.update_state(
             state="PROGRESS",
-            meta={"status": f"Cleaning up files older than {days_old} days"}
+            meta={"status": "Cleaning up expired files", "dry_run": dry_run}
         )
         
-        downloads_path = settings.downloads_path
-        cutoff_date = datetime.now() - timedelta(days=days_old)
-        
-        cleaned_files = []
-        
-        # Walk through downloads folder
-        for root, dirs, files in os.walk(downloads_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    # Check file modification time
-                    file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                    if file_time < cutoff_date:
-                        # Delete the file
-                        os.remove(file_path)
-                        cleaned_files.append(file_path)
-                except (OSError, IOError):
-                    continue
+        index = get_expiry_index()
+        if index.is_empty():
+            # First run (or a lost index): seed it from one full walk
+            _bootstrap_expiry_index(index)
+        
+        actions: Counter = Counter()
+        records = index.expire(
+            dry_run=dry_run,
+            default_days=days_old,
+            batch_size=settings.cleanup_batch_size,
+            batch_interval=settings.cleanup_batch_interval
+        )
+        with get_result_store().create("cleanup") as details:
+            for record in records:
+                details.write(record)
+                actions[record["action"]] += 1
+                if details.count % settings.cleanup_batch_size == 0:
+                    self.update_state(
+                        state="PROGRESS",
+                        meta={"status": "Cleaning up expired files", "dry_run": dry_run, **actions}
+                    )
         
         return {
             "status": "completed",
-            "cleaned_files": len(cleaned_files),
-            "files": cleaned_files
+            "dry_run": dry_run,
+            "cleaned_files": actions["would_delete" if dry_run else "deleted"],
+            "actions": dict(actions),
+            "details": details.handle
         }
         
     except Exception as e:
@@ -153,3 +387,23 @@ def cleanup_old_files_task(self, days_old: int = 30):
             "status": "failed",
             "error": str(e)
         }
+
+
+def _bootstrap_expiry_index(index: ExpiryIndex):
+    entries = walk_files(
+        settings.downloads_path,
+        include=settings.scan_include_patterns,
+        exclude=settings.scan_exclude_patterns,
+        max_depth=settings.scan_max_depth
+    )
+    while True:
+        chunk = list(islice(entries, settings.scan_ingest_chunk_size))
+        if not chunk:
+            break
+        stats = []
+        for entry in chunk:
+            try:
+                stats.append((entry.path, entry.stat()))
+            except OSError:
+                continue
+        index.record_many(stats)
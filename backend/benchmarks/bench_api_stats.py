@@ -0,0 +1,66 @@
+"""
+Load benchmark: requests per second on /api/files/stats.
+
+"before" mounts the original handler, which builds a SimpleOrganizerService
+(nine makedirs calls, category table, index setup) and rescans on every
+request. "after" hits the real endpoint, which serves the application-scoped
+organizer's shared snapshot.
+
+Usage (from backend/):
+    python -m benchmarks.bench_api_stats [--requests 500] [--files 2000] [--threads 8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fire(client, path, requests, threads):
+    def call(_):
+        response = client.get(path)
+        assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        # The app-scoped organizer uses ~/Downloads; point it at a synthetic tree
+        os.environ["HOME"] = home
+        downloads = os.path.join(home, "Downloads")
+        os.makedirs(downloads)
+        for index in range(args.files):
+            with open(os.path.join(downloads, f"file_{index}.{('png', 'pdf', 'zip', 'mp3')[index % 4]}"), "wb") as f:
+                f.write(b"x" * (index % 512))
+
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.services.simple_organizer import SimpleOrganizerService
+
+        @app.get("/bench/legacy-stats")
+        async def legacy_stats():
+            organizer = SimpleOrganizerService()
+            return organizer.get_stats()
+
+        with TestClient(app) as client:
+            before = fire(client, "/bench/legacy-stats", args.requests, args.threads)
+            after = fire(client, "/api/files/stats", args.requests, args.threads)
+
+    print(f"{'mode':<8} {'req/s':>10}")
+    print(f"{'before':<8} {before:>10.1f}")
+    print(f"{'after':<8} {after:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
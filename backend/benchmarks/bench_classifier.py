@@ -0,0 +1,105 @@
+"""
+Microbenchmark: extension classification.
+
+Compares the original linear scan over {category: [extensions]} with the
+compiled ExtensionClassifier, over millions of file names: first the bare
+classifier, then the calls the services make per file
+(FileOrganizerService._determine_category, DownloadsHandler._should_organize)
+against the original code they replaced.
+
+Usage (from backend/):
+    python -m benchmarks.bench_classifier [--count 2000000]
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.classifier import ExtensionClassifier
+
+CATEGORIES = {
+    "Images": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".webp", ".avif"],
+    "Documents": [".pdf", ".doc", ".docx", ".txt", ".rtf"],
+    "Spreadsheets": [".xlsx", ".xls", ".csv"],
+    "Presentations": [".ppt", ".pptx"],
+    "Videos": [".mp4", ".avi", ".mov", ".wmv", ".flv", ".mkv"],
+    "Audio": [".mp3", ".wav", ".flac", ".aac", ".m4a"],
+    "Archives": [".zip", ".rar", ".7z", ".tar", ".gz"],
+    "Software": [".exe", ".msi", ".dmg", ".pkg", ".deb", ".rpm"],
+    "Other": []
+}
+
+
+def legacy_category(file_path):
+    """The original SimpleOrganizerService._get_category"""
+    file_ext = Path(file_path).suffix.lower()
+
+    for category, extensions in CATEGORIES.items():
+        if file_ext in extensions:
+            return category
+
+    return "Other"
+
+
+def legacy_service_category(file_path):
+    """The original FileOrganizerService._determine_category"""
+    file_ext = Path(file_path).suffix.lower()
+    for category, extensions in settings.default_categories.items():
+        if file_ext in extensions:
+            return category
+    return "other"
+
+
+def legacy_should_organize(file_path):
+    """The original DownloadsHandler._should_organize"""
+    return Path(file_path).suffix.lower() in settings.supported_extensions
+
+
+def run(label, func, names):
+    start = time.perf_counter()
+    for name in names:
+        func(name)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed:>8.2f}s {len(names) / elapsed / 1e6:>8.2f} M/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    extensions = [ext for group in CATEGORIES.values() for ext in group] + [".unknown", ".TAR.GZ", ""]
+    names = [f"/downloads/sub/file_{index}{rng.choice(extensions)}" for index in range(args.count)]
+
+    simple = ExtensionClassifier(CATEGORIES, default="Other")
+    compound = ExtensionClassifier(dict(CATEGORIES, Archives=CATEGORIES["Archives"] + [".tar.gz"]), default="Other")
+
+    for name in names[:1000]:
+        assert legacy_category(name) == simple.classify(name), name
+
+    print(f"Classifying {len(names):,} names")
+    run("legacy linear scan", legacy_category, names)
+    run("compiled lookup", simple.classify, names)
+    run("compiled + compound", compound.classify, names)
+
+    from app.services.file_monitor import DownloadsHandler
+    from app.services.file_organizer import FileOrganizerService
+
+    organizer = FileOrganizerService()
+    handler = DownloadsHandler(organizer)
+    for name in names[:1000]:
+        assert legacy_service_category(name) == organizer._determine_category(name, {}), name
+        assert legacy_should_organize(name) == handler.extension_filter.matches(name), name
+
+    print("Service call path")
+    run("legacy category", legacy_service_category, names)
+    run("_determine_category", lambda name: organizer._determine_category(name, {}), names)
+    run("legacy filter", legacy_should_organize, names)
+    run("_should_organize", handler._should_organize, names)
+
+
+if __name__ == "__main__":
+    main()
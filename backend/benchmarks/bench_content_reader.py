@@ -0,0 +1,124 @@
+"""
+Benchmark: bytes read per file by _get_file_info.
+
+"legacy" runs the original two passes (``magic.from_file`` followed by a
+full FileHasher read). "single" runs the ContentReader pass used by
+_get_file_info now, first with a cold checksum cache and then with a warm
+one (only the MIME head is read). "single+kw" adds a keyword matcher to
+the same pass, to show what a content rule would cost. Bytes are counted
+with /proc/self/io ``rchar``, which includes libmagic's own reads;
+elsewhere only the reader's count is shown.
+
+Usage (from backend/):
+    python -m benchmarks.bench_content_reader [--files 200] [--size-kb 2048]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import magic
+
+from app.services.content_reader import ContentConsumer
+
+
+class KeywordMatcher(ContentConsumer):
+    """Case-insensitive search for keywords (UTF-8) across chunk boundaries"""
+
+    def __init__(self, keywords):
+        super().__init__()
+        self.keywords = {keyword: keyword.lower().encode("utf-8") for keyword in keywords if keyword}
+        self._found = set()
+        self._overlap = max((len(needle) for needle in self.keywords.values()), default=1) - 1
+        self._tail = b""
+        self.done = not self.keywords
+
+    def update(self, chunk):
+        window = self._tail + bytes(chunk).lower()
+        for keyword, needle in self.keywords.items():
+            if keyword not in self._found and needle in window:
+                self._found.add(keyword)
+        self._tail = window[-self._overlap:] if self._overlap else b""
+        self.done = len(self._found) == len(self.keywords)
+
+    def result(self):
+        return sorted(self._found)
+
+
+def read_bytes():
+    """Bytes read by this process so far (Linux only), or None"""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=2048)
+    parser.add_argument("--keywords", nargs="*", default=["invoice", "total"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["CHECKSUM_CACHE_PATH"] = os.path.join(workdir, "checksums.sqlite3")
+
+        from app.core.config import settings
+        from app.services.content_reader import ContentReader, HashConsumer, HeadSniffer
+        from app.services.file_organizer import FileOrganizerService
+        from app.services.hashing import FileHasher
+
+        headers = (b"%PDF-1.4\n", b"\x89PNG\r\n\x1a\n", b"PK\x03\x04", b"ID3\x03\x00")
+        paths = []
+        for index in range(args.files):
+            path = os.path.join(workdir, f"file_{index}.bin")
+            with open(path, "wb") as f:
+                f.write(headers[index % len(headers)])
+                f.write(os.urandom(args.size_kb * 1024))
+            paths.append(path)
+
+        hasher = FileHasher(settings.hash_algorithm, settings.hash_buffer_size, settings.hash_mmap_threshold)
+        reader = ContentReader(settings.hash_buffer_size, settings.hash_mmap_threshold)
+        organizer = FileOrganizerService()
+        counted = {"bytes": 0}
+
+        def legacy(path):
+            magic.from_file(path, mime=True)
+            hasher.hash_file(path)
+
+        def single(path, keywords=None):
+            consumers = [HeadSniffer(settings.mime_sniff_bytes), HashConsumer(settings.hash_algorithm)]
+            if keywords:
+                consumers.append(KeywordMatcher(keywords))
+            counted["bytes"] += reader.read(path, consumers)
+
+        def get_file_info(path):
+            organizer._get_file_info(path)
+
+        modes = (
+            ("legacy", legacy),
+            ("single", single),
+            ("single+kw", lambda path: single(path, args.keywords)),
+            ("info cold", get_file_info),
+            ("info warm", get_file_info),
+        )
+        print(f"{'mode':<10} {'KB/file (rchar)':>16} {'KB/file (reader)':>17} {'ms/file':>9}")
+        for label, func in modes:
+            counted["bytes"] = 0
+            before = read_bytes()
+            start = time.perf_counter()
+            for path in paths:
+                func(path)
+            elapsed = time.perf_counter() - start
+            after = read_bytes()
+            rchar = "n/a" if before is None else f"{(after - before) / len(paths) / 1024:.0f}"
+            reader_kb = f"{counted['bytes'] / len(paths) / 1024:.0f}" if counted["bytes"] else "-"
+            print(f"{label:<10} {rchar:>16} {reader_kb:>17} {elapsed / len(paths) * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
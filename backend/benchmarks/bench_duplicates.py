@@ -0,0 +1,108 @@
+"""
+Benchmark: staged duplicate detection vs. hashing every file.
+
+Builds a synthetic folder with mostly unique sizes, some same-size files
+that differ in content and a few true duplicates, then reports bytes read
+and wall time for both implementations.
+
+Usage (from backend/):
+    python -m benchmarks.bench_duplicates [--files 2000] [--max-size-kb 2048]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import time
+
+from app.services.duplicate_detector import DuplicateDetector
+
+
+def legacy_detect_duplicates(file_paths, counter):
+    """The original implementation: full MD5 of every file in 4 KiB reads"""
+    checksums = {}
+    duplicates = []
+
+    for file_path in file_paths:
+        if os.path.exists(file_path):
+            hash_md5 = hashlib.md5()
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(4096), b""):
+                    counter["bytes_read"] += len(chunk)
+                    hash_md5.update(chunk)
+            checksum = hash_md5.hexdigest()
+
+            if checksum in checksums:
+                duplicates.append({"original": checksums[checksum], "duplicate": file_path})
+            else:
+                checksums[checksum] = file_path
+
+    return duplicates
+
+
+def build_tree(root, files, max_size_kb, seed=42):
+    rng = random.Random(seed)
+    paths = []
+    for index in range(files):
+        size = rng.randint(1, max_size_kb) * 1024 + rng.randint(0, 1023)
+        path = os.path.join(root, f"file_{index}.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(size))
+        paths.append(path)
+
+    # Same size, different middle content (survives the size and head/tail stages)
+    for index in range(files // 50):
+        source = paths[index]
+        with open(source, "rb") as f:
+            data = bytearray(f.read())
+        data[len(data) // 2] ^= 0xFF
+        path = os.path.join(root, f"lookalike_{index}.bin")
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+
+    # True duplicates
+    for index in range(files // 100):
+        source = paths[-1 - index]
+        path = os.path.join(root, f"copy_{index}.bin")
+        with open(source, "rb") as src, open(path, "wb") as dst:
+            dst.write(src.read())
+        paths.append(path)
+
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--max-size-kb", type=int, default=2048)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = build_tree(root, args.files, args.max_size_kb)
+        total_bytes = sum(os.path.getsize(path) for path in paths)
+        print(f"Dataset: {len(paths)} files, {total_bytes / (1024 * 1024):.1f} MB")
+
+        counter = {"bytes_read": 0}
+        start = time.perf_counter()
+        legacy = legacy_detect_duplicates(paths, counter)
+        legacy_time = time.perf_counter() - start
+
+        detector = DuplicateDetector(workers=args.workers)
+        start = time.perf_counter()
+        groups = detector.find_groups(paths)
+        staged_time = time.perf_counter() - start
+
+        print(f"{'implementation':<12} {'time (s)':>10} {'MB read':>10} {'found':>8}")
+        print(f"{'legacy':<12} {legacy_time:>10.3f} {counter['bytes_read'] / (1024 * 1024):>10.1f} {len(legacy):>8}")
+        print(
+            f"{'staged':<12} {staged_time:>10.3f} {detector.stats['bytes_read'] / (1024 * 1024):>10.1f} "
+            f"{sum(len(group['files']) - 1 for group in groups):>8}"
+        )
+        print(f"Stage counters: {detector.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: hashing throughput in MB/s across file sizes.
+
+Compares the original 4 KiB ``f.read`` loop with the FileHasher readinto
+and mmap paths for each supported algorithm.
+
+Usage (from backend/):
+    python -m benchmarks.bench_hashing [--sizes-mb 1 16 256] [--repeat 3]
+"""
+
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+
+from app.services.hashing import SUPPORTED_ALGORITHMS, FileHasher
+
+
+def legacy_md5(file_path):
+    """The original _calculate_checksum"""
+    hash_md5 = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+
+def throughput(func, file_path, size, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(file_path)
+        best = min(best, time.perf_counter() - start)
+    return size / (1024 * 1024) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 16, 256])
+    parser.add_argument("--buffer-kb", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    buffer_size = args.buffer_kb * 1024
+
+    with tempfile.TemporaryDirectory() as root:
+        print(f"{'size':>8} {'algorithm':<10} {'mode':<10} {'MB/s':>10}")
+        for size_mb in args.sizes_mb:
+            file_path = os.path.join(root, f"sample_{size_mb}.bin")
+            with open(file_path, "wb") as f:
+                for _ in range(size_mb):
+                    f.write(os.urandom(1024 * 1024))
+            size = size_mb * 1024 * 1024
+
+            rate = throughput(legacy_md5, file_path, size, args.repeat)
+            print(f"{size_mb:>6}MB {'md5':<10} {'legacy':<10} {rate:>10.1f}")
+
+            for algorithm in SUPPORTED_ALGORITHMS:
+                readinto = FileHasher(algorithm, buffer_size=buffer_size, mmap_threshold=0)
+                mapped = FileHasher(algorithm, buffer_size=buffer_size, mmap_threshold=1)
+                assert readinto(file_path) == mapped(file_path)
+
+                for mode, hasher in (("readinto", readinto), ("mmap", mapped)):
+                    rate = throughput(hasher, file_path, size, args.repeat)
+                    print(f"{size_mb:>6}MB {algorithm:<10} {mode:<10} {rate:>10.1f}")
+
+            os.remove(file_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Concurrency benchmark: /health latency while an organize run is in flight.
+
+"before" mounts the original organize handler, which calls
+organize_files() directly inside ``async def`` and so holds the event loop
+for the whole run. "after" hits the real /api/files/organize, which hands
+the work to the blocking thread pool. /health is polled from a separate
+thread during each run and p50/p99/max latency are reported.
+
+Usage (from backend/):
+    python -m benchmarks.bench_health_latency [--files 20000] [--runs 3]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(client, path, runs):
+    latencies = []
+    done = threading.Event()
+
+    def poll():
+        while not done.is_set():
+            start = time.perf_counter()
+            response = client.get("/health")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    try:
+        for _ in range(runs):
+            response = client.post(path, json={"dry_run": True})
+            assert response.status_code == 200, response.text
+    finally:
+        done.set()
+        poller.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        # The app-scoped organizer uses ~/Downloads; point it at a synthetic tree
+        os.environ["HOME"] = home
+        downloads = os.path.join(home, "Downloads")
+        os.makedirs(downloads)
+        for index in range(args.files):
+            with open(os.path.join(downloads, f"file_{index}.{('png', 'pdf', 'zip', 'mp3')[index % 4]}"), "wb") as f:
+                f.write(b"x" * (index % 512))
+
+        from fastapi import Request
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        @app.post("/bench/legacy-organize")
+        async def legacy_organize(request: Request):
+            organized_count, errors, results = request.app.state.organizer.organize_files(dry_run=True)
+            return {"organized_count": organized_count}
+
+        with TestClient(app) as client:
+            results = [
+                ("before", measure(client, "/bench/legacy-organize", args.runs)),
+                ("after", measure(client, "/api/files/organize", args.runs)),
+            ]
+
+    print(f"{'mode':<8} {'samples':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for label, latencies in results:
+        print(
+            f"{label:<8} {len(latencies):>8} {statistics.median(latencies) * 1e3:>9.2f} "
+            f"{percentile(latencies, 0.99) * 1e3:>9.2f} {max(latencies) * 1e3:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: query plans and latency on the files / organization_rules tables
+before and after the index migration.
+
+Builds a synthetic table (one million files by default) at the initial
+schema revision, times the lookups the app makes and prints SQLite's
+EXPLAIN QUERY PLAN for each. It then upgrades to head and repeats.
+
+Usage (from backend/):
+    python -m benchmarks.bench_indexes [--rows 1000000] [--rules 10000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from alembic import command
+from alembic.config import Config
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INITIAL_REVISION = "e65f09c2ce2a"
+CATEGORIES = ["images", "documents", "videos", "audio", "archives", "software", "code", "other"]
+
+QUERIES = [
+    ("path lookup", "SELECT id FROM files WHERE original_path = :path"),
+    ("checksum dupes", "SELECT id, original_path FROM files WHERE checksum = :checksum AND file_size = :size"),
+    ("recent files", "SELECT id FROM files ORDER BY created_at DESC LIMIT 20"),
+    ("recent in category", "SELECT id FROM files WHERE category = :category ORDER BY created_at DESC LIMIT 20"),
+    ("pending organize", "SELECT id FROM files WHERE is_organized = 0 ORDER BY created_at LIMIT 100"),
+    ("active rules", "SELECT id FROM organization_rules WHERE is_active = 1 ORDER BY priority DESC"),
+]
+
+
+def populate(db_path, rows, rules):
+    connection = sqlite3.connect(db_path)
+    start = datetime(2020, 1, 1)
+    random.seed(0)
+
+    def files():
+        for index in range(rows):
+            size = random.randint(1, 50_000_000)
+            yield (
+                f"file_{index}.bin",
+                f"/downloads/dir_{index % 1000}/file_{index}.bin",
+                size,
+                ".bin",
+                CATEGORIES[index % len(CATEGORIES)],
+                index % 3 != 0,
+                (start + timedelta(seconds=index * 60)).isoformat(sep=" "),
+                f"{random.getrandbits(128):032x}",
+            )
+
+    connection.executemany(
+        "INSERT INTO files (original_name, original_path, file_size, file_type, category, is_organized, created_at, checksum) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        files(),
+    )
+    connection.executemany(
+        "INSERT INTO organization_rules (name, file_pattern, target_category, target_folder, is_active, priority) "
+        "VALUES (?, '*', 'other', 'Other', ?, ?)",
+        ((f"rule_{index}", index % 10 == 0, random.randint(0, 1000)) for index in range(rules)),
+    )
+    connection.commit()
+    connection.close()
+
+
+def measure(db_path, params, repeat):
+    connection = sqlite3.connect(db_path)
+    connection.execute("ANALYZE")
+    for label, sql in QUERIES:
+        plan = "; ".join(row[-1] for row in connection.execute("EXPLAIN QUERY PLAN " + sql, params))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            connection.execute(sql, params).fetchall()
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"  {label:<20} {elapsed * 1e3:>10.3f} ms  {plan}")
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--rules", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "bench.db")
+        config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+        config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+        config.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+
+        command.upgrade(config, INITIAL_REVISION)
+        start = time.perf_counter()
+        populate(db_path, args.rows, args.rules)
+        print(f"populated {args.rows} files / {args.rules} rules in {time.perf_counter() - start:.1f}s")
+
+        connection = sqlite3.connect(db_path)
+        path, checksum, size = connection.execute(
+            "SELECT original_path, checksum, file_size FROM files WHERE id = ?", (args.rows // 2,)
+        ).fetchone()
+        connection.close()
+        params = {"path": path, "checksum": checksum, "size": size, "category": "documents"}
+
+        print("before (initial schema):")
+        measure(db_path, params, args.repeat)
+
+        start = time.perf_counter()
+        command.upgrade(config, "head")
+        print(f"migrated to head in {time.perf_counter() - start:.1f}s")
+
+        print("after:")
+        measure(db_path, params, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
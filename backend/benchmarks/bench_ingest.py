@@ -0,0 +1,102 @@
+"""
+Benchmark: initial import of an existing downloads folder into the database.
+
+"legacy" runs the original loop (one session, SELECT, INSERT and COMMIT per
+file, as the old FileMonitorService._scan_file did). "bulk" runs ingest_existing_files, which does one
+existence query, one bulk insert and one commit per chunk. Peak traced
+memory is reported for each.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ingest [--files 5000] [--chunk-size 1000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+
+def legacy_scan_file(entry):
+    """The original per-file ingest: one session, SELECT, INSERT and COMMIT"""
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.models.file import File
+    from app.services.classifier import get_classifier
+
+    stat = entry.stat()
+    file_ext, category = get_classifier(settings.default_categories).match(entry.path)
+    db = SessionLocal()
+    try:
+        if db.query(File).filter(File.original_path == entry.path).first():
+            return
+        db.add(File(
+            original_name=entry.name,
+            original_path=entry.path,
+            file_size=stat.st_size,
+            file_type=file_ext,
+            category=category,
+            created_at=datetime.fromtimestamp(stat.st_ctime),
+            is_organized=False
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        downloads = os.path.join(workdir, "Downloads")
+        for index in range(args.files):
+            folder = os.path.join(downloads, f"dir_{index % 50}")
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"file_{index}.{('png', 'pdf', 'zip', 'mp3')[index % 4]}"), "wb") as f:
+                f.write(b"x" * (index % 512))
+
+        os.environ["DOWNLOADS_PATH"] = downloads
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+        from app.core.database import Base, SessionLocal, engine
+        from app.models.file import File
+        from app.services.file_monitor import FileMonitorService
+        from app.services.walker import walk_files
+
+        Base.metadata.create_all(engine)
+        monitor = FileMonitorService()
+
+        def legacy():
+            for entry in walk_files(downloads):
+                if monitor._should_organize(entry.path):
+                    legacy_scan_file(entry)
+
+        def bulk():
+            monitor.ingest_existing_files(chunk_size=args.chunk_size)
+
+        print(f"{'mode':<8} {'files':>8} {'seconds':>9} {'rows/s':>10} {'peak MB':>9}")
+        for label, func in (("legacy", legacy), ("bulk", bulk)):
+            db = SessionLocal()
+            db.query(File).delete()
+            db.commit()
+            db.close()
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            db = SessionLocal()
+            rows = db.query(File).count()
+            db.close()
+            print(f"{label:<8} {rows:>8} {elapsed:>9.2f} {rows / elapsed:>10.1f} {peak / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
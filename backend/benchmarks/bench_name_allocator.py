@@ -0,0 +1,77 @@
+"""
+Benchmark: allocating colliding names in one folder.
+
+Simulates a burst of screenshots that all get the same minute-resolution
+smart name. The original probing loop costs one os.path.exists per
+candidate (O(N^2) overall); NameAllocator lists the folder once and keeps
+a next-free counter per name.
+
+Usage (from backend/):
+    python -m benchmarks.bench_name_allocator [--names 10000] [--legacy-names 1000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.name_allocator import NameAllocator
+
+NAME = "screenshot_2025-03-01_14-22.png"
+
+
+def legacy_handle_duplicates(target_path):
+    """The original _handle_duplicates"""
+    if not os.path.exists(target_path):
+        return target_path
+
+    base_path = Path(target_path)
+    counter = 1
+
+    while True:
+        new_name = f"{base_path.stem}_{counter}{base_path.suffix}"
+        new_path = base_path.parent / new_name
+
+        if not os.path.exists(new_path):
+            return str(new_path)
+
+        counter += 1
+
+
+def run_legacy(folder, count):
+    for _ in range(count):
+        path = legacy_handle_duplicates(os.path.join(folder, NAME))
+        open(path, "wb").close()
+
+
+def run_allocator(folder, count):
+    allocator = NameAllocator(folder)
+    for _ in range(count):
+        allocator.allocate(NAME, create=True)
+
+
+def timed(label, func, count):
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        func(folder, count)
+        elapsed = time.perf_counter() - start
+        assert len(os.listdir(folder)) == count
+    print(f"{label:<12} {count:>8} names {elapsed:>9.3f}s {elapsed / count * 1e6:>9.1f} us/name")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--names", type=int, default=10_000)
+    parser.add_argument("--legacy-names", type=int, default=1_000,
+                        help="the legacy loop is quadratic; pass --legacy-names 10000 for a direct comparison")
+    args = parser.parse_args()
+
+    for count in sorted({args.legacy_names // 2, args.legacy_names}):
+        timed("legacy", run_legacy, count)
+    for count in sorted({args.names // 2, args.names}):
+        timed("allocator", run_allocator, count)
+
+
+if __name__ == "__main__":
+    main()
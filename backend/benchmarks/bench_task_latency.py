@@ -0,0 +1,88 @@
+"""
+Benchmark: per-task latency (submit -> result) for each task executor backend.
+
+Each backend runs in its own subprocess, since the executor is settled
+once per process. "celery" needs Redis at REDIS_URL and starts
+an in-process Celery worker; it is skipped when Redis is unreachable.
+The task is organize_file_task on a missing path, so the numbers are
+dispatch and result overhead rather than file work.
+
+Usage (from backend/):
+    python -m benchmarks.bench_task_latency [--tasks 200] [--modes thread process celery]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run_mode(tasks):
+    """Runs inside the per-backend subprocess; prints latencies as JSON"""
+    from app.core.celery import celery_app, get_task_executor
+    from app.core.executor import submit_task
+    from app.tasks.file_tasks import organize_file_task
+
+    def measure():
+        latencies = []
+        for index in range(tasks):
+            start = time.perf_counter()
+            submit_task(organize_file_task, f"/nonexistent/file_{index}.pdf").get(timeout=30)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    if get_task_executor() == "celery":
+        from celery.contrib.testing.worker import start_worker
+
+        with start_worker(celery_app, perform_ping_check=False, pool="threads", concurrency=1):
+            latencies = measure()
+    else:
+        latencies = measure()
+    print(json.dumps(latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--modes", nargs="+", default=["thread", "process", "celery"])
+    parser.add_argument("--run-mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        run_mode(args.tasks)
+        return
+
+    from app.core.celery import redis_reachable
+    from app.core.config import settings
+
+    print(f"{'backend':<8} {'tasks':>6} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in args.modes:
+            if mode == "celery" and not redis_reachable(settings.redis_url):
+                print(f"{mode:<8} skipped: Redis not reachable at {settings.redis_url}")
+                continue
+            env = dict(
+                os.environ,
+                TASK_EXECUTOR=mode,
+                TASK_LOCAL_BACKEND_PATH=os.path.join(workdir, f"state_{mode}"),
+                TASK_RESULTS_PATH=os.path.join(workdir, "results"),
+                CHECKSUM_CACHE_PATH=os.path.join(workdir, "checksums.sqlite3"),
+            )
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_task_latency", "--run-mode", mode, "--tasks", str(args.tasks)],
+                env=env, check=True, capture_output=True, text=True
+            ).stdout
+            latencies = sorted(json.loads(output.strip().splitlines()[-1]))
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(
+                f"{mode:<8} {len(latencies):>6} {statistics.median(latencies) * 1e3:>9.2f} "
+                f"{p99 * 1e3:>9.2f} {statistics.mean(latencies) * 1e3:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Shared test setup.
+
+Settings are read from the environment when app.core.config is first
+imported, so every path the app writes to is pointed at a throwaway
+directory here, before any app module is loaded.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_root = tempfile.mkdtemp(prefix="downloads-organizer-tests-")
+_downloads = os.path.join(_root, "Downloads")
+
+os.environ.update({
+    "HOME": _root,
+    "DOWNLOADS_PATH": _downloads,
+    "DATABASE_URL": f"sqlite:///{os.path.join(_root, 'test.db')}",
+    "DATA_DIR": os.path.join(_root, "data"),
+    "REDIS_URL": "redis://127.0.0.1:1/0",
+    "TASK_EXECUTOR": "thread",
+})
+
+
+@pytest.fixture
+def downloads():
+    """An empty downloads folder (the one settings and ~/Downloads point at)"""
+    shutil.rmtree(_downloads, ignore_errors=True)
+    os.makedirs(_downloads)
+    yield _downloads
+    shutil.rmtree(_downloads, ignore_errors=True)
+
+
+@pytest.fixture
+def make_files():
+    """Create count small files with rotating extensions in a folder"""
+    def make(folder: str, count: int, extensions=("png", "pdf", "zip", "mp3")):
+        paths = []
+        for index in range(count):
+            path = os.path.join(folder, f"file_{index}.{extensions[index % len(extensions)]}")
+            with open(path, "wb") as f:
+                f.write(b"x" * (index % 512 + 1))
+            paths.append(path)
+        return paths
+    return make
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_root, ignore_errors=True)
@@ -0,0 +1,27 @@
+"""
+Dashboard snapshot cache invalidation.
+"""
+
+import os
+
+from app.services.dashboard_cache import SnapshotCache
+
+
+def test_mark_stale_reaches_caches_in_other_processes(tmp_path):
+    stamp_path = os.path.join(tmp_path, "dashboard.stamp")
+    computed = []
+
+    def compute():
+        computed.append(len(computed))
+        return {"generation": len(computed)}
+
+    # Two caches on one stamp file stand in for the API and a worker process
+    api = SnapshotCache(compute, ttl_seconds=3600, stamp_path=stamp_path)
+    worker = SnapshotCache(dict, ttl_seconds=3600, stamp_path=stamp_path)
+
+    assert api.get() == {"generation": 1}
+    assert api.get() == {"generation": 1}
+    worker.mark_stale()
+    assert api.get() == {"generation": 2}
+    assert api.get() == {"generation": 2}
+    assert len(computed) == 2
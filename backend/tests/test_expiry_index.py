@@ -0,0 +1,100 @@
+"""
+ExpiryIndex bookkeeping and cleanup.
+"""
+
+import os
+import time
+
+import pytest
+
+from app.services.expiry_index import NS_PER_DAY, ExpiryIndex, RetentionPolicy
+
+DAY = 86400
+
+
+@pytest.fixture
+def index(tmp_path):
+    policy = RetentionPolicy(
+        {"documents": [".pdf"], "images": [".png"]},
+        default_days=30,
+        temp_days=1,
+        temp_patterns=["*.tmp", "*.part"],
+        category_days={"images": 0}
+    )
+    return ExpiryIndex(str(tmp_path / "expiry.sqlite3"), policy)
+
+
+def aged(folder, name, days_old):
+    path = str(folder / name)
+    with open(path, "wb") as f:
+        f.write(b"x" * 10)
+    mtime = time.time() - days_old * DAY
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_rules_and_cutoffs(tmp_path, index):
+    files = {
+        "old.pdf": 40,
+        "recent.pdf": 10,
+        "old.tmp": 2,
+        "fresh.tmp": 0.5,
+        "ancient.png": 400,
+        "other.bin": 31,
+    }
+    index.record_many((path, os.stat(path)) for path in (aged(tmp_path, name, days) for name, days in files.items()))
+    assert index.count() == 6
+
+    now = time.time()
+    due = index.due(now)
+    assert [(os.path.basename(item["path"]), item["rule"]) for item in due] == [
+        ("old.pdf", "documents"),
+        ("other.bin", "other"),
+        ("old.tmp", "temp"),
+    ]
+    assert due[0]["cutoff_ns"] == int(now * 10**9) - 30 * NS_PER_DAY
+
+    # A default override only applies to rules without their own retention
+    assert [os.path.basename(item["path"]) for item in index.due(now, default_days=5)] == [
+        "old.pdf", "other.bin", "recent.pdf", "old.tmp"
+    ]
+    # Paging resumes after the last (mtime_ns, path)
+    first = index.due(now, limit=1)
+    assert index.due(now, limit=5, after=(first[0]["mtime_ns"], first[0]["path"])) == due[1:]
+
+
+def test_move_and_remove_keep_the_index_in_step(tmp_path, index):
+    path = aged(tmp_path, "download.part", 5)
+    index.record(path)
+    assert [item["rule"] for item in index.due()] == ["temp"]
+
+    # The rule follows the new name after a rename
+    renamed = str(tmp_path / "report.pdf")
+    os.replace(path, renamed)
+    index.move(path, renamed)
+    assert index.count() == 1 and index.due() == []
+
+    os.remove(renamed)
+    index.record(renamed)
+    assert index.is_empty()
+
+    index.move_many([(str(tmp_path / "gone.pdf"), str(tmp_path / "also-gone.pdf"))])
+    assert index.is_empty()
+
+
+def test_expire_restats_candidates(tmp_path, index):
+    expired = aged(tmp_path, "expired.pdf", 40)
+    touched = aged(tmp_path, "touched.pdf", 40)
+    vanished = aged(tmp_path, "vanished.pdf", 40)
+    index.record_many((path, os.stat(path)) for path in (expired, touched, vanished))
+    os.utime(touched)
+    os.remove(vanished)
+
+    dry = {os.path.basename(item["path"]): item["action"] for item in index.expire(dry_run=True)}
+    assert dry == {"expired.pdf": "would_delete", "touched.pdf": "rescheduled", "vanished.pdf": "missing"}
+    assert os.path.exists(expired) and index.count() == 2
+
+    actions = [(os.path.basename(item["path"]), item["action"]) for item in index.expire(batch_size=1)]
+    assert actions == [("expired.pdf", "deleted")]
+    assert not os.path.exists(expired)
+    assert index.count() == 1 and index.due() == []
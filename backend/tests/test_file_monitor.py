@@ -0,0 +1,136 @@
+"""
+Watcher end to end (a live watchdog Observer feeding DownloadsHandler),
+event coalescing and bulk ingestion of existing files.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import Base, SessionLocal, engine
+from app.models.file import File  # noqa: F401 - registers the table
+from app.services.event_coalescer import EventCoalescer
+from app.services.file_monitor import FileMonitorService
+
+
+def wait_for(condition, timeout=10.0, interval=0.05):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def files_under(folder):
+    return sorted(
+        os.path.relpath(os.path.join(dir_path, name), folder)
+        for dir_path, _, names in os.walk(folder)
+        for name in names
+    )
+
+
+@pytest.fixture
+def monitor(downloads, monkeypatch):
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(settings, "watch_stable_seconds", 0.2)
+    monkeypatch.setattr(settings, "watch_poll_interval", 0.05)
+    monkeypatch.setattr(settings, "watch_flush_interval", 0.05)
+    monkeypatch.setattr(settings, "watch_recursive", True)
+    service = FileMonitorService()
+    asyncio.run(service.start_monitoring())
+    yield service
+    asyncio.run(service.stop_monitoring())
+
+
+def test_organized_file_is_moved_exactly_once(monitor, downloads):
+    with open(os.path.join(downloads, "photo.jpg"), "wb") as f:
+        f.write(b"\xff\xd8\xff\xe0" + b"x" * 1024)
+
+    assert wait_for(lambda: not os.path.exists(os.path.join(downloads, "photo.jpg")))
+    organized = files_under(os.path.join(downloads, "Images"))
+    assert len(organized) == 1
+
+    # Several stability windows later, the organizer's own move must not have been requeued
+    time.sleep(1.5)
+    assert files_under(downloads) == [os.path.join("Images", organized[0])]
+    assert monitor.get_metrics()["queue"]["processed"] == 1
+
+
+def test_event_burst_costs_a_few_stats_per_file(tmp_path, monkeypatch):
+    paths = []
+    for index in range(200):
+        path = os.path.join(tmp_path, f"download_{index}.bin")
+        with open(path, "wb") as f:
+            f.write(b"x" * 64)
+        paths.append(path)
+
+    stats = []
+    real_stat = os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        if str(path).startswith(str(tmp_path)):
+            stats.append(path)
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+    dispatched = []
+    coalescer = EventCoalescer(dispatched.append, stable_seconds=0.2, poll_interval=0.05)
+    coalescer.start()
+    try:
+        events = 0
+        for _ in range(10):
+            for path in paths:
+                coalescer.touch(path)
+                events += 1
+        assert wait_for(lambda: len(dispatched) == len(paths))
+    finally:
+        coalescer.stop()
+
+    assert sorted(dispatched) == sorted(paths)
+    # Signature, stable check and the size check on dispatch - not a stat per pending path per event
+    assert len(stats) <= 4 * len(paths) < events
+
+
+def test_close_dispatches_on_the_poller_thread(tmp_path):
+    path = os.path.join(tmp_path, "done.pdf")
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4")
+
+    threads = []
+    coalescer = EventCoalescer(lambda file_path: threads.append(threading.current_thread().name), poll_interval=0.05)
+    coalescer.start()
+    try:
+        coalescer.close(path)
+        assert wait_for(lambda: threads)
+    finally:
+        coalescer.stop()
+    assert threads == ["event-coalescer"]
+
+
+def test_bulk_ingest_skips_recorded_files(downloads, make_files):
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.query(File).delete()
+    paths = make_files(downloads, 10)
+    # Already organized into a path that is now inside the walk
+    db.add(File(original_name="old.png", original_path="/elsewhere/old.png", new_path=paths[0], file_size=1, file_type=".png", is_organized=True))
+    db.commit()
+
+    service = FileMonitorService()
+    collected = []
+    first = service.ingest_existing_files(chunk_size=3, on_chunk=collected.extend)
+    assert (first["files_seen"], first["inserted"], first["already_present"], first["chunks"]) == (10, 9, 1, 4)
+    assert sorted(result["file_path"] for result in collected) == sorted(paths)
+
+    paths = make_files(downloads, 12)
+    second = service.ingest_existing_files(chunk_size=5)
+    assert (second["files_seen"], second["inserted"], second["already_present"]) == (12, 2, 10)
+
+    recorded = [path for (path,) in db.query(File.original_path).filter(File.is_organized == False)]  # noqa: E712
+    assert sorted(recorded) == sorted(paths[1:])
+    db.close()
@@ -0,0 +1,133 @@
+"""
+FileOrganizerService database bookkeeping, duplicate detection and checksum caching.
+"""
+
+import os
+
+import pytest
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.file import File
+from app.services.duplicate_detector import DuplicateDetector
+from app.services.file_organizer import FileOrganizerService
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    session.query(File).delete()
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def organizer():
+    return FileOrganizerService()
+
+
+def download(folder, name, content):
+    path = os.path.join(folder, name)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def test_reused_name_keeps_earlier_history(organizer, db, downloads):
+    first = organizer.organize_file(download(downloads, "report.pdf", b"%PDF-1.4 first"))
+    second = organizer.organize_file(download(downloads, "report.pdf", b"%PDF-1.4 second"))
+    assert organizer.record_results([first]) == 1
+    assert organizer.record_results([second]) == 1
+
+    rows = db.query(File).filter(File.original_path == first["original_path"]).order_by(File.id).all()
+    assert [row.new_path for row in rows] == [first["new_path"], second["new_path"]]
+    assert rows[0].checksum != rows[1].checksum
+
+
+def test_pending_ingest_row_is_completed(organizer, db, downloads):
+    path = download(downloads, "notes.txt", b"hello")
+    db.add(File(original_name="notes.txt", original_path=path, file_size=5, file_type=".txt", is_organized=False))
+    db.commit()
+
+    result = organizer.organize_file(path)
+    organizer.record_results([result])
+
+    db.expire_all()
+    rows = db.query(File).filter(File.original_path == path).all()
+    assert len(rows) == 1
+    assert rows[0].is_organized and rows[0].new_path == result["new_path"]
+
+
+def test_failed_batch_commit_falls_back_to_per_file(organizer, db, downloads, caplog):
+    results = [
+        organizer.organize_file(download(downloads, f"photo_{index}.png", b"\x89PNG" + bytes([index])))
+        for index in range(3)
+    ]
+    # file_size is NOT NULL, so this row fails and takes the batch commit down with it
+    results[1]["file_info"]["size"] = None
+
+    assert organizer.record_results(results) == 2
+    assert [result["recorded"] for result in results] == [True, False, True]
+    recorded = {row.new_path for row in db.query(File)}
+    assert recorded == {results[0]["new_path"], results[2]["new_path"]}
+    lost = [record for record in caplog.records if results[1]["new_path"] in record.getMessage()]
+    assert len(lost) == 1 and lost[0].levelname == "ERROR" and lost[0].exc_info
+
+
+def test_duplicate_stages_only_fully_hash_sampled_collisions(tmp_path):
+    block = 16
+    body = bytes(range(256)) * 4
+    files = {
+        "copy_a.bin": body,
+        "copy_b.bin": body,
+        "middle.bin": body[:512] + b"!" + body[513:],   # same head and tail, differs inside
+        "head.bin": b"!" + body[1:],                     # same size, differs in the head block
+        "small_a.txt": b"tiny",
+        "small_b.txt": b"tiny",
+        "alone.txt": b"no size twin here",
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_bytes(content)
+    paths = [str(tmp_path / name) for name in files]
+
+    detector = DuplicateDetector(block_size=block, workers=2)
+    groups = detector.find_groups(paths + paths[:1])
+
+    assert [[os.path.basename(path) for path in group["files"]] for group in groups] == [
+        ["copy_a.bin", "copy_b.bin"],
+        ["small_a.txt", "small_b.txt"],
+    ]
+    assert groups[0]["size"] == len(body)
+    assert detector.stats["files_seen"] == 7
+    assert detector.stats["size_candidates"] == 6
+    # Only the three files whose head and tail blocks collide are read in full
+    assert detector.stats["full_hashes"] == 3
+    assert detector.stats["bytes_read"] == 4 * 2 * block + 2 * 4 + 3 * len(body)
+
+
+def test_checksum_cache_rehashes_only_changed_files(tmp_path):
+    from app.services.checksum_cache import ChecksumCache
+
+    cache = ChecksumCache(str(tmp_path / "checksums.sqlite3"))
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"first")
+    calls = []
+
+    def compute(file_path):
+        calls.append(file_path)
+        return open(file_path, "rb").read().decode()
+
+    assert cache.get_or_compute(str(path), compute) == "first"
+    assert cache.get_or_compute(str(path), compute) == "first"
+    assert len(calls) == 1
+
+    path.write_bytes(b"second!")
+    assert cache.get_or_compute(str(path), compute) == "second!"
+    assert len(calls) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "invalidations": 1}
+
+    # A new cache on the same store remembers earlier runs
+    reopened = ChecksumCache(str(tmp_path / "checksums.sqlite3"))
+    assert reopened.get_or_compute(str(path), compute) == "second!"
+    assert len(calls) == 2 and reopened.stats()["hits"] == 1
@@ -0,0 +1,139 @@
+"""
+Background organizing through /api/tasks/organize on the in-process executor.
+"""
+
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import Base, engine
+from app.main import app
+from app.models.file import File  # noqa: F401  (registers the table)
+
+
+@pytest.fixture
+def client():
+    Base.metadata.create_all(engine)
+    with TestClient(app) as client:
+        yield client
+
+
+def wait_for(client, task_ids, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    statuses = []
+    while time.monotonic() < deadline:
+        statuses = [client.get(f"/api/tasks/status/{task_id}").json() for task_id in task_ids]
+        if all(status["state"] in ("SUCCESS", "FAILURE") for status in statuses):
+            return statuses
+        time.sleep(0.05)
+    raise AssertionError(f"tasks still running: {statuses}")
+
+
+def listing(root):
+    """Files below root, as (top-level folder, name) with "" for files in root itself"""
+    entries = []
+    for dir_path, _, names in os.walk(root):
+        rel_dir = os.path.relpath(dir_path, root)
+        entries.extend(("" if rel_dir == "." else rel_dir.split(os.sep)[0], name) for name in names)
+    return sorted(entries)
+
+
+def test_organize_downloads_skips_organized_folders(client, downloads, make_files):
+    make_files(downloads, 6, ("pdf", "png", "mp3"))
+    os.makedirs(os.path.join(downloads, "Projects"))
+    make_files(os.path.join(downloads, "Projects"), 2, ("zip",))
+    os.makedirs(os.path.join(downloads, "Documents"))
+    with open(os.path.join(downloads, "Documents", "kept.pdf"), "wb") as f:
+        f.write(b"%PDF-1.4 already organized")
+
+    response = client.post("/api/tasks/organize", json={})
+    assert response.status_code == 200
+    statuses = wait_for(client, response.json()["task_ids"])
+
+    results = [status["info"] for status in statuses]
+    assert all(result["status"] == "completed" for result in results)
+    assert sum(result["organized"] for result in results) == 8
+    folders = [folder for folder, _ in listing(downloads)]
+    assert sorted(folders) == ["Archives"] * 2 + ["Audio"] * 2 + ["Documents"] * 3 + ["Images"] * 2
+    assert ("Documents", "kept.pdf") in listing(downloads)
+
+
+def test_organize_paths_in_batches(client, downloads, make_files, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "organize_task_batch_size", 2)
+    paths = make_files(downloads, 5, ("png",))
+
+    response = client.post("/api/tasks/organize", json={"paths": paths})
+    task_ids = response.json()["task_ids"]
+    assert len(task_ids) == 3
+    statuses = wait_for(client, task_ids)
+    assert [status["info"]["organized"] for status in statuses] == [2, 2, 1]
+    assert [folder for folder, _ in listing(downloads)] == ["Images"] * 5
+
+    outside = client.post("/api/tasks/organize", json={"paths": ["/etc/passwd"]})
+    assert outside.status_code == 400
+
+
+def test_executor_is_settled_at_startup(client):
+    from app.core.celery import celery_app
+
+    assert client.get("/api/tasks/executor").json()["executor"] == "thread"
+    assert celery_app.conf.result_backend.startswith("file://")
+
+
+def test_mime_tiers_are_counted_per_batch(client, downloads, make_files, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "organize_task_batch_size", 4)
+    paths = make_files(downloads, 12, ("pdf", "exe", "png"))
+
+    response = client.post("/api/tasks/organize", json={"paths": paths})
+    statuses = wait_for(client, response.json()["task_ids"])
+
+    # Concurrent batches share one detector; each reports only its own files
+    for status in statuses:
+        result = status["info"]
+        assert sum(result["mime_tiers"].values()) == result["files"] == 4
+    assert sum(status["info"]["mime_tiers"]["extension"] for status in statuses) == 8
+
+
+@pytest.mark.parametrize("route", ["/api/tasks/organize", "/api/files/organize"])
+def test_cleanup_follows_organized_files(downloads, client, make_files, route):
+    from app.services.expiry_index import get_expiry_index
+    from app.tasks.file_tasks import cleanup_old_files_task
+
+    index = get_expiry_index()
+    with index._connection() as conn:
+        conn.execute("DELETE FROM expiry")
+    paths = make_files(downloads, 3, ("pdf",))
+    old = time.time() - 90 * 86400
+    for path in paths:
+        os.utime(path, (old, old))
+    index.record_many((path, os.stat(path)) for path in paths)  # As the watcher or a scan would
+
+    if route == "/api/tasks/organize":
+        response = client.post(route, json={})
+        wait_for(client, response.json()["task_ids"])
+    else:
+        response = client.post(route, json={"dry_run": False})
+        assert response.json()["organized_count"] == 3
+
+    result = cleanup_old_files_task.apply(kwargs={"dry_run": True}).get()
+    assert result["actions"] == {"would_delete": 3}
+    organized = sorted(
+        os.path.join(dir_path, name)
+        for dir_path, _, names in os.walk(downloads)
+        for name in names
+        if not name.startswith(".")
+    )
+    assert [path for path in organized if path.endswith(".pdf")] == sorted(
+        record["path"] for record in _details(result["details"])
+    )
+
+
+def _details(handle):
+    from app.services.result_store import get_result_store
+
+    records, _ = get_result_store().read_page(handle, limit=1000)
+    return records
@@ -0,0 +1,66 @@
+"""
+Per-directory name allocation.
+"""
+
+import os
+import threading
+
+from app.services.name_allocator import NameAllocator
+
+
+def test_many_collisions_cost_one_claim_each(tmp_path, monkeypatch):
+    for name in ["report.pdf"] + [f"report_{index}.pdf" for index in range(1, 50)]:
+        (tmp_path / name).write_bytes(b"old")
+
+    allocator = NameAllocator(str(tmp_path))
+    opens = []
+    real_open = os.open
+    monkeypatch.setattr(os, "open", lambda path, *args: opens.append(path) or real_open(path, *args))
+
+    paths = [allocator.allocate("report.pdf", create=True) for _ in range(500)]
+
+    assert len(set(paths)) == 500
+    assert os.path.basename(paths[0]) == "report_50.pdf"
+    assert os.path.basename(paths[-1]) == "report_549.pdf"
+    # The listing already knew the existing names, so nothing was probed twice
+    assert len(opens) == 500
+    assert all(os.path.getsize(path) == 0 for path in paths)
+
+
+def test_dry_run_allocation_creates_nothing(tmp_path):
+    allocator = NameAllocator(str(tmp_path))
+    paths = [allocator.allocate("a.txt") for _ in range(3)]
+    assert [os.path.basename(path) for path in paths] == ["a.txt", "a_1.txt", "a_2.txt"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_names_taken_after_listing_are_skipped(tmp_path):
+    allocator = NameAllocator(str(tmp_path))
+    (tmp_path / "a.txt").write_bytes(b"late")
+    (tmp_path / "a_1.txt").write_bytes(b"late")
+
+    assert os.path.basename(allocator.allocate("a.txt", create=True)) == "a_2.txt"
+    assert (tmp_path / "a.txt").read_bytes() == b"late"
+
+
+def test_concurrent_allocators_never_share_a_name(tmp_path):
+    # Separate allocators stand in for separate processes: their in-memory
+    # views go stale immediately, so only O_EXCL keeps the names unique
+    allocators = [NameAllocator(str(tmp_path)) for _ in range(8)]
+    barrier = threading.Barrier(len(allocators))
+    claimed = []
+
+    def run(allocator):
+        barrier.wait()
+        claimed.append([allocator.allocate("photo.png", create=True) for _ in range(50)])
+
+    threads = [threading.Thread(target=run, args=(allocator,)) for allocator in allocators]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    paths = [path for batch in claimed for path in batch]
+    assert len(paths) == 400
+    assert len(set(paths)) == 400
+    assert len(os.listdir(tmp_path)) == 400
@@ -0,0 +1,57 @@
+"""
+Tests for the gzip result store.
+"""
+
+import json
+import os
+
+from app.services.result_store import ResultStore
+
+
+def _write(store, kind, start, count):
+    with store.create(kind) as details:
+        details.extend({"index": index} for index in range(start, start + count))
+    return details.handle
+
+
+def _read_all(store, handle, limit):
+    records, offset = [], 0
+    while offset is not None:
+        page, offset = store.read_page(handle, offset=offset, limit=limit)
+        records.extend(page)
+    return [record["index"] for record in records]
+
+
+def test_pages_merged_results_in_order(tmp_path):
+    store = ResultStore(str(tmp_path))
+    parts = [_write(store, "scan_shard", 0, 2500), _write(store, "scan_shard", 2500, 0), _write(store, "scan_shard", 2500, 1200)]
+    handle = store.merge("scan", parts)
+
+    assert _read_all(store, handle, 100) == list(range(3700))
+    assert _read_all(store, handle, 1000) == list(range(3700))
+    assert store.read_page(handle, offset=3700) == ([], None)
+    assert sorted(os.listdir(tmp_path)) == [handle + ".idx.json", handle + ".jsonl.gz"]
+
+
+def test_page_starts_at_its_gzip_member(tmp_path):
+    store = ResultStore(str(tmp_path))
+    handle = _write(store, "scan", 0, 5000)
+
+    # Wipe every member before the last one (records 4000-4999): a page
+    # there must seek past them instead of decompressing from the start
+    with open(os.path.join(tmp_path, handle + ".idx.json")) as f:
+        last_member = json.load(f)["members"][-1][0]
+    with open(os.path.join(tmp_path, handle + ".jsonl.gz"), "r+b") as f:
+        f.write(b"\0" * last_member)
+
+    records, next_offset = store.read_page(handle, offset=4100, limit=10)
+    assert [record["index"] for record in records] == list(range(4100, 4110))
+    assert next_offset == 4110
+
+
+def test_reads_results_without_index(tmp_path):
+    store = ResultStore(str(tmp_path))
+    handle = _write(store, "cleanup", 0, 1500)
+    os.remove(os.path.join(tmp_path, handle + ".idx.json"))
+
+    assert _read_all(store, handle, 400) == list(range(1500))
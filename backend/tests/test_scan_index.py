@@ -0,0 +1,117 @@
+"""
+ScanIndex incremental refresh and keyset pagination.
+"""
+
+import os
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.scan_index import ScanIndex
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "Downloads"
+    for folder in ("a", "b", "b/deep"):
+        (root / folder).mkdir(parents=True)
+    for name in ("top.pdf", "a/one.png", "b/two.zip", "b/deep/three.mp3"):
+        (root / name).write_bytes(b"x" * 10)
+    return root
+
+
+@pytest.fixture
+def index(tree, tmp_path):
+    return ScanIndex(str(tree), lambda path: "Other", str(tmp_path / "index.sqlite3"))
+
+
+@pytest.fixture
+def client(downloads):
+    with TestClient(app) as client:
+        yield client
+
+
+def test_refresh_skips_unchanged_directories(tree, index):
+    first = index.refresh()
+    assert first["dirs_listed"] == 4 and first["files_updated"] == 4
+
+    again = index.refresh()
+    assert again == {"dirs_listed": 0, "dirs_skipped": 4, "files_updated": 0, "files_removed": 0}
+
+    (tree / "b" / "new.txt").write_bytes(b"new")
+    changed = index.refresh()
+    assert changed == {"dirs_listed": 1, "dirs_skipped": 3, "files_updated": 1, "files_removed": 0}
+    assert [row["name"] for row in index.list_files(str(tree / "b"))] == ["new.txt", "two.zip"]
+
+
+def test_refresh_forgets_removed_directories(tree, index):
+    index.refresh()
+    shutil.rmtree(tree / "b")
+
+    stats = index.refresh()
+    assert stats["files_removed"] == 2
+    assert index.count_entries([str(tree), os.path.join(str(tree), "b")]) == {
+        str(tree): 2,
+        os.path.join(str(tree), "b"): None
+    }
+
+
+def pages(index, root, **kwargs):
+    cursor, names = None, []
+    while True:
+        rows, cursor = index.query_files(root, cursor=cursor, **kwargs)
+        names.append([row["name"] for row in rows])
+        if cursor is None:
+            return names
+
+
+def test_keyset_pages_cover_ties_once(tmp_path):
+    root = tmp_path / "Downloads"
+    root.mkdir()
+    for index, size in enumerate([5, 3, 5, 5, 1, 3, 5]):
+        (root / f"f{index}.bin").write_bytes(b"x" * size)
+    index = ScanIndex(str(root), lambda path: "Other", str(tmp_path / "index.sqlite3"))
+    index.refresh()
+
+    ascending = pages(index, str(root), sort="size", order="asc", limit=2)
+    assert [len(page) for page in ascending] == [2, 2, 2, 1]
+    assert sum(ascending, []) == ["f4.bin", "f1.bin", "f5.bin", "f0.bin", "f2.bin", "f3.bin", "f6.bin"]
+
+    descending = pages(index, str(root), sort="size", order="desc", limit=3)
+    assert sum(descending, []) == list(reversed(sum(ascending, [])))
+
+    filtered = pages(index, str(root), sort="name", order="asc", limit=2, filters={"min_size": 5})
+    assert sum(filtered, []) == ["f0.bin", "f2.bin", "f3.bin", "f6.bin"]
+
+
+def test_cursor_is_tied_to_its_sort(tmp_path):
+    root = tmp_path / "Downloads"
+    root.mkdir()
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (root / name).write_bytes(b"x")
+    index = ScanIndex(str(root), lambda path: "Other", str(tmp_path / "index.sqlite3"))
+    index.refresh()
+
+    _, cursor = index.query_files(str(root), sort="name", limit=1)
+    with pytest.raises(ValueError):
+        index.query_files(str(root), sort="size", cursor=cursor, limit=1)
+    with pytest.raises(ValueError):
+        index.query_files(str(root), sort="name", order="desc", cursor=cursor, limit=1)
+    with pytest.raises(ValueError):
+        index.query_files(str(root), cursor="not-a-cursor!", limit=1)
+
+
+def test_files_endpoint_pages_and_rejects_foreign_cursor(downloads, client, make_files):
+    paths = make_files(downloads, 5)
+
+    first = client.get("/api/files/", params={"sort": "size", "limit": 3}).json()
+    assert len(first["files"]) == 3 and first["next_cursor"]
+    rest = client.get("/api/files/", params={"sort": "size", "limit": 3, "cursor": first["next_cursor"]}).json()
+    assert rest["next_cursor"] is None
+    assert [record["path"] for record in first["files"] + rest["files"]] == paths
+
+    response = client.get("/api/files/", params={"sort": "name", "cursor": first["next_cursor"]})
+    assert response.status_code == 400
+    assert client.get("/api/files/", params={"cursor": "garbage"}).status_code == 400
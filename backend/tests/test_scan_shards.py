@@ -0,0 +1,71 @@
+"""
+Scan shard planning covers the tree exactly once.
+"""
+
+import os
+from collections import Counter
+
+import pytest
+
+from app.services.scan_shards import iter_shard_files, load_dir_sizes, plan_shards, save_dir_sizes
+from app.services.walker import walk_files
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "Downloads"
+    layout = {
+        "": 7,
+        "big": 3,
+        "big/a": 25,
+        "big/b": 4,
+        "big/b/c": 18,
+        "small": 2,
+        "empty/nothing": 0,
+        "Organized/Images": 5,
+        "deep/1/2/3/4": 6,
+    }
+    for folder, count in layout.items():
+        (root / folder).mkdir(parents=True, exist_ok=True)
+        for index in range(count):
+            (root / folder / f"f{index}.txt").write_bytes(b"x")
+    return str(root)
+
+
+def covered(root, shards, **kwargs):
+    return Counter(entry.path for shard in shards for entry in iter_shard_files(root, shard, **kwargs))
+
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"max_depth": 2},
+    {"exclude_paths": ["Organized"]},
+    {"exclude": ["c"], "include": ["f1*.txt", "f2.txt"]},
+])
+def test_every_file_in_exactly_one_shard(tree, tmp_path, kwargs):
+    if "exclude_paths" in kwargs:
+        kwargs = {"exclude_paths": [os.path.join(tree, path) for path in kwargs["exclude_paths"]]}
+    expected = Counter(entry.path for entry in walk_files(tree, **kwargs))
+
+    # First scan: no saved sizes
+    first = plan_shards(tree, {}, target_files=10, max_shards=4, **kwargs)
+    assert 1 < len(first) <= 4
+    assert covered(tree, first, **kwargs) == expected
+
+    # Later scans: sizes saved from the previous one split the large subtrees
+    stats_path = str(tmp_path / "shards.json")
+    save_dir_sizes(stats_path, tree, Counter(os.path.dirname(path) for path in expected))
+    dir_sizes = load_dir_sizes(stats_path)
+    assert dir_sizes[os.path.normpath(tree)] == sum(expected.values())
+
+    for target_files, max_shards in ((10, 4), (5, 16), (1000, 4)):
+        shards = plan_shards(tree, dir_sizes, target_files=target_files, max_shards=max_shards, **kwargs)
+        assert len(shards) <= max_shards
+        assert covered(tree, shards, **kwargs) == expected
+
+    # Directories added since the sizes were saved are still covered
+    os.makedirs(os.path.join(tree, "big", "new"))
+    open(os.path.join(tree, "big", "new", "f1.txt"), "wb").close()
+    expected = Counter(entry.path for entry in walk_files(tree, **kwargs))
+    shards = plan_shards(tree, dir_sizes, target_files=5, max_shards=16, **kwargs)
+    assert covered(tree, shards, **kwargs) == expected
@@ -0,0 +1,52 @@
+"""
+SimpleOrganizerService organize runs.
+"""
+
+import os
+
+import pytest
+
+from app.services.simple_organizer import SimpleOrganizerService
+
+FIXED_MTIME = 1_700_000_000
+
+
+def build_tree(root):
+    # Same mtime everywhere, so most files collide on their smart name
+    names = [f"file_{index}.{ext}" for index in range(40) for ext in ("png", "pdf", "zip")]
+    names += ["screenshot.png", "nested/invoice.pdf", "nested/deeper/song.mp3", "unknown.xyz"]
+    for name in names:
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(name.encode())
+        os.utime(path, (FIXED_MTIME, FIXED_MTIME))
+
+
+def relative(result, root):
+    result = dict(result)
+    for key in ("original_path", "new_path"):
+        if result.get(key):
+            result[key] = os.path.relpath(result[key], root)
+    return result
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+def test_parallel_stream_matches_serial(tmp_path, dry_run):
+    runs = {}
+    for workers in (1, 4):
+        root = str(tmp_path / f"workers_{workers}")
+        build_tree(root)
+        organizer = SimpleOrganizerService(downloads_path=root)
+        runs[workers] = [relative(result, root) for result in organizer.iter_organize(dry_run=dry_run, workers=workers)]
+
+    assert runs[4] == runs[1]
+    assert len(runs[1]) == 124 and all(result["success"] for result in runs[1])
+    new_paths = [result["new_path"] for result in runs[1]]
+    assert len(set(new_paths)) == len(new_paths)
+
+    for workers in (1, 4):
+        root = str(tmp_path / f"workers_{workers}")
+        for result in runs[workers]:
+            assert os.path.exists(os.path.join(root, result["original_path"])) == dry_run
+            assert os.path.exists(os.path.join(root, result["new_path"])) != dry_run
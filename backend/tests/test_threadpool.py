@@ -0,0 +1,124 @@
+"""
+BlockingExecutor behaviour through the API: streamed responses and event
+loop responsiveness while blocking work runs.
+"""
+
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+@pytest.fixture
+def client(downloads):
+    with TestClient(app) as client:
+        yield client
+
+
+def test_concurrent_streamed_scans(client, downloads, make_files):
+    # Several batches per stream, so consecutive batches would land on different pool threads
+    make_files(downloads, 300)
+
+    def scan():
+        response = client.post("/api/files/scan?stream=true")
+        assert response.status_code == 200, response.text
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        streams = list(pool.map(lambda _: scan(), range(12)))
+
+    for records in streams:
+        assert records[-1] == {"type": "summary", "message": "Scan completed", "files_found": 300}
+        assert sum(1 for record in records if record["type"] == "file") == 300
+
+
+def test_iterate_closes_abandoned_iterator():
+    from app.core.threadpool import BlockingExecutor
+    import asyncio
+
+    closed = threading.Event()
+    threads = set()
+
+    def items():
+        try:
+            for index in range(10_000):
+                threads.add(threading.get_ident())
+                yield index
+        finally:
+            closed.set()
+
+    async def consume():
+        executor = BlockingExecutor(pool_size=2)
+        seen = []
+        stream = executor.iterate("scan", items(), batch_size=8)
+        async for item in stream:
+            seen.append(item)
+            if len(seen) == 50:
+                break
+        await stream.aclose()
+        executor.shutdown()
+        return seen
+
+    assert asyncio.run(consume()) == list(range(50))
+    assert closed.wait(timeout=5)
+    assert len(threads) == 1
+
+
+def test_health_latency_flat_during_organize(client, downloads, make_files):
+    make_files(downloads, 10_000)
+
+    idle = []
+    for _ in range(50):
+        start = time.perf_counter()
+        client.get("/health")
+        idle.append(time.perf_counter() - start)
+
+    busy = []
+    statuses = []
+    errors = []
+    done = threading.Event()
+
+    def poll():
+        # Asserting here would only end this thread; the main thread checks what we collect
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                response = client.get("/health")
+            except Exception as e:
+                errors.append(e)
+                return
+            busy.append(time.perf_counter() - start)
+            statuses.append(response.status_code)
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    try:
+        started = time.perf_counter()
+        for _ in range(3):
+            response = client.post("/api/files/organize", json={"dry_run": True})
+            assert response.status_code == 200, response.text
+        organize_seconds = time.perf_counter() - started
+    finally:
+        done.set()
+        poller.join()
+
+    assert not errors, errors
+    assert set(statuses) == {200}
+    # The organize runs must take long enough that a blocked loop would show up
+    assert organize_seconds > 0.2
+    assert len(busy) >= 20
+    assert percentile(busy, 0.99) < max(0.1, 10 * percentile(idle, 0.99)), (
+        f"/health p99 {percentile(busy, 0.99) * 1e3:.1f} ms during organize "
+        f"(idle p99 {percentile(idle, 0.99) * 1e3:.1f} ms, median {statistics.median(busy) * 1e3:.1f} ms)"
+    )
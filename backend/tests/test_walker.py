@@ -0,0 +1,74 @@
+"""
+scandir-based tree walker filtering and pruning.
+"""
+
+import os
+
+import pytest
+
+from app.services.walker import walk_files
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for name in (
+        "top.pdf",
+        "top.tmp",
+        "Organized/Images/done.png",
+        "Projects/app/main.py",
+        "Projects/app/build/out.bin",
+        "Projects/site/build/index.html",
+        "Projects/site/notes.txt",
+        "deep/a/b/c/leaf.txt",
+    ):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+    return tmp_path
+
+
+def walked(root, **kwargs):
+    return sorted(os.path.relpath(entry.path, root).replace(os.sep, "/") for entry in walk_files(str(root), **kwargs))
+
+
+def test_walks_everything_by_default(tree):
+    assert len(walked(tree)) == 8
+
+
+def test_exclude_by_name_and_relative_path(tree):
+    assert walked(tree, exclude=["*.tmp", "Organized", "Projects/*/build"]) == [
+        "Projects/app/main.py",
+        "Projects/site/notes.txt",
+        "deep/a/b/c/leaf.txt",
+        "top.pdf",
+    ]
+
+
+def test_include_only_filters_files(tree):
+    # Directories are still descended into; only files are matched against include
+    assert walked(tree, include=["*.txt", "*.html"]) == [
+        "Projects/site/build/index.html",
+        "Projects/site/notes.txt",
+        "deep/a/b/c/leaf.txt",
+    ]
+    assert walked(tree, include=["*.txt"], exclude=["deep"]) == ["Projects/site/notes.txt"]
+
+
+def test_exclude_paths_prunes_subtree(tree):
+    assert "Organized/Images/done.png" not in walked(tree, exclude_paths=[str(tree / "Organized")])
+
+
+def test_max_depth(tree):
+    assert walked(tree, max_depth=0) == ["top.pdf", "top.tmp"]
+    assert walked(tree, max_depth=2) == [
+        "Organized/Images/done.png",
+        "Projects/app/main.py",
+        "Projects/site/notes.txt",
+        "top.pdf",
+        "top.tmp",
+    ]
+
+
+def test_patterns_relative_to_outer_root(tree):
+    entries = walk_files(str(tree / "Projects"), exclude=["Projects/*/build"], relative_to=str(tree))
+    assert sorted(entry.name for entry in entries) == ["main.py", "notes.txt"]
@@ -0,0 +1,98 @@
+"""
+WorkQueue spill-to-disk behaviour.
+"""
+
+import os
+import threading
+import time
+
+from app.services.work_queue import WorkQueue
+
+
+def wait_for(condition, timeout=5.0, interval=0.02):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def test_spilled_paths_drain_while_workers_idle(tmp_path):
+    processed = []
+    lock = threading.Lock()
+
+    def process(paths):
+        with lock:
+            processed.extend(paths)
+
+    work = WorkQueue(
+        process,
+        workers=2,
+        maxsize=4,
+        put_timeout=0.01,
+        spill_path=str(tmp_path / "spill.jsonl"),
+        batch_size=3,
+        flush_interval=0.01,
+        refill_interval=0.05
+    )
+    work.start()
+    try:
+        # Workers are idle and blocked waiting for work when the spill happens
+        time.sleep(0.1)
+        work._spill([(f"/spilled/{index}", time.time()) for index in range(10)])
+        # Later puts queue up behind the spilled paths
+        for index in range(5):
+            work.put(f"/later/{index}")
+
+        expected = [f"/spilled/{index}" for index in range(10)] + [f"/later/{index}" for index in range(5)]
+        assert wait_for(lambda: len(processed) == len(expected)), processed
+        assert sorted(processed) == sorted(expected)
+        assert work.metrics()["spill_depth"] == 0
+        assert not os.path.exists(tmp_path / "spill.jsonl")
+    finally:
+        work.stop()
+
+
+def test_refill_reads_spill_in_chunks(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    release = threading.Event()
+    processed = []
+
+    def process(paths):
+        release.wait(5)
+        processed.extend(paths)
+
+    work = WorkQueue(process, workers=1, maxsize=4, put_timeout=0.01, spill_path=spill_path, refill_interval=0.05)
+    work._spill([(f"/spilled/{index}", time.time()) for index in range(50)])
+    size = os.path.getsize(spill_path)
+    work.start()
+    try:
+        # One refill moves only what fits; the file is left as written and read on from an offset
+        assert wait_for(lambda: os.path.exists(spill_path + ".offset"))
+        assert os.path.getsize(spill_path) == size
+        with open(spill_path + ".offset") as f:
+            assert 0 < int(f.read()) < size / 5
+        assert work.metrics()["spill_depth"] >= 50 - 5
+
+        release.set()
+        assert wait_for(lambda: len(processed) == 50), processed
+        assert processed == [f"/spilled/{index}" for index in range(50)]
+        assert not os.path.exists(spill_path)
+        assert not os.path.exists(spill_path + ".offset")
+    finally:
+        release.set()
+        work.stop()
+
+
+def test_restart_resumes_spill_at_offset(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    first = WorkQueue(lambda paths: None, maxsize=4, spill_path=spill_path)
+    first._spill([(f"/spilled/{index}", time.time()) for index in range(20)])
+    first._refill()
+    assert [path for path, _ in first._drain()] == [f"/spilled/{index}" for index in range(4)]
+
+    second = WorkQueue(lambda paths: None, maxsize=4, spill_path=spill_path)
+    assert second.metrics()["spill_depth"] == 16
+    second._refill()
+    assert [path for path, _ in second._drain()] == [f"/spilled/{index}" for index in range(4, 8)]
@@ -10,6 +10,31 @@ from datetime import datetime
 from pathlib import Path
 import json
 
+def walk_files(root, skip_paths=(), max_depth=None):
+    """Yield os.DirEntry objects for files below root, pruning skip_paths before descending"""
+    skip = {os.path.abspath(path) for path in skip_paths}
+    pending = [(root, 0)]
+    
+    while pending:
+        dir_path, depth = pending.pop()
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if os.path.abspath(entry.path) not in skip:
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        
+        if max_depth is None or depth < max_depth:
+            pending.extend((subdir, depth + 1) for subdir in reversed(subdirs))
+
 class SimpleOrganizer:
     def __init__(self, downloads_path=None):
         if downloads_path:
@@ -32,6 +57,16 @@ class SimpleOrganizer:
             "Other": []
         }
         
+        # Single hash lookup from extension to category
+        self.category_lookup = {}
+        for category, extensions in self.categories.items():
+            for extension in extensions:
+                self.category_lookup.setdefault(extension, category)
+        
+        # Names already used in each target folder, and next suffix per name
+        self._taken_names = {}
+        self._next_counter = {}
+        
         # Create organized folder structure
         self._create_folders()
     
@@ -45,18 +80,15 @@ class SimpleOrganizer:
     def _get_category(self, file_path):
         """Determine file category based on extension"""
         file_ext = Path(file_path).suffix.lower()
-        
-        for category, extensions in self.categories.items():
-            if file_ext in extensions:
-                return category
-        
-        return "Other"
+        return self.category_lookup.get(file_ext, "Other")
     
-    def _generate_smart_name(self, file_path, category):
+    def _generate_smart_name(self, file_path, category, mtime=None):
         """Generate a smart name for the file"""
         original_name = Path(file_path).name
         file_ext = Path(file_path).suffix
-        created_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+        if mtime is None:
+            mtime = os.path.getmtime(file_path)
+        created_time = datetime.fromtimestamp(mtime)
         
         # Generate timestamp
         timestamp = created_time.strftime("%Y-%m-%d_%H-%M")
@@ -89,22 +121,24 @@ class SimpleOrganizer:
             return f"file_{timestamp}{file_ext}"
     
     def _handle_duplicates(self, target_path):
-        """Handle duplicate file names"""
-        if not os.path.exists(target_path):
-            return target_path
+        """Handle duplicate file names (each target folder is listed once per run)"""
+        folder, name = os.path.split(target_path)
+        if folder not in self._taken_names:
+            self._taken_names[folder] = set(os.listdir(folder)) if os.path.isdir(folder) else set()
+        taken = self._taken_names[folder]
         
-        # Add number suffix
-        base_path = Path(target_path)
-        counter = 1
+        # Add number suffix, remembering the next free counter per name
+        base_path = Path(name)
+        key = (folder, name)
+        candidate = name
+        while candidate in taken or os.path.lexists(os.path.join(folder, candidate)):
+            taken.add(candidate)
+            counter = self._next_counter.get(key, 1)
+            self._next_counter[key] = counter + 1
+            candidate = f"{base_path.stem}_{counter}{base_path.suffix}"
         
-        while True:
-            new_name = f"{base_path.stem}_{counter}{base_path.suffix}"
-            new_path = base_path.parent / new_name
-            
-            if not os.path.exists(new_path):
-                return str(new_path)
-            
-            counter += 1
+        taken.add(candidate)
+        return os.path.join(folder, candidate)
     
     def scan_files(self):
         """Scan downloads folder and show what would be organized"""
@@ -112,21 +146,16 @@ class SimpleOrganizer:
         
         files_found = []
         
-        for root, dirs, files in os.walk(self.downloads_path):
-            # Skip the organized folder
-            if "Organized" in root:
-                continue
-                
-            for file in files:
-                file_path = os.path.join(root, file)
-                category = self._get_category(file_path)
-                
-                files_found.append({
-                    "path": file_path,
-                    "name": file,
-                    "category": category,
-                    "size": os.path.getsize(file_path)
-                })
+        # Skip the organized folder
+        for entry in walk_files(self.downloads_path, skip_paths=[self.organized_path]):
+            category = self._get_category(entry.path)
+            
+            files_found.append({
+                "path": entry.path,
+                "name": entry.name,
+                "category": category,
+                "size": entry.stat().st_size
+            })
         
         return files_found
     
@@ -136,42 +165,41 @@ class SimpleOrganizer:
         
         organized_count = 0
         errors = []
+        self._taken_names = {}
+        self._next_counter = {}
         
-        for root, dirs, files in os.walk(self.downloads_path):
-            # Skip the organized folder
-            if "Organized" in root:
-                continue
+        # Skip the organized folder
+        for entry in walk_files(self.downloads_path, skip_paths=[self.organized_path]):
+            file = entry.name
+            file_path = entry.path
+            
+            try:
+                # Get category
+                category = self._get_category(file_path)
+                
+                # Generate new name
+                new_name = self._generate_smart_name(file_path, category, entry.stat().st_mtime)
+                
+                # Create target path
+                target_folder = os.path.join(self.organized_path, category)
+                target_path = os.path.join(target_folder, new_name)
+                
+                # Handle duplicates
+                target_path = self._handle_duplicates(target_path)
+                
+                if dry_run:
+                    print(f"📄 {file} → {category}/{new_name}")
+                else:
+                    # Move file
+                    shutil.move(file_path, target_path)
+                    print(f"✅ Moved: {file} → {category}/{new_name}")
                 
-            for file in files:
-                file_path = os.path.join(root, file)
+                organized_count += 1
                 
-                try:
-                    # Get category
-                    category = self._get_category(file_path)
-                    
-                    # Generate new name
-                    new_name = self._generate_smart_name(file_path, category)
-                    
-                    # Create target path
-                    target_folder = os.path.join(self.organized_path, category)
-                    target_path = os.path.join(target_folder, new_name)
-                    
-                    # Handle duplicates
-                    target_path = self._handle_duplicates(target_path)
-                    
-                    if dry_run:
-                        print(f"📄 {file} → {category}/{new_name}")
-                    else:
-                        # Move file
-                        shutil.move(file_path, target_path)
-                        print(f"✅ Moved: {file} → {category}/{new_name}")
-                    
-                    organized_count += 1
-                    
-                except Exception as e:
-                    error_msg = f"❌ Error with {file}: {str(e)}"
-                    print(error_msg)
-                    errors.append(error_msg)
+            except Exception as e:
+                error_msg = f"❌ Error with {file}: {str(e)}"
+                print(error_msg)
+                errors.append(error_msg)
         
         print(f"\n📊 Summary:")
         print(f"   Files organized: {organized_count}")